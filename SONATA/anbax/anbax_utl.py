@@ -2,6 +2,9 @@
 # Third party modules
 import numpy as np
 
+# First party modules
+from SONATA.cbm.mesh.mesh_arrays import MeshArrays
+
 try:
     import dolfin
     from anba4 import material
@@ -52,11 +55,11 @@ def build_dolfin_mesh(cbm_mesh, cbm_nodes, cbm_materials):
 
     Parameters
     ----------
-    cbm_mesh : list of cell instances
+    cbm_mesh : list of cell instances or MeshArrays
         from the SONATA-CBM preprocessor
 
     cbm_nodes : list of nodes
-        from the SONATA-CBM preprocessor
+        from the SONATA-CBM preprocessor (ignored for a MeshArrays)
 
 
     Returns
@@ -76,6 +79,8 @@ def build_dolfin_mesh(cbm_mesh, cbm_nodes, cbm_materials):
 
     """
     (matLibrary, matdict, maxE) = build_mat_library(cbm_materials)
+    if isinstance(cbm_mesh, MeshArrays):
+        return _build_dolfin_mesh_from_arrays(cbm_mesh, matLibrary, matdict, maxE)
 
     mesh = dolfin.Mesh()
     me = dolfin.MeshEditor()
@@ -108,6 +113,33 @@ def build_dolfin_mesh(cbm_mesh, cbm_nodes, cbm_materials):
     return mesh, matLibrary, materials, plane_orientations, fiber_orientations, maxE
 
 
+def _build_dolfin_mesh_from_arrays(arrays, matLibrary, matdict, maxE):
+    # build_dolfin_mesh for a MeshArrays; ids are the row indices
+    mesh = dolfin.Mesh()
+    me = dolfin.MeshEditor()
+    me.open(mesh, "triangle", 2, 2)
+
+    me.init_vertices(arrays.n_nodes)
+    for (i, xy) in enumerate(arrays.nodes):
+        me.add_vertex(i, xy)
+
+    me.init_cells(arrays.n_cells)
+    for (j, conn) in enumerate(arrays.cells[:, :3].tolist()):
+        me.add_cell(j, conn)
+
+    me.close()
+
+    materials = dolfin.MeshFunction("size_t", mesh, mesh.topology().dim())
+    fiber_orientations = dolfin.MeshFunction("double", mesh, mesh.topology().dim())
+    plane_orientations = dolfin.MeshFunction("double", mesh, mesh.topology().dim())
+
+    materials.array()[:] = [matdict[m] for m in arrays.MatID]
+    plane_orientations.array()[:] = arrays.theta_11  # Theta_11
+    fiber_orientations.array()[:] = arrays.theta_3  # Theta_3
+
+    return mesh, matLibrary, materials, plane_orientations, fiber_orientations, maxE
+
+
 def anbax_recovery(anba, n_el, force, moment, voigt_convention, T):
     """
     Function to recover stresses and strains from an applied loading
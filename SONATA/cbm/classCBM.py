@@ -16,6 +16,7 @@ import pickle as pkl
 import platform
 import subprocess
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 # Third party modules
@@ -38,12 +39,18 @@ from SONATA.cbm.display.display_utils import (display_config,
                                               export_to_TIFF,
                                               show_coordinate_system,
                                               transform_wire_2to3d,)
-from SONATA.cbm.fileIO.CADinput import import_2d_stp, import_3d_stp, load_3D
+from SONATA.cbm.fileIO.CADinput import (import_2d_stp, import_3d_stp,
+                                        load_3D_cached,)
 from SONATA.cbm.fileIO.CADoutput import export_to_step
+from SONATA.cbm.fileIO.section_cache import referenced_MatIDs, stable_hash
+from SONATA.cbm.fileIO.topo_npz import (load_topo_npz, save_topo_npz,
+                                        topo_from_arrays, topo_to_arrays,)
 from SONATA.cbm.mesh.cell import Cell
 from SONATA.cbm.mesh.consolidate_mesh import consolidate_mesh_on_web
 from SONATA.cbm.mesh.mesh_core import gen_core_cells
+from SONATA.cbm.mesh.mesh_arrays import MeshArrays
 from SONATA.cbm.mesh.mesh_intersect import map_mesh_by_intersect_curve2d
+from SONATA.cbm.mesh.mesh_quality import mesh_quality
 from SONATA.cbm.mesh.mesh_utils import (grab_nodes_of_cells_on_BSplineLst,
                                         merge_nodes_if_too_close,
                                         sort_and_reassignID,)
@@ -51,6 +58,8 @@ from SONATA.cbm.mesh.node import Node
 from SONATA.cbm.topo.BSplineLst_utils import (BSplineLst_from_dct,
                                               get_BSplineLst_length,
                                               set_BSplineLst_to_Origin,)
+from SONATA.cbm.topo.para_Geom2d_BsplineCurve import (BSplineLst_from_ParaLst,
+                                                      ParaLst_from_BSplineLst,)
 from SONATA.cbm.topo.segment import Segment
 from SONATA.cbm.topo.utils import getID
 from SONATA.cbm.topo.web import Web
@@ -58,6 +67,7 @@ from SONATA.cbm.topo.weight import Weight
 from SONATA.cbm.topo.wire_utils import (discretize_wire, get_wire_length,
                                         rotate_wire, scale_wire,
                                         translate_wire, trsf_wire,)
+from SONATA.utl.trace import current_span, status, traced
 from SONATA.vabs.classStrain import Strain
 from SONATA.vabs.classStress import Stress
 # from SONATA.vabs.classVABSConfig import VABSConfig
@@ -77,6 +87,18 @@ except:
     pass
 
 
+def _build_segment_arrays(topo, ID, kwargs, l0):
+    """
+    worker of CBM._cbm_build_SegmentLst. Rebuilds Segment 0 and the WebLst
+    from the topology arrays topo, builds the segment ID (initialized with
+    kwargs) and returns it as topology arrays.
+    """
+    (SegmentLst, WebLst, BW) = topo_from_arrays(topo)
+    seg = Segment(ID, **kwargs)
+    seg.build_from_WebLst(WebLst, SegmentLst[0], l0=l0)
+    return topo_to_arrays([seg])
+
+
 class CBM(object):
     """ 
     This Class includes the SONATA Dicipline Module for Structural 
@@ -109,10 +131,10 @@ class CBM(object):
         loads the complete cbm instance from pickle
     
     cbm_save_topo(output_filename=None)
-        saves the topology (SegmentLst, WebLst, and BW) as pickle
+        saves the topology (SegmentLst, WebLst, and BW) as npz (or pickle)
         
     cbm_load_topo(input_filename=None)
-        loads the topology (SegmentLst, WebLst, and BW) from pickle
+        loads the topology (SegmentLst, WebLst, and BW) from npz (or pickle)
         
     cbm_save_mesh(output_filename=None)
         saves the mesh (self.mesh) as pickle
@@ -139,7 +161,7 @@ class CBM(object):
     cbm_gen_mesh(**kwargs)
         generates the dicretization of topology 
         
-    cbm_review_mesh()
+    cbm_review_mesh(**kwargs)
         prints a summary of the mesh properties to the screen 
         
     cbm_run_vabs()
@@ -216,6 +238,7 @@ class CBM(object):
         self.mesh = []
         self.BeamProperties = None
         self.display = None
+        self._stage_inputs = {}  # inputs of the last topology and mesh generation, see cbm_update
 
         self.refL = 1.0
 
@@ -225,7 +248,7 @@ class CBM(object):
         self.Blade = None  # TODO: Remove definition and set it up in classBlade
 
         if self.config.setup["input_type"] == 3:
-            self.surface3d = load_3D(self.config.setup["datasource"])
+            self.surface3d = load_3D_cached(self.config.setup["datasource"])
 
         elif self.config.setup["input_type"] == 4:
             self.blade = Blade(self.config.setup["datasource"])
@@ -240,13 +263,43 @@ class CBM(object):
 
     def __getstate__(self):
         """Return state values to be pickled."""
-        return (self.config, self.materials, self.SegmentLst, self.WebLst, self.BW, self.mesh, self.BeamProperties)
+        loc = self.Ax2.Location()
+        vz = self.Ax2.Direction()
+        vx = self.Ax2.XDirection()
+        ax2_coordinates = ((loc.X(), loc.Y(), loc.Z()), (vz.X(), vz.Y(), vz.Z()), (vx.X(), vx.Y(), vx.Z()))
+
+        if getattr(self, "BoundaryBSplineLst", None) is not None:
+            Para_BoundaryBSplineLst = ParaLst_from_BSplineLst(self.BoundaryBSplineLst)
+        else:
+            Para_BoundaryBSplineLst = None
+
+        section = (self.name, self.refL, getattr(self, "Theta", 0), ax2_coordinates, Para_BoundaryBSplineLst, self._stage_inputs)
+        return (self.config, self.materials, self.SegmentLst, self.WebLst, self.BW, self.mesh, self.BeamProperties, section)
 
     def __setstate__(self, state):
         """Restore state from the unpickled state values."""
-        (self.config, self.materials, self.SegmentLst, self.WebLst, self.BW, self.mesh, self.BeamProperties) = state
+        (self.config, self.materials, self.SegmentLst, self.WebLst, self.BW, self.mesh, self.BeamProperties) = state[:7]
+        self.name = "cbm_noname"
+        self.Ax2 = gp_Ax2()
+        self.refL = 1.0
+        self.display = None
+        self.startTime = datetime.now()
+        self.exportLst = []
+        self.surface3d = None
+        self.Blade = None
+        self._stage_inputs = {}
+
+        if len(state) > 7:  # pickles written before the section data was stored only hold 7 values
+            (self.name, self.refL, self.Theta, ax2_coordinates, Para_BoundaryBSplineLst) = state[7][:5]
+            if len(state[7]) > 5:
+                self._stage_inputs = state[7][5]
+            (loc, vz, vx) = ax2_coordinates
+            self.Ax2 = gp_Ax2(gp_Pnt(*loc), gp_Dir(*vz), gp_Dir(*vx))
+            if Para_BoundaryBSplineLst is not None:
+                self.BoundaryBSplineLst = BSplineLst_from_ParaLst(Para_BoundaryBSplineLst)
+
         if self.config.setup["input_type"] == 3:
-            self.surface3d = load_3D(self.config.setup["datasource"])
+            self.surface3d = load_3D_cached(self.config.setup["datasource"])
         elif self.config.setup["input_type"] == 4:
             self.blade = Blade(self.config.setup["datasource"])
             self.surface3d = self.blade.surface
@@ -287,34 +340,47 @@ class CBM(object):
         return None
 
     def cbm_save_topo(self, output_filename=None):
-        """saves the topology (SegmentLst, WebLst, and BW) as pickle
+        """saves the topology (SegmentLst, WebLst, and BW) in the versioned 
+        NPZ topology format (see SONATA.cbm.fileIO.topo_npz) or as pickle if
+        the filename ends with .pkl
         
         Parameters
         ----------
         output_filename : string, optional 
             path/filename, 
-            The Default uses the config.filename and replaces .yml with .pkl
+            The Default uses the config.filename and replaces .yml with 
+            _topo.npz
         """
         if output_filename is None:
             output_filename = self.config.filename
-            output_filename = output_filename.replace(".yml", "_topo.pkl")
+            output_filename = output_filename.replace(".yml", "_topo.npz")
 
-        with open(output_filename, "wb") as output:
-            pkl.dump((self.SegmentLst, self.WebLst, self.BW), output, protocol=pkl.HIGHEST_PROTOCOL)
+        if output_filename.endswith(".pkl"):
+            with open(output_filename, "wb") as output:
+                pkl.dump((self.SegmentLst, self.WebLst, self.BW), output, protocol=pkl.HIGHEST_PROTOCOL)
+        else:
+            save_topo_npz(output_filename, self.SegmentLst, self.WebLst, self.BW)
         return None
 
     def cbm_load_topo(self, input_filename=None):
-        """loads the topology (SegmentLst, WebLst, and BW) as pickle
+        """loads the topology (SegmentLst, WebLst, and BW) from a NPZ 
+        topology file or from a pickle (.pkl). The curves and wires of a NPZ 
+        topology are only built when they are accessed.
        
         Parameters
         ----------
         input_filename : string, optional 
-            path/filename of the .pkl file
-            The Default uses the config.filename and replaces .yml with .pkl
+            path/filename of the .npz or .pkl file
+            The Default uses the config.filename and replaces .yml with 
+            _topo.npz
         """
         if input_filename is None:
             input_filename = self.config.filename
-            input_filename = input_filename.replace(".yml", "_topo.pkl")
+            input_filename = input_filename.replace(".yml", "_topo.npz")
+
+        if not input_filename.endswith(".pkl"):
+            (self.SegmentLst, self.WebLst, self.BW) = load_topo_npz(input_filename)
+            return None
 
         with open(input_filename, "rb") as handle:
             (self.SegmentLst, self.WebLst, self.BW) = pkl.load(handle)
@@ -339,7 +405,7 @@ class CBM(object):
         if output_filename is None:
             output_filename = self.config.filename
             output_filename = output_filename.replace(".yml", "_mesh.pkl")
-            print("STATUS:\t Saving Mesh to: ", output_filename)
+            status("Saving Mesh to:  %s", output_filename)
 
         with open(output_filename, "wb") as output:
             pkl.dump(self.mesh, output, protocol=pkl.HIGHEST_PROTOCOL)
@@ -425,7 +491,7 @@ class CBM(object):
             for layer in seg.LayerLst:
                 self.exportLst.append(layer.wire)
 
-        print("STATUS:\t Exporting Topology to: ", export_filename)
+        status("Exporting Topology to:  %s", export_filename)
         export_to_step(self.exportLst, export_filename)
         return None
 
@@ -478,17 +544,34 @@ class CBM(object):
         self.refL = get_BSplineLst_length(self.SegmentLst[0].BSplineLst)
         return None
 
-    def cbm_gen_topo(self, **kwargs):
+    @traced("cbm_gen_topo")
+    def cbm_gen_topo(self, n_workers=None, **kwargs):
         """
         CBM Method that generates the topology. It starts by generating the 
         list of Segments. It continous to gen all layers for Segment 0. 
         Subsequently the webs are defined and afterwards the layers of the 
         remaining Segments are build. The Balance Weight is defined at the end
         of this method.        
+
+        Parameters:
+        ----------
+        n_workers : int, optional
+            number of worker processes that build the segments 1..n 
+            concurrently once Segment 0 and the webs exist (see 
+            _cbm_build_SegmentLst). The default (None) builds them serially.
+
+        Notes:
+        ----------  
+        The layer IDs only depend on the segment ID and the layup, so the 
+        topology is identical for every number of workers. Processes are 
+        used because the OCC calls of the offsetting hold the GIL. Starting 
+        the pool and transferring the curves costs time, so n_workers only 
+        pays off for sections with several webs and is off by default.
         """
         # Generate SegmentLst from config:
         self.SegmentLst = []
         self._cbm_generate_SegmentLst(**kwargs)
+
         # Build Segment 0:
         self.SegmentLst[0].build_wire()
         self.SegmentLst[0].build_layers(l0=self.refL, **kwargs)
@@ -498,19 +581,13 @@ class CBM(object):
         self.WebLst = []
         if len(self.config.webs) > 0:
             for k, w in self.config.webs.items(): 
-                print('STATUS:\t Building Web %s' %(k+1))
+                status('Building Web %s', k+1)
                 self.WebLst.append(Web(k, w['Pos1'], w['Pos2'], w['curvature'], self.SegmentLst))
             sorted(self.SegmentLst, key=getID)  
             
         #Build remaining Segments:
         if len(self.config.webs) > 0:
-            for i, seg in enumerate(self.SegmentLst[1:], start=1):
-                seg.Segment0 = self.SegmentLst[0]
-                seg.WebLst = self.WebLst
-                seg.build_segment_boundary_from_WebLst(self.WebLst, self.SegmentLst[0])
-                seg.build_layers(self.WebLst, self.SegmentLst[0], l0=self.refL)
-                seg.determine_final_boundary(self.WebLst, self.SegmentLst[0])
-                seg.build_wire()
+            self._cbm_build_SegmentLst(n_workers)
 
         self.BW = None
         # Balance Weight:
@@ -520,8 +597,44 @@ class CBM(object):
             p = self.SegmentLst[0].det_weight_Pnt2d(self.config.bw["s"], self.config.bw["t"])
             self.BW = Weight(0, p, self.config.bw["Diameter"], self.config.bw["Material"])
             # print(p.Coord())
+
+        self._stage_inputs = {"geometry": self._cbm_geometry_hash()}
+        return None
+
+    def _cbm_build_SegmentLst(self, n_workers=None):
+        """
+        builds the boundaries, layers and final boundaries of the segments 
+        1..n from Segment 0 and the WebLst, either serially or with a pool 
+        of n_workers processes. The segments only depend on Segment 0 and 
+        the webs. Both are sent to the workers as arrays of the NPZ topology 
+        format (see topo_to_arrays) and the workers return the built 
+        segments in the same form. Pickling the instances instead would 
+        lose attributes: Segment drops Segment0 and WebLst and Layer drops 
+        its ivLsts, which the segments and the meshing need.
+        """
+        Segment0 = self.SegmentLst[0]
+        tasks = self.SegmentLst[1:]
+
+        if n_workers is None or n_workers <= 1 or len(tasks) < 2:
+            for seg in tasks:
+                seg.build_from_WebLst(self.WebLst, Segment0, l0=self.refL)
+            return None
+
+        topo = topo_to_arrays([Segment0], self.WebLst)
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as pool:
+            futures = []
+            for seg in tasks:
+                kwargs = {"Layup": seg.Layup, "CoreMaterial": seg.CoreMaterial, "OCC": seg.OCC, "Theta": seg.Theta, "scale_factor": seg.scale_factor}
+                futures.append(pool.submit(_build_segment_arrays, topo, seg.ID, kwargs, self.refL))
+
+            for (i, future) in enumerate(futures, start=1):
+                seg = topo_from_arrays(future.result())[0][0]
+                seg.Segment0 = Segment0
+                seg.WebLst = self.WebLst
+                self.SegmentLst[i] = seg
         return None
 
+    @traced("cbm_gen_mesh")
     def cbm_gen_mesh(self, **kwargs):
         """
         CBM Method that generates the dicretization of topology and stores the 
@@ -580,19 +693,19 @@ class CBM(object):
         # ===================consolidate mesh on web interface
         for web in self.WebLst:
             #print web.ID,  'Left:', SegmentLst[web.ID].ID, 'Right:', SegmentLst[web.ID+1].ID,
-            print('STATUS:\t Consolidate Mesh on Web Interface', web.ID)  
+            status('Consolidate Mesh on Web Interface %s', web.ID)
             (web.wl_nodes, web.wl_cells) = grab_nodes_of_cells_on_BSplineLst(self.SegmentLst[web.ID].cells, web.BSplineLst)            
             (web.wr_nodes, web.wr_cells) = grab_nodes_of_cells_on_BSplineLst(self.SegmentLst[web.ID+1].cells, web.BSplineLst)
 
             if not web.wl_nodes or not web.wl_cells or not web.wr_nodes or not web.wr_cells:  # in case there was no mesh in a segment
-                print('STATUS:\t No mesh on Web Interface ' + str(web.ID) + ' to be consolodated')
+                status('No mesh on Web Interface %s to be consolodated', web.ID)
             else:
                 newcells = consolidate_mesh_on_web(web, web_consolidate_tol, self.display)
                 self.mesh.extend(newcells)
         
         #=====================split quad cells into trias:
         if split_quads == True:
-            print("STATUS:\t Splitting Quads into Trias")
+            status("Splitting Quads into Trias")
             tmp = []
             for c in self.mesh:
                 tmp.extend(c.split_quads())
@@ -600,7 +713,7 @@ class CBM(object):
 
         # ============= BALANCE WEIGHT - CUTTING HOLE ALGORITHM
         if self.config.setup["BalanceWeight"] == True:
-            print("STATUS:\t Meshing Balance Weight")
+            status("Meshing Balance Weight")
 
             self.mesh, boundary_nodes = map_mesh_by_intersect_curve2d(self.mesh, self.BW.Curve, self.BW.wire, global_minLen)
             # boundary_nodes = merge_nodes_if_too_close(boundary_nodes,self.BW.Curve,global_minLen,tol=0.05))
@@ -619,27 +732,159 @@ class CBM(object):
             if c.orientation == False:
                 c.invert_nodes()
         (self.mesh, nodes) = sort_and_reassignID(self.mesh)
+        current_span()["cells"] = len(self.mesh)
+        current_span()["nodes"] = len(nodes)
+
+        self._cbm_record_mesh_inputs(**kwargs)
+        return None
+
+    def _cbm_record_mesh_inputs(self, **kwargs):
+        """ stores the inputs the current mesh was generated with, see 
+        cbm_update"""
+        self._stage_inputs["mesh_kw"] = stable_hash(kwargs)
+        self._stage_inputs["plies"] = {layer.ID: (float(layer.Orientation), int(layer.MatID)) for seg in self.SegmentLst for layer in seg.LayerLst}
+        self._stage_inputs["materials"] = self._cbm_materials_hash()
         return None
 
-    def cbm_review_mesh(self):
+    def _cbm_geometry_hash(self):
+        """
+        returns the hash of all inputs that require the regeneration of the 
+        topology and the mesh: the setup, webs, balance weight, the core 
+        materials and start, end and thickness of every layer as well as the
+        boundary BSplineLst. Orientation and MatID of the layers are excluded,
+        they only affect the cell attributes (see cbm_update).
+        """
+        segments = []
+        for k, seg in self.config.segments.items():
+            layup = np.asarray(seg["Layup"], dtype=float)
+            if layup.ndim == 2 and layup.shape[1] >= 3:
+                layup = layup[:, :3]
+            segments.append((k, seg["CoreMaterial"], layup))
+
+        boundary = None
+        if getattr(self, "BoundaryBSplineLst", None) is not None:
+            boundary = ParaLst_from_BSplineLst(self.BoundaryBSplineLst)
+        return stable_hash(self.config.setup, self.config.webs, self.config.bw, self.config.flags, segments, getattr(self, "Theta", 0), boundary)
+
+    def _cbm_materials_hash(self):
+        """ returns the hash of the material properties that are referenced by 
+        the configuration"""
+        return stable_hash([self.materials[i] for i in referenced_MatIDs(self.config) if i in self.materials])
+
+    def _cbm_plies(self):
+        """ returns the dictionary {LayerID: (Orientation, MatID)} of the 
+        current configuration. The LayerID is assigned in the same way as in 
+        Segment.build_layers."""
+        plies = {}
+        for k, seg in self.config.segments.items():
+            layup = np.asarray(seg["Layup"], dtype=float)
+            if layup.ndim == 2 and layup.shape[1] >= 5:
+                for i, row in enumerate(layup, start=1):
+                    plies[int(k * 1000 + i)] = (float(row[3]), int(row[4]))
+        return plies
+
+    def cbm_update(self, **kwargs):
+        """
+        CBM method that brings the topology and the mesh up to date with the 
+        configuration and only reruns what depends on the changed inputs:
+            
+        - geometric changes (start, end, thickness, webs, core material, 
+          setup, boundary, keyword arguments) regenerate topology and mesh.
+        - changes of the orientation or MatID of layers rewrite theta_3 and 
+          MatID of the cells of the affected layers.
+        - changes of material properties need no update at all, since the 
+          solvers read self.materials directly. 
+        
+        Afterwards the solver (cbm_run_vabs or cbm_run_anbax) can be rerun.
+
+        Parameters
+        ----------
+        **kwargs : 
+            keyword arguments are passed to cbm_gen_mesh
+
+        Returns
+        -------
+        str 
+            'geometry', 'plies', 'materials' or 'none', depending on the 
+            inputs that have changed since the last update.
+            
+        Examples
+        --------
+        ::
+
+            job.config.segments[2]['Layup'][0][3] = 45
+            job.cbm_update()   # returns 'plies'
+            job.cbm_run_vabs()
+
+        """
+        if not self.mesh or self._stage_inputs.get("plies") is None \
+                or self._stage_inputs.get("geometry") != self._cbm_geometry_hash() \
+                or self._stage_inputs.get("mesh_kw") != stable_hash(kwargs):
+            status("Geometry changed: regenerating topology and mesh")
+            self.cbm_gen_topo()
+            self.cbm_gen_mesh(**kwargs)
+            return "geometry"
+
+        plies = self._cbm_plies()
+        changed = {lid: v for (lid, v) in plies.items() if self._stage_inputs["plies"].get(lid) != v}
+        materials = self._cbm_materials_hash()
+
+        if changed:
+            status("Layup orientation or MatID changed: updating the cells of %i layer(s)", len(changed))
+            for seg in self.SegmentLst:
+                for layer in seg.LayerLst:
+                    if layer.ID in changed:
+                        (layer.Orientation, layer.MatID) = changed[layer.ID]
+            for c in self.mesh:
+                if c.LayerID in changed:
+                    (c.theta_3, c.MatID) = changed[c.LayerID]
+            self._stage_inputs["plies"].update(changed)
+            self._stage_inputs["materials"] = materials
+            return "plies"
+
+        elif self._stage_inputs.get("materials") != materials:
+            status("Only material properties changed: topology and mesh are kept")
+            self._stage_inputs["materials"] = materials
+            return "materials"
+
+        return "none"
+
+    def cbm_review_mesh(self, **kwargs):
         """
         CBM method that prints a summary of the mesh properties to the 
-        screen 
+        screen. The metrics are computed by mesh_quality in one vectorized
+        pass over the cells.
+
+        Parameters
+        ----------
+        **kwargs :
+            limits passed to mesh_quality (min_angle, max_angle,
+            max_aspect_ratio, min_jacobian_ratio, max_skew, bins)
+
+        Returns
+        ----------
+        MeshQuality : per-cell metrics table, histograms and the ids of the
+            offending cells
         """
+        q = mesh_quality(self.mesh, **kwargs)
 
         print("STATUS:\t Review Mesh:")
         print("\t   - Total Number of Cells: %s" % (len(self.mesh)))
         print("\t   - Duration: %s" % (datetime.now() - self.startTime))
         # print '\t   - Saved as: %s' % filename
-        minarea = min([c.area for c in self.mesh])
-        print("\t   - smallest cell area: %s" % minarea)
-        minimum_angle = min([c.minimum_angle for c in self.mesh])
-        print("\t   - smallest angle [deg]: %s" % minimum_angle)
-        # orientation = all([c.orientation for c in mesh])
-        # print '\t   - Orientation [CC]: %s' % orientation
-
-        return None
-
+        if len(q.table):
+            print("\t   - smallest cell area: %s" % q["area"].min())
+            print("\t   - smallest angle [deg]: %s" % q["min_angle"].min())
+            print("\t   - largest angle [deg]: %s" % q["max_angle"].max())
+            print("\t   - largest aspect ratio: %s" % q["aspect_ratio"].max())
+            print("\t   - smallest Jacobian ratio: %s" % q["jacobian_ratio"].min())
+            print("\t   - largest skew: %s" % q["skew"].max())
+            print("\t   - Orientation [CC]: %s" % q["orientation"].all())
+        print("\t   - offending cells: %i" % len(q.offending))
+
+        return q
+
+    @traced("cbm_run_vabs")
     def cbm_run_vabs(self, jobid=None, rm_vabfiles=True, ramdisk=False, vabs_path = 'VABSIII'):
         """CBM method to run the solver VABS (Variational Asymptotic Beam 
         Sectional Analysis). Note that this method is designed to work if 
@@ -704,7 +949,7 @@ class CBM(object):
             print('config_filename')
             vabs_filename = self.config.filename.replace('.yml', fstring)
         
-        print('STATUS:\t Running VABS for constitutive modeling:')
+        status('Running VABS for constitutive modeling:')
         if platform.system() == 'Linux' or platform.system() == 'Windows':
             cmd = [vabs_path, vabs_filename]
             
@@ -724,7 +969,7 @@ class CBM(object):
                     stdout = subprocess.run(cmd, stdout=subprocess.PIPE).stdout.decode("utf-8")
                     self.config.vabs_cfg.recover_flag = 1
                     export_cells_for_VABS(self.mesh, nodes, vabs_filename, self.config.vabs_cfg, self.materials)
-                    print("STATUS:\t Running VABS for 3D Recovery:")
+                    status("Running VABS for 3D Recovery:")
                     stdout = subprocess.run(cmd, stdout=subprocess.PIPE).stdout.decode("utf-8")
 
                 else:
@@ -790,6 +1035,7 @@ class CBM(object):
 
         return None
 
+    @traced("cbm_run_anbax")
     def cbm_run_anbax(self):
         """interface method to run the solver anbax from marco.morandini 
         
@@ -844,7 +1090,7 @@ class CBM(object):
 
         # --- Stress & Strain recovery --- #
         if  self.config.anbax_cfg.recover_flag == True:
-            print("STATUS:\t Running ANBAX Stress & Strain Recovery:")
+            status("Running ANBAX Stress & Strain Recovery:")
             [tmp_StressF_tran, tmp_StressF_M_tran, tmp_StrainF_tran, tmp_StrainF_M_tran] = \
                 anbax_recovery(anba, len(self.mesh), self.config.anbax_cfg.F.tolist(), self.config.anbax_cfg.M.tolist(), self.config.anbax_cfg.voigt_convention, T)
 
@@ -860,7 +1106,7 @@ class CBM(object):
 
         return
 
-    def cbm_calc_failurecriteria(self, criteria="tsaiwu_2D", iso_criteria="nocriteria"):
+    def cbm_calc_failurecriteria(self, criteria="tsaiwu_2D", iso_criteria="nocriteria", mesh=None):
         """
         Applies the selected failure criteria for all cells. It is necessary 
         that the strains and stresses are calculated for all cells and the 
@@ -878,33 +1124,50 @@ class CBM(object):
         criteria : string
             current options are: 'tsaiwu_2D', 'maxstress_2D', 'maxstrain_2D',
             'hashin_2D', 'von_Mises'
+        mesh : list or MeshArrays, optional
+            the mesh to evaluate, the default is self.mesh. For a MeshArrays
+            the results are stored in its sf and failure_mode arrays.
                 
         """
-
-        for c in self.mesh:
-            sf = 99
-            mode = "nocriteria"
-            mat = self.materials[c.MatID]
-
-            if mat.orth == 0:
-                if iso_criteria == "von_Mises":
-                    (sf, mode) = von_Mises(mat, c.stressM, c.strainM)
-
-            if mat.orth == 1:
-                if criteria == "tsaiwu_2D":
-                    (sf, mode) = tsaiwu_2D(mat, c.stressM, c.strainM)
-                elif criteria == "maxstress_2D":
-                    (sf, mode) = maxstress_2D(mat, c.stressM, c.strainM)
-                elif criteria == "maxstrain_2D":
-                    (sf, mode) = maxstrain_2D(mat, c.stressM, c.strainM)
-                elif criteria == "hashin_2D":
-                    (sf, mode) = hashin_2D(mat, c.stressM, c.strainM)
-
-            c.sf = sf
-            c.failure_mode = mode
+        if mesh is None:
+            mesh = self.mesh
+
+        if isinstance(mesh, MeshArrays):
+            mesh.sf = np.full(mesh.n_cells, 99.0)
+            mesh.failure_mode = np.full(mesh.n_cells, "nocriteria", dtype=object)
+            (stressM, strainM) = (Stress(), Strain())
+            for j in range(mesh.n_cells):
+                stressM.tensor = np.array(mesh.stressM[j])
+                strainM.tensor = np.array(mesh.strainM[j])
+                (mesh.sf[j], mesh.failure_mode[j]) = self._failurecriteria(self.materials[mesh.MatID[j]], stressM, strainM, criteria, iso_criteria)
+            return None
+
+        for c in mesh:
+            (c.sf, c.failure_mode) = self._failurecriteria(self.materials[c.MatID], c.stressM, c.strainM, criteria, iso_criteria)
 
         return None
 
+    @staticmethod
+    def _failurecriteria(mat, stressM, strainM, criteria, iso_criteria):
+        sf = 99
+        mode = "nocriteria"
+
+        if mat.orth == 0:
+            if iso_criteria == "von_Mises":
+                (sf, mode) = von_Mises(mat, stressM, strainM)
+
+        if mat.orth == 1:
+            if criteria == "tsaiwu_2D":
+                (sf, mode) = tsaiwu_2D(mat, stressM, strainM)
+            elif criteria == "maxstress_2D":
+                (sf, mode) = maxstress_2D(mat, stressM, strainM)
+            elif criteria == "maxstrain_2D":
+                (sf, mode) = maxstrain_2D(mat, stressM, strainM)
+            elif criteria == "hashin_2D":
+                (sf, mode) = hashin_2D(mat, stressM, strainM)
+
+        return (sf, mode)
+
     def cbm_post_2dmesh(self, attribute="MatID", title="NOTITLE", **kw):
         """
         CBM Postprocessing method that displays the mesh with matplotlib.
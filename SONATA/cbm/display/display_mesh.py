@@ -21,6 +21,7 @@ from matplotlib.patches import Polygon
 
 # First party modules
 # from SONATA.utl_openmdao.doe_utl import filename_generator
+from SONATA.cbm.mesh.mesh_arrays import MeshArrays
 
 
 # mpl_logger = logging.getLogger("matplotlib")
@@ -225,10 +226,10 @@ def plot_cells(cells,nodes, attr1, materials, VABSProperties=None, title='None',
 
     Parameters
     ----------
-    cells : TYPE
-        DESCRIPTION.
-    nodes : TYPE
-        DESCRIPTION.
+    cells : list or MeshArrays
+        list of cells or the MeshArrays of the mesh.
+    nodes : list
+        list of nodes of the cells (ignored for a MeshArrays).
     attr1 : TYPE
         DESCRIPTION.
     materials : TYPE
@@ -252,6 +253,10 @@ def plot_cells(cells,nodes, attr1, materials, VABSProperties=None, title='None',
         DESCRIPTION.
 
     """
+    if isinstance(cells, MeshArrays):
+        (nodes_array, element_array, theta_11, data) = _mesh_arrays_plot_data(cells, attr1, plotTheta11, plotDisplacement)
+        return _plot_cells(nodes_array, element_array, theta_11, data, attr1, materials, title, VABSProperties, **kw)
+
     nodes_array = []
     for n in nodes:
         if plotDisplacement and n.displacement[0] is not None:
@@ -288,7 +293,24 @@ def plot_cells(cells,nodes, attr1, materials, VABSProperties=None, title='None',
             theta_11.append(getattr(c, "theta_11"))
         theta_11 = np.asarray(theta_11)
     
-    
+    return _plot_cells(nodes_array, element_array, theta_11, data, data_name, materials, title, VABSProperties, **kw)
+
+
+def _mesh_arrays_plot_data(arrays, attr1, plotTheta11=False, plotDisplacement=False):
+    # plot_cells arrays of a MeshArrays; node ids are row index + 1
+    nodes_array = arrays.nodes.copy()
+    if plotDisplacement:
+        disp = arrays.displacement
+        defined = ~np.isnan(disp[:, 0])
+        nodes_array[defined] += disp[defined, 1:3] - 1
+
+    element_array = arrays.cells[:, :4] + 1  # padding -1 -> 0
+    data = arrays.cell_data(attr1)
+    theta_11 = arrays.theta_11 if plotTheta11 else []
+    return (nodes_array, element_array, theta_11, data)
+
+
+def _plot_cells(nodes_array, element_array, theta_11, data, data_name, materials, title, VABSProperties, **kw):
     fig,ax = plot_mesh(nodes_array, element_array, theta_11, data, data_name, materials, title, VABSProperties, **kw)    
    
     if 'savepath' in kw:
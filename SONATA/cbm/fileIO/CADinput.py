@@ -1,4 +1,5 @@
 # Core Library modules
+import hashlib
 import math
 import os
 import sys
@@ -16,7 +17,10 @@ from OCC.Core.BRepBuilderAPI import (BRepBuilderAPI_MakeEdge,
                                      BRepBuilderAPI_MakeFace,
                                      BRepBuilderAPI_MakeWire,
                                      BRepBuilderAPI_Transform,)
-from OCC.Core.BRepTools import BRepTools_WireExplorer, breptools_Read
+from OCC.Core.Bnd import Bnd_Box
+from OCC.Core.BRepBndLib import brepbndlib_Add
+from OCC.Core.BRepTools import (BRepTools_WireExplorer, breptools_Read,
+                                breptools_Write,)
 from OCC.Core.GCPnts import (GCPnts_AbscissaPoint, GCPnts_QuasiUniformAbscissa,
                              GCPnts_QuasiUniformDeflection,
                              GCPnts_TangentialDeflection,
@@ -28,11 +32,11 @@ from OCC.Core.IFSelect import IFSelect_ItemsByEntity, IFSelect_RetDone
 from OCC.Core.IGESControl import IGESControl_Reader
 from OCC.Core.Quantity import Quantity_Color
 from OCC.Core.ShapeAnalysis import ShapeAnalysis_Wire, ShapeAnalysis_WireOrder
-from OCC.Core.ShapeFix import ShapeFix_Wire
+from OCC.Core.ShapeFix import ShapeFix_Shape, ShapeFix_Wire
 from OCC.Core.STEPControl import STEPControl_Reader
 from OCC.Core.StlAPI import StlAPI_Reader
 from OCC.Core.TopExp import TopExp_Explorer
-from OCC.Core.TopoDS import TopoDS_Shape, topods
+from OCC.Core.TopoDS import TopoDS_Compound, TopoDS_Shape, topods
 from OCC.Core.TopOpeBRep import TopOpeBRep_ShapeIntersector
 from OCC.Core.TopTools import (TopTools_ListIteratorOfListOfShape,
                                TopTools_ListOfShape,)
@@ -63,6 +67,7 @@ from SONATA.cbm.topo.wire_utils import (NbEdges_in_wire, Unique_EdgeLst,
                                         build_wire_from_BSplineLst,
                                         discretize_wire, rotate_wire,
                                         translate_wire,)
+from SONATA.utl.trace import status
 
 if __name__ == "__main__":
     os.chdir("../../..")
@@ -130,6 +135,69 @@ def load_3D(filename):
     return aResShape
 
 
+# shapes of load_3D_cached: {((path, mtime, size), heal): TopoDS_Shape}
+_SHAPE_CACHE = {}
+# boundaries of import_3d_stp_stations: {(shape key, R, scale_factor, Theta): BSplineLst}
+_SECTION_CACHE = {}
+
+
+def _shape_key(filename):
+    st = os.stat(filename)
+    return (os.path.abspath(filename), st.st_mtime_ns, st.st_size)
+
+
+def load_3D_cached(filename, heal=False, cache_dir=None):
+    """
+    loads (see load_3D) and optionally heals the 3D shape of filename only 
+    once per process. Subsequent calls with an unchanged file return the 
+    same shape.
+
+    Parameters
+    ----------
+    filename : str
+        .stp, .igs or .stl file
+    heal : bool, optional
+        fixes the loaded shape with ShapeFix_Shape. The default is False, 
+        which returns the same shape as load_3D.
+    cache_dir : str, optional
+        directory in which the healed shape is stored in the BREP format. 
+        The entries are keyed by the sha256 hash of the file and heal, so 
+        that later runs read the BREP file instead of parsing (and healing) 
+        the file again.
+
+    Returns
+    -------
+    TopoDS_Shape
+    """
+    key = (_shape_key(filename), bool(heal))
+    if key in _SHAPE_CACHE:
+        return _SHAPE_CACHE[key]
+
+    brep = None
+    if cache_dir is not None:
+        h = hashlib.sha256(repr(heal).encode())
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        brep = os.path.join(cache_dir, h.hexdigest() + ".brep")
+
+    if brep is not None and os.path.exists(brep):
+        aResShape = load_brep(brep)
+    else:
+        aResShape = load_3D(filename)
+        if heal:
+            fix = ShapeFix_Shape(aResShape)
+            fix.Perform()
+            aResShape = fix.Shape()
+        if brep is not None:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            breptools_Write(aResShape, brep)
+
+    _SHAPE_CACHE[key] = aResShape
+    return aResShape
+
+
 def EdgeLst_to_Wire(EdgeLst):
     """FROM UNORDERED LIST OF EDGES TO CONNECTING WIRE"""
 
@@ -355,9 +423,65 @@ def import_2d_stp(fname, scale_factor=1, Theta=0):
     return BSplineLst
 
 
+def section_shape_at_stations(TopoDS_Shape, Rs, parallel=False):
+    """
+    intersects the shape with the planes x = R of all radial stations Rs in 
+    a single boolean section and returns the ordered section wire of every 
+    station. The edges of the section are assigned to the station whose 
+    plane is closest to their midpoint.
+
+    Parameters
+    ----------
+    TopoDS_Shape : TopoDS_Shape
+    Rs : array_like
+        radial stations
+    parallel : bool, optional
+        lets OCC run the boolean section in parallel threads
+
+    Returns
+    -------
+    list of TopoDS_Wire
+    """
+    Rs = np.asarray(Rs, dtype=float)
+    bbox = Bnd_Box()
+    brepbndlib_Add(TopoDS_Shape, bbox)
+    (xmin, ymin, zmin, xmax, ymax, zmax) = bbox.Get()
+    d = 0.1 * max(ymax - ymin, zmax - zmin, 1e-3)
+
+    # bounded section planes with local u = y and v = z:
+    faces = TopoDS_Compound()
+    builder = BRep_Builder()
+    builder.MakeCompound(faces)
+    for R in Rs:
+        pln = gp_Pln(gp_Ax3(gp_Pnt(R, 0, 0), gp_Dir(1.0, 0.0, 0.0), gp_Dir(0.0, 1.0, 0.0)))
+        builder.Add(faces, BRepBuilderAPI_MakeFace(pln, ymin - d, ymax + d, zmin - d, zmax + d).Shape())
+
+    section = BRepAlgoAPI_Section(TopoDS_Shape, faces, False)
+    section.SetRunParallel(parallel)
+    section.ComputePCurveOn1(True)
+    section.Approximation(True)
+    section.Build()
+
+    EdgeLsts = [[] for R in Rs]
+    ex = TopExp_Explorer(section.Shape(), 6, 7)  # Search for Edges(6), Exclude Vertices(7)
+    while ex.More():
+        edge = TopoDS.topods().Edge(ex.Current())
+        c = BRepAdaptor_Curve(edge)
+        x = c.Value(0.5 * (c.FirstParameter() + c.LastParameter())).X()
+        EdgeLsts[int(np.argmin(np.abs(Rs - x)))].append(edge)
+        ex.Next()
+
+    return [EdgeLst_to_Wire(EdgeLst) if EdgeLst else None for EdgeLst in EdgeLsts]
+
+
 def BSplineLst_from_intersect_shape(aResShape, R, scale_factor, Theta):
     wire = stp3d_to_wire(aResShape, R)
+    return BSplineLst_from_section_wire(wire, R, scale_factor, Theta)
+
 
+def BSplineLst_from_section_wire(wire, R, scale_factor, Theta):
+    """ transforms the section wire of the radial station R into the 
+    crosssectional coordinates and returns its BSplineLst"""
     wire = translate_wire(wire, gp_Pnt(R, 0, 0), gp_Pnt(0, 0, 0))
     wire = rotate_wire(wire, gp_Ax1(gp_Pnt(0, 0, 0), gp_Dir(0, 1, 0)), math.pi / 2)
     wire = rotate_wire(wire, gp_Ax1(gp_Pnt(0, 0, 0), gp_Dir(0, 0, 1)), math.pi / 2)
@@ -402,11 +526,85 @@ def import_3d_stp(fname, R, scale_factor=1, Theta=0):
     Returns: 
         List of B-Splines
     """
-    print("STATUS:\t IMPORT_3d_STP")
-    aResShape = load_3D(fname)
+    status("IMPORT_3d_STP")
+    key = (_shape_key(fname), float(R), float(scale_factor), float(Theta))
+    if key in _SECTION_CACHE:
+        return copy_BSplineLst(_SECTION_CACHE[key])
+    aResShape = load_3D_cached(fname)
     return BSplineLst_from_intersect_shape(aResShape, R, scale_factor, Theta)
 
 
+def import_3d_stp_stations(fname, Rs, scale_factor=1, Theta=0, parallel=False, cache_dir=None):
+    """
+    Imports a 3D Surface in *.step format once and intersects it at all 
+    radial stations Rs in one pass (see section_shape_at_stations). The 
+    boundaries are also stored in the process wide section cache, so that 
+    subsequent calls of import_3d_stp (e.g. by CBM instances with 
+    input_type 3) for these stations do not intersect the shape again.
+    
+    Parameters:
+        - fname (string): filename
+        - Rs (array_like): radial stations
+        - scale_factor (float): scaling factor
+        - Theta (float or array_like):  Angle(s) to determine Origin
+        - parallel (bool): run the section in parallel threads of OCC
+        - cache_dir (string): directory of the BREP cache of the shape 
+          (see load_3D_cached)
+            
+    Returns: 
+        List of the B-Spline lists of the stations
+    """
+    status("IMPORT_3d_STP_STATIONS")
+    aResShape = load_3D_cached(fname, cache_dir=cache_dir)
+    Rs = np.atleast_1d(np.asarray(Rs, dtype=float))
+    Thetas = np.broadcast_to(np.asarray(Theta, dtype=float), Rs.shape)
+    (uRs, inv) = np.unique(Rs, return_inverse=True)
+    uwires = section_shape_at_stations(aResShape, uRs, parallel=parallel)
+    wires = [uwires[i] for i in inv]
+
+    BSplineLsts = []
+    for (R, Theta, wire) in zip(Rs, Thetas, wires):
+        if wire is None:
+            print("ERROR:\t No section of %s found at the radial station %s" % (fname, R))
+            BSplineLsts.append(None)
+            continue
+        BSplineLst = BSplineLst_from_section_wire(wire, R, scale_factor, Theta)
+        _SECTION_CACHE[(_shape_key(fname), float(R), float(scale_factor), float(Theta))] = BSplineLst
+        BSplineLsts.append(copy_BSplineLst(BSplineLst))
+    return BSplineLsts
+
+
+def batch_import_3d_stp(configs, parallel=False, cache_dir=None):
+    """
+    sections the 3D shapes of all configurations (CBMConfig or CBM 
+    instances) with input_type 3 at their radial stations, one boolean 
+    section per datasource and scale factor. Afterwards the CBM instances 
+    get their boundary BSplineLst from the section cache. Blade.read_yaml 
+    calls it for the configurations of all its sections.
+
+    Examples
+    --------
+    Section a list of CBM instances before their topology is generated::
+
+        batch_import_3d_stp(cbm_lst, parallel=True, cache_dir='.sonata_cache')
+        for job in cbm_lst:
+            job.cbm_gen_topo()
+    """
+    groups = {}
+    for cfg in configs:
+        setup = getattr(cfg, "config", cfg).setup
+        if setup["input_type"] == 3:
+            lst = groups.setdefault((setup["datasource"], float(setup["scale_factor"])), [])
+            lst.append((float(setup["radial_station"]), float(setup["Theta"])))
+
+    for ((fname, scale_factor), stations) in groups.items():
+        stations = sorted(set(stations))  # a station can have several Theta
+        Rs = [s[0] for s in stations]
+        Thetas = [s[1] for s in stations]
+        import_3d_stp_stations(fname, Rs, scale_factor, Thetas, parallel=parallel, cache_dir=cache_dir)
+    return None
+
+
 def order_BSplineLst_Head2Tail(BSplineLst, rel_tol=1e-06):
     # Order BSplineLst Head-to-Tail
     NbSplines = len(BSplineLst)
@@ -24,6 +24,7 @@ from SONATA.cbm.fileIO.read_yaml_input import read_yaml_materialdb
 from SONATA.cbm.mesh.cell import Cell
 from SONATA.cbm.mesh.consolidate_mesh import consolidate_mesh_on_web
 from SONATA.cbm.mesh.mesh_core import gen_core_cells
+from SONATA.cbm.mesh.mesh_index import MeshIndex
 from SONATA.cbm.mesh.mesh_intersect import map_mesh_by_intersect_curve2d
 from SONATA.cbm.mesh.mesh_utils import (find_node_by_ID,
                                         grab_nodes_of_cells_on_BSplineLst,
@@ -46,6 +47,7 @@ def read_nastran_bulkdata(filename):
     with open(filename) as f:
         nodes = []
         mesh = []
+        index = MeshIndex()
         for line in f:
             line = line.partition("$")[0]
             line = line.rstrip()
@@ -58,6 +60,7 @@ def read_nastran_bulkdata(filename):
                 node = Node(gp_Pnt2d(tmp[1], tmp[2]))
                 node.id = int(tmp[0])
                 nodes.append(node)
+                index.add_node(node)
 
             elif "CTRIA3" in line:
                 tmp = list(map("".join, zip(*[iter(line)] * 8)))[1:]
@@ -65,7 +68,7 @@ def read_nastran_bulkdata(filename):
                 tmp = list(filter(None, tmp))
 
                 nlst = [tmp[2], tmp[4], tmp[3]]  # counterclockwise
-                c_nodeLst = [find_node_by_ID(nodes, int(n)) for n in nlst]
+                c_nodeLst = [find_node_by_ID(index, int(n)) for n in nlst]
                 cell = Cell(c_nodeLst)
                 cell.id = int(tmp[0])
                 cell.MatID = int(tmp[1])
@@ -87,7 +90,7 @@ def read_nastran_bulkdata(filename):
                 tmp = list(filter(None, tmp))
 
                 nlst = [tmp[2], tmp[5], tmp[4], tmp[3]]  # counterclockwise
-                c_nodeLst = [find_node_by_ID(nodes, int(n)) for n in nlst]
+                c_nodeLst = [find_node_by_ID(index, int(n)) for n in nlst]
                 cell = Cell(c_nodeLst)
                 cell.id = int(tmp[0])
                 cell.MatID = int(tmp[1])
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed on-disk cache for the topology, mesh and beam properties
+of cross-sections.
+
+The key of each entry is a stable sha256 hash of everything the result
+depends on. Entries are plain pickle files, the OCC geometry is stored via
+the Para_Geom2d_BSplineCurve representation of the Segment and Layer
+classes. The least recently used entries are removed when the size of the
+cache directory exceeds max_size.
+
+@author: TPflumm
+"""
+# Core Library modules
+import hashlib
+import os
+import pickle as pkl
+
+# Third party modules
+import numpy as np
+
+# First party modules
+from SONATA.cbm.mesh.mesh_utils import sort_and_reassignID
+from SONATA.cbm.topo.para_Geom2d_BsplineCurve import ParaLst_from_BSplineLst
+
+
+def _update_hash(h, obj):
+    """ feeds a canonical byte representation of obj into the hash object h.
+    dictionaries are sorted by key, numpy arrays are hashed with dtype and
+    shape and objects are walked through their __dict__ or __slots__."""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        h.update(repr((type(obj).__name__, obj)).encode())
+
+    elif isinstance(obj, (np.ndarray, np.generic)):
+        arr = np.ascontiguousarray(obj)
+        h.update(repr(("ndarray", arr.dtype.str, arr.shape)).encode())
+        if arr.dtype == object:
+            for item in arr.ravel():
+                _update_hash(h, item)
+        else:
+            h.update(arr.tobytes())
+
+    elif isinstance(obj, dict):
+        h.update(b"dict")
+        for k in sorted(obj, key=repr):
+            _update_hash(h, k)
+            _update_hash(h, obj[k])
+
+    elif isinstance(obj, (list, tuple)):
+        h.update(repr((type(obj).__name__, len(obj))).encode())
+        for item in obj:
+            _update_hash(h, item)
+
+    else:
+        h.update(type(obj).__name__.encode())
+        slots = [s for cls in type(obj).__mro__ for s in getattr(cls, "__slots__", ())]
+        attrs = {s: getattr(obj, s) for s in slots if hasattr(obj, s)}
+        attrs.update(getattr(obj, "__dict__", {}))
+        _update_hash(h, attrs)
+
+
+def stable_hash(*objs):
+    """ returns the sha256 hexdigest of the canonical representation of objs
+    that does not change between python sessions."""
+    h = hashlib.sha256()
+    _update_hash(h, objs)
+    return h.hexdigest()
+
+
+def referenced_MatIDs(config):
+    """ returns the sorted list of material ids that are used by the
+    segments (layup and core) and the balance weight of a CBMConfig"""
+    ids = set()
+    for seg in config.segments.values():
+        ids.add(int(seg["CoreMaterial"]))
+        layup = np.asarray(seg["Layup"])
+        if layup.ndim == 2 and layup.shape[1] >= 5:
+            ids.update(int(i) for i in layup[:, 4])
+    if config.setup.get("BalanceWeight"):
+        ids.add(int(config.bw["Material"]))
+    ids.discard(0)
+    return sorted(ids)
+
+
+def recovers(cs, solver="vabs"):
+    """ returns True if the solver run of the cross-section cs includes the
+    3D recovery, which assigns the stresses, strains and displacements to
+    the cells and nodes of the mesh in addition to the BeamProperties"""
+    cfg = cs.config.vabs_cfg if solver == "vabs" else cs.config.anbax_cfg
+    return bool(getattr(cfg, "recover_flag", False))
+
+
+class SectionCache(object):
+    """
+    content-addressed on-disk cache of cross-section results
+
+    Attributes
+    ----------
+    directory : str
+        path of the cache directory. It is created if it does not exist.
+    max_size : int
+        maximum size of the cache directory in bytes. (default = 2GB)
+    bypass : bool
+        if True, nothing is read from the cache, but new results are still
+        written to it. This can be used to refresh existing entries.
+        (default = False)
+
+    Examples
+    --------
+    ::
+
+        cache = SectionCache('.sonata_cache', max_size=500e6)
+        job.blade_gen_section(cache=cache)
+        job.blade_run_vabs(cache=cache)
+        cache.invalidate()
+
+    """
+
+    __slots__ = ("directory", "max_size", "bypass")
+
+    def __init__(self, directory=".sonata_cache", max_size=2e9, bypass=False):
+        self.directory = directory
+        self.max_size = int(max_size)
+        self.bypass = bypass
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+    def mesh_key(self, cs, **kwargs):
+        """ returns the key of the topology and mesh of a cross-section. It
+        depends on the geometric part of the configuration, the boundary
+        BSplineLst and the keyword arguments of cbm_gen_mesh.
+        """
+        h = hashlib.sha256(b"mesh")
+        cfg = cs.config
+        _update_hash(h, (cfg.setup, cfg.webs, cfg.segments, cfg.bw, cfg.flags))
+        _update_hash(h, kwargs)
+        if getattr(cs, "BoundaryBSplineLst", None) is not None:
+            _update_hash(h, ParaLst_from_BSplineLst(cs.BoundaryBSplineLst))
+        return h.hexdigest()
+
+    def result_key(self, cs, solver="vabs"):
+        """ returns the key of the BeamProperties of a cross-section. It
+        depends on the mesh (node coordinates, connectivity, MatID and ply
+        angles of every cell), the solver settings and the properties of the
+        referenced materials.
+        """
+        h = hashlib.sha256(b"result")
+        (mesh, nodes) = sort_and_reassignID(cs.mesh)
+        _update_hash(h, np.asarray([n.coordinates for n in nodes], dtype=float))
+        for c in mesh:
+            _update_hash(h, ([n.id for n in c.nodes], c.MatID, c.theta_3, list(c.theta_1)))
+        if solver == "vabs":
+            _update_hash(h, cs.config.vabs_cfg)
+        else:
+            _update_hash(h, cs.config.anbax_cfg)
+        _update_hash(h, solver)
+        _update_hash(h, [cs.materials[i] for i in referenced_MatIDs(cs.config) if i in cs.materials])
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key):
+        """ returns the unpickled entry of key or None if there is no entry
+        (or if the cache is bypassed)."""
+        if self.bypass:
+            return None
+        fname = self._path(key)
+        try:
+            with open(fname, "rb") as handle:
+                value = pkl.load(handle)
+        except (OSError, EOFError, pkl.UnpicklingError):
+            return None
+        os.utime(fname, None)  # mark as recently used
+        return value
+
+    def put(self, key, value):
+        """ stores value under key and evicts the least recently used entries
+        if the cache is too large."""
+        fname = self._path(key)
+        tmp = fname + ".%i.tmp" % os.getpid()
+        with open(tmp, "wb") as output:
+            pkl.dump(value, output, protocol=pkl.HIGHEST_PROTOCOL)
+        os.replace(tmp, fname)
+        self.evict()
+        return None
+
+    def evict(self):
+        """ removes the least recently used entries until the size of the
+        cache directory is below max_size."""
+        entries = []
+        for f in os.listdir(self.directory):
+            if f.endswith(".pkl"):
+                st = os.stat(os.path.join(self.directory, f))
+                entries.append((st.st_mtime, st.st_size, f))
+        size = sum(e[1] for e in entries)
+        for (mtime, fsize, f) in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, f))
+            except OSError:
+                pass
+            size -= fsize
+        return None
+
+    def invalidate(self, cs=None, **kwargs):
+        """ removes the entries of the cross-section cs (topology, mesh and
+        the vabs and anbax results of its current mesh) or the complete cache
+        if cs is None."""
+        if cs is None:
+            keys = [f[:-4] for f in os.listdir(self.directory) if f.endswith(".pkl")]
+        else:
+            keys = [self.mesh_key(cs, **kwargs)]
+            if cs.mesh:
+                keys += [self.result_key(cs, "vabs"), self.result_key(cs, "anbax")]
+        for key in keys:
+            if os.path.exists(self._path(key)):
+                os.remove(self._path(key))
+        return None
+
+    def load_section(self, cs, **kwargs):
+        """ assigns the cached topology and mesh to the cross-section cs.
+        Returns True on a cache hit, False otherwise."""
+        value = self.get(self.mesh_key(cs, **kwargs))
+        if value is None:
+            return False
+        (cs.SegmentLst, cs.WebLst, cs.BW, mesh) = value
+        (cs.mesh, nodes) = sort_and_reassignID(mesh)
+        cs._stage_inputs = {"geometry": cs._cbm_geometry_hash()}
+        cs._cbm_record_mesh_inputs(**kwargs)
+        return True
+
+    def store_section(self, cs, **kwargs):
+        """ stores the topology and mesh of the cross-section cs """
+        self.put(self.mesh_key(cs, **kwargs), (cs.SegmentLst, cs.WebLst, cs.BW, cs.mesh))
+        return None
+
+    def load_results(self, cs, solver="vabs"):
+        """ assigns the cached BeamProperties to the cross-section cs.
+        Returns True on a cache hit, False otherwise. Runs with 3D recovery
+        (see recovers) are never cached, because the recovered fields of
+        the mesh are not part of the entry."""
+        if recovers(cs, solver):
+            return False
+        value = self.get(self.result_key(cs, solver))
+        if value is None:
+            return False
+        cs.BeamProperties = value
+        return True
+
+    def store_results(self, cs, solver="vabs"):
+        """ stores the BeamProperties of the cross-section cs, unless the run
+        included the 3D recovery """
+        if recovers(cs, solver):
+            return None
+        self.put(self.result_key(cs, solver), cs.BeamProperties)
+        return None
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""
+Versioned NPZ checkpoint format of the topology (SegmentLst, WebLst, BW) of
+a cross-section.
+
+Instead of pickling the Segment, Layer and Web instances, all BSplines are
+stored as flat arrays of degrees, poles, weights, knots and multiplicities
+(see Para_Geom2d_BSplineCurve), together with the interval arrays (layup,
+ivLsts) and the metadata of the layers. The archive is written
+uncompressed, so that load_topo_npz can memory-map its arrays. The OCC
+curves and wires of the loaded segments, layers and webs are only built
+when they are accessed for the first time (see LazyAttributes).
+
+topo_to_arrays and topo_from_arrays convert between the topology and the
+dictionary of arrays without the archive, e.g. to send segments to worker
+processes.
+
+Layout (format 'sonata-topo', version 1)
+----------------------------------------
+curve_degree, curve_periodic : (C,)
+curve_poles_offsets, curve_knots_offsets : (C+1,)
+    offsets of each curve into poles/weights and knots/mults
+poles (P,2), weights (P,), knots (K,), mults (K,)
+seg_* : one entry per segment, layer_* : one entry per layer,
+web_* : one entry per web, bw : (0 or 1, 6)
+*_curves : (n,2)
+    [start, stop) range of the curves of a BSplineLst
+<name>_data, <name>_shape : ragged arrays
+    flattened data and the (rows, cols) of each array. cols is -1 for 1D
+    arrays, rows is -1 for None.
+
+@author: TPflumm
+"""
+# Core Library modules
+import struct
+import zipfile
+
+# Third party modules
+import numpy as np
+from OCC.Core.gp import gp_Pnt2d
+
+# First party modules
+from SONATA.cbm.topo.layer import Layer
+from SONATA.cbm.topo.para_Geom2d_BsplineCurve import Para_Geom2d_BSplineCurve
+from SONATA.cbm.topo.projection import relevant_cummulated_layup_boundaries
+from SONATA.cbm.topo.segment import Segment
+from SONATA.cbm.topo.web import Web
+from SONATA.cbm.topo.weight import Weight
+from SONATA.cbm.topo.wire_utils import build_wire_from_BSplineLst
+
+TOPO_FORMAT = "sonata-topo"
+TOPO_VERSION = 1
+
+
+def _opt(value):
+    """ float of value, nan for None """
+    return np.nan if value is None else float(value)
+
+
+def _unopt(value):
+    """ inverse of _opt """
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+class _TopoWriter(object):
+    """ collects the curves, tables and ragged arrays of a topology """
+
+    __slots__ = ("curves", "ragged", "arrays")
+
+    def __init__(self):
+        self.curves = []
+        self.ragged = {}
+        self.arrays = {}
+
+    def add_BSplineLst(self, BSplineLst):
+        """ appends the curves of BSplineLst and returns their [start, stop) range """
+        start = len(self.curves)
+        for item in BSplineLst:
+            self.curves.append(Para_Geom2d_BSplineCurve(item))
+        return (start, len(self.curves))
+
+    def add_ragged(self, name, arr):
+        """ appends the array arr (None, 1D or 2D) to the ragged array name """
+        lst = self.ragged.setdefault(name, [])
+        lst.append(None if arr is None else np.asarray(arr, dtype=float))
+
+    def finalize(self):
+        """ returns the dictionary of arrays that is written to the archive """
+        arrays = dict(self.arrays)
+        arrays["format"] = np.array(TOPO_FORMAT)
+        arrays["version"] = np.array(TOPO_VERSION)
+
+        c = self.curves
+        arrays["curve_degree"] = np.array([p.Degree_bin for p in c], dtype=int)
+        arrays["curve_periodic"] = np.array([p.Periodic_bin for p in c], dtype=bool)
+        arrays["curve_poles_offsets"] = np.cumsum([0] + [len(p.Poles_bin) for p in c]).astype(int)
+        arrays["curve_knots_offsets"] = np.cumsum([0] + [len(p.Knots_bin) for p in c]).astype(int)
+        arrays["poles"] = np.vstack([p.Poles_bin for p in c]) if c else np.empty((0, 2))
+        arrays["weights"] = np.concatenate([p.Weights_bin for p in c]) if c else np.empty(0)
+        arrays["knots"] = np.concatenate([p.Knots_bin for p in c]) if c else np.empty(0)
+        arrays["mults"] = np.concatenate([p.Multiplicities_bin for p in c]).astype(int) if c else np.empty(0, dtype=int)
+
+        for (name, lst) in self.ragged.items():
+            shape = np.empty((len(lst), 2), dtype=int)
+            data = []
+            for (i, arr) in enumerate(lst):
+                if arr is None:
+                    shape[i] = (-1, -1)
+                elif arr.ndim == 2:
+                    shape[i] = arr.shape
+                    data.append(arr.ravel())
+                else:
+                    shape[i] = (arr.size, -1)
+                    data.append(arr.ravel())
+            arrays[name + "_shape"] = shape
+            arrays[name + "_data"] = np.concatenate(data) if data else np.empty(0)
+        return arrays
+
+
+class _TopoReader(object):
+    """ rebuilds the BSplineLsts and ragged arrays from the archive arrays """
+
+    __slots__ = ("arrays", "_offsets")
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self._offsets = {}
+
+    def BSplineLst(self, start, stop):
+        a = self.arrays
+        (po, ko) = (a["curve_poles_offsets"], a["curve_knots_offsets"])
+        BSplineLst = []
+        for i in range(int(start), int(stop)):
+            para = Para_Geom2d_BSplineCurve.from_arrays(
+                a["poles"][po[i] : po[i + 1]],
+                a["weights"][po[i] : po[i + 1]],
+                a["knots"][ko[i] : ko[i + 1]],
+                a["mults"][ko[i] : ko[i + 1]],
+                a["curve_degree"][i],
+                a["curve_periodic"][i],
+            )
+            BSplineLst.append(para.BSplineCurve2d())
+        return BSplineLst
+
+    def lazy_BSplineLst(self, curves):
+        (start, stop) = curves
+        return lambda: self.BSplineLst(start, stop)
+
+    def ragged(self, name, i):
+        """ returns the i-th array of the ragged array name (as copy) """
+        shape = self.arrays[name + "_shape"]
+        if name not in self._offsets:
+            sizes = [0 if r < 0 else (r if c < 0 else r * c) for (r, c) in shape]
+            self._offsets[name] = np.cumsum([0] + sizes)
+        (rows, cols) = shape[i]
+        if rows < 0:
+            return None
+        off = self._offsets[name]
+        data = np.array(self.arrays[name + "_data"][off[i] : off[i + 1]])
+        return data if cols < 0 else data.reshape(rows, cols)
+
+
+def _memmap_npz(filename):
+    """
+    returns the dictionary of the arrays of an uncompressed npz file. The
+    larger arrays are memory-mapped, the small ones are read. Returns None
+    if the archive is compressed or contains object arrays.
+    """
+    with zipfile.ZipFile(filename) as zf:
+        infos = zf.infolist()
+    arrays = {}
+    with open(filename, "rb") as f:
+        for info in infos:
+            if info.compress_type != zipfile.ZIP_STORED or not info.filename.endswith(".npy"):
+                return None
+            f.seek(info.header_offset)
+            (n, m) = struct.unpack("<HH", f.read(30)[26:30])
+            offset = info.header_offset + 30 + n + m
+            f.seek(offset)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                (shape, fortran, dtype) = np.lib.format.read_array_header_1_0(f)
+            else:
+                (shape, fortran, dtype) = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                return None
+            name = info.filename[:-4]
+            if len(shape) == 0 or np.prod(shape) * dtype.itemsize < 4096:
+                f.seek(offset)
+                arrays[name] = np.lib.format.read_array(f)
+            else:
+                order = "F" if fortran else "C"
+                arrays[name] = np.memmap(filename, dtype=dtype, mode="r", offset=f.tell(), shape=shape, order=order)
+    return arrays
+
+
+def topo_to_arrays(SegmentLst, WebLst=None, BW=None):
+    """
+    returns the topology (SegmentLst, WebLst and BW) as dictionary of
+    arrays in the versioned NPZ topology format.
+    """
+    WebLst = WebLst or []
+    w = _TopoWriter()
+    a = w.arrays
+
+    # SEGMENTS
+    a["seg_ID"] = np.array([seg.ID for seg in SegmentLst], dtype=int)
+    a["seg_CoreMaterial"] = np.array([_opt(seg.CoreMaterial) for seg in SegmentLst])
+    a["seg_Theta"] = np.array([_opt(seg.Theta) for seg in SegmentLst])
+    a["seg_scale_factor"] = np.array([_opt(seg.scale_factor) for seg in SegmentLst])
+    a["seg_curves"] = np.array([w.add_BSplineLst(seg.BSplineLst) for seg in SegmentLst], dtype=int).reshape(-1, 2)
+    for seg in SegmentLst:
+        w.add_ragged("seg_Layup", seg.Layup)
+        w.add_ragged("seg_boundary_ivLst", seg.boundary_ivLst)
+        w.add_ragged("seg_final_Boundary_ivLst", seg.final_Boundary_ivLst)
+        w.add_ragged("seg_inv_cumivLst", seg.inv_cumivLst)
+
+    # LAYERS
+    layers = [(i, layer) for (i, seg) in enumerate(SegmentLst) for layer in seg.LayerLst]
+    a["layer_segment"] = np.array([i for (i, layer) in layers], dtype=int)
+    a["layer_ID"] = np.array([layer.ID for (i, layer) in layers], dtype=int)
+    a["layer_props"] = np.array([[layer.S1, layer.S2, layer.thickness, layer.Orientation] for (i, layer) in layers], dtype=float).reshape(-1, 4)
+    a["layer_styles"] = np.array([[layer.MatID, layer.cutoff_style, layer.join_style] for (i, layer) in layers], dtype=int).reshape(-1, 3)
+    a["layer_name"] = np.array([str(layer.name) for (i, layer) in layers], dtype=str)
+    a["layer_curves"] = np.array([w.add_BSplineLst(layer.BSplineLst) for (i, layer) in layers], dtype=int).reshape(-1, 2)
+    a["layer_bcurves"] = np.array([w.add_BSplineLst(layer.Boundary_BSplineLst) for (i, layer) in layers], dtype=int).reshape(-1, 2)
+    for (i, layer) in layers:
+        w.add_ragged("layer_ivLst", layer.ivLst)
+        w.add_ragged("layer_cumA_ivLst", layer.cumA_ivLst)
+        w.add_ragged("layer_cumB_ivLst", layer.cumB_ivLst)
+        w.add_ragged("layer_inverse_ivLst", layer.inverse_ivLst)
+
+    # WEBS
+    a["web_ID"] = np.array([web.ID for web in WebLst], dtype=int)
+    a["web_props"] = np.array([[web.Pos1, web.Pos2, web.curvature] for web in WebLst], dtype=float).reshape(-1, 3)
+    a["web_Pnt2d"] = np.array([web.Pos1_Pnt2d.Coord() + web.Pos2_Pnt2d.Coord() for web in WebLst], dtype=float).reshape(-1, 4)
+    a["web_curves"] = np.array([w.add_BSplineLst(web.BSplineLst) for web in WebLst], dtype=int).reshape(-1, 2)
+
+    # BALANCE WEIGHT
+    if BW is None:
+        a["bw"] = np.empty((0, 6))
+    else:
+        a["bw"] = np.array([[BW.ID, BW.Pnt2d.X(), BW.Pnt2d.Y(), BW.D, BW.MatID, BW.style]], dtype=float)
+    return w.finalize()
+
+
+def save_topo_npz(filename, SegmentLst, WebLst=None, BW=None):
+    """
+    writes the topology (SegmentLst, WebLst and BW) to the uncompressed
+    archive filename in the versioned NPZ topology format.
+    """
+    with open(filename, "wb") as f:
+        np.savez(f, **topo_to_arrays(SegmentLst, WebLst, BW))
+    return None
+
+
+def load_topo_npz(filename, mmap=True):
+    """
+    reads a topology that was written by save_topo_npz and returns
+    (SegmentLst, WebLst, BW). The OCC curves and wires of the segments,
+    layers and webs are built on first access.
+
+    Parameters
+    ----------
+    filename : str
+    mmap : bool, optional
+        memory-map the arrays of the archive instead of reading them.
+    """
+    arrays = _memmap_npz(filename) if mmap else None
+    if arrays is None:
+        with np.load(filename) as npz:
+            arrays = {k: npz[k] for k in npz.files}
+
+    if str(arrays.get("format", "")) != TOPO_FORMAT:
+        raise ValueError("%s is not a SONATA topology file" % filename)
+    if int(arrays["version"]) > TOPO_VERSION:
+        raise ValueError("topology file version %i is newer than the supported version %i" % (int(arrays["version"]), TOPO_VERSION))
+    return topo_from_arrays(arrays)
+
+
+def topo_from_arrays(arrays):
+    """
+    rebuilds (SegmentLst, WebLst, BW) from the dictionary of arrays of
+    topo_to_arrays. The OCC curves and wires of the segments, layers and
+    webs are built on first access.
+    """
+    r = _TopoReader(arrays)
+
+    # SEGMENTS
+    SegmentLst = []
+    for i in range(len(arrays["seg_ID"])):
+        seg = Segment.__new__(Segment)
+        Layup = r.ragged("seg_Layup", i)
+        seg.__dict__.update(
+            Segment0=None,
+            WebLst=None,
+            ID=int(arrays["seg_ID"][i]),
+            Layup=Layup,
+            CoreMaterial=_unopt(arrays["seg_CoreMaterial"][i]),
+            OCC=True,
+            Theta=_unopt(arrays["seg_Theta"][i]),
+            scale_factor=_unopt(arrays["seg_scale_factor"][i]),
+            LayerLst=[],
+            cells=[],
+            l_cells=[],
+            c_cells=[],
+            boundary_ivLst=r.ragged("seg_boundary_ivLst", i),
+            inv_cumivLst=r.ragged("seg_inv_cumivLst", i),
+            final_Boundary_ivLst=r.ragged("seg_final_Boundary_ivLst", i),
+            Projection=relevant_cummulated_layup_boundaries(Layup),
+        )
+        seg._lazy = {
+            "BSplineLst": r.lazy_BSplineLst(arrays["seg_curves"][i]),
+            "wire": (lambda seg=seg: build_wire_from_BSplineLst(seg.BSplineLst)),
+            "final_Boundary_BSplineLst": (lambda seg=seg: seg.ivLst_to_BSplineLst(seg.final_Boundary_ivLst)),
+        }
+        SegmentLst.append(seg)
+
+    # LAYERS
+    for j in range(len(arrays["layer_ID"])):
+        layer = Layer.__new__(Layer)
+        (S1, S2, thickness, Orientation) = arrays["layer_props"][j].tolist()
+        (MatID, cutoff_style, join_style) = arrays["layer_styles"][j].tolist()
+        layer.__dict__.update(
+            ID=int(arrays["layer_ID"][j]),
+            S1=S1,
+            S2=S2,
+            thickness=thickness,
+            Orientation=Orientation,
+            MatID=MatID,
+            name=str(arrays["layer_name"][j]),
+            cutoff_style=cutoff_style,
+            join_style=join_style,
+            cells=[],
+            a_nodes=[],
+            b_nodes=[],
+            ivLst=r.ragged("layer_ivLst", j),
+            cumA_ivLst=r.ragged("layer_cumA_ivLst", j),
+            cumB_ivLst=r.ragged("layer_cumB_ivLst", j),
+            inverse_ivLst=r.ragged("layer_inverse_ivLst", j),
+        )
+        layer._lazy = {
+            "BSplineLst": r.lazy_BSplineLst(arrays["layer_curves"][j]),
+            "Boundary_BSplineLst": r.lazy_BSplineLst(arrays["layer_bcurves"][j]),
+            "wire": (lambda layer=layer: build_wire_from_BSplineLst(layer.BSplineLst)),
+        }
+        SegmentLst[int(arrays["layer_segment"][j])].LayerLst.append(layer)
+
+    # WEBS
+    WebLst = []
+    for k in range(len(arrays["web_ID"])):
+        web = Web.__new__(Web)
+        (Pos1, Pos2, curvature) = arrays["web_props"][k].tolist()
+        pnts = arrays["web_Pnt2d"][k].tolist()
+        web.__dict__.update(ID=int(arrays["web_ID"][k]), Pos1=Pos1, Pos2=Pos2, curvature=curvature, wr_nodes=[], wl_nodes=[], wr_cells=[], wl_cells=[])
+        web._lazy = {
+            "BSplineLst": r.lazy_BSplineLst(arrays["web_curves"][k]),
+            "Pos1_Pnt2d": (lambda pnts=pnts: gp_Pnt2d(pnts[0], pnts[1])),
+            "Pos2_Pnt2d": (lambda pnts=pnts: gp_Pnt2d(pnts[2], pnts[3])),
+        }
+        WebLst.append(web)
+
+    for seg in SegmentLst[1:]:
+        seg.Segment0 = SegmentLst[0]
+        seg.WebLst = WebLst
+
+    # BALANCE WEIGHT
+    BW = None
+    if len(arrays["bw"]):
+        (ID, x, y, D, MatID, style) = arrays["bw"][0].tolist()
+        BW = Weight(int(ID), gp_Pnt2d(x, y), D, int(MatID), int(style))
+
+    return (SegmentLst, WebLst, BW)
@@ -22,7 +22,7 @@ from SONATA.cbm.topo.utils import (PolygonArea, calc_angle_between,
 
 
 class Cell(object):
-    __slots__ = ("id", "nodes", "theta_1", "theta_3", "MatID", "structured", "interior_nodes", "strain", "strainM", "stress", "stressM", "sf", "failure_mode")
+    __slots__ = ("id", "nodes", "theta_1", "theta_3", "MatID", "LayerID", "structured", "interior_nodes", "strain", "strainM", "stress", "stressM", "sf", "failure_mode")
     class_counter = 1
 
     def __init__(self, nodeLst):  # int
@@ -40,6 +40,7 @@ class Cell(object):
         self.theta_3 = None  # The Ply coordiate system is rotated about y3 in the right hand sense by the amount -90<Theta_3<90 to for the material system.
 
         self.MatID = None  # material id,
+        self.LayerID = None  # id of the layer the cell belongs to, None for core and balance weight cells
         self.structured = True
         self.interior_nodes = []
         # Element quality critiria
@@ -96,11 +97,12 @@ class Cell(object):
 
     def __getstate__(self):
         """Return state values to be pickled."""
-        return (self.id, self.nodes, self.theta_3, self.MatID, self.theta_1, self.structured, self.interior_nodes)
+        return (self.id, self.nodes, self.theta_3, self.MatID, self.theta_1, self.structured, self.interior_nodes, self.LayerID)
 
     def __setstate__(self, state):
         """Restore state from the unpickled state values."""
-        self.id, self.nodes, self.theta_3, self.MatID, self.theta_1, self.structured, self.interior_nodes = state
+        self.id, self.nodes, self.theta_3, self.MatID, self.theta_1, self.structured, self.interior_nodes = state[:7]
+        self.LayerID = state[7] if len(state) > 7 else None
         # self.wire = self.build_wire()
 
     def split_quads(self):
@@ -114,6 +116,7 @@ class Cell(object):
             newcell.theta_1 = self.theta_1
             newcell.theta_3 = self.theta_3
             newcell.MatID = self.MatID
+            newcell.LayerID = self.LayerID
             self.nodes = [self.nodes[0], self.nodes[1], self.nodes[2]]
             return [self, newcell]
         else:
@@ -11,13 +11,14 @@ Created on Thu Nov 02 10:46:29 2017
 """
 
 # Third party modules
-import numpy as np
 from OCC.Core.gp import gp_Vec2d
 
 # First party modules
 from SONATA.cbm.display.display_utils import display_custome_shape
 from SONATA.cbm.mesh.cell import Cell
-from SONATA.cbm.mesh.mesh_utils import find_cells_that_contain_node
+from SONATA.cbm.mesh.mesh_utils import node_coordinates
+from SONATA.cbm.mesh.node_search import match_node_pairs
+from SONATA.utl.trace import current_span
 
 
 def consolidate_mesh_on_web(web, w_tol, display=None):
@@ -45,39 +46,37 @@ def consolidate_mesh_on_web(web, w_tol, display=None):
     mesh = web.wl_cells + web.wr_cells
 
     # Generate NodeMatching Matrix [NM]
-    tmp = [[w1.Pnt2d.Distance(w2.Pnt2d), w1.id, w2.id] for w1 in w1_nodes for w2 in w2_nodes]
-    tmp = np.asarray(tmp)
-
-    NM = tmp[tmp[:, 0] < w_tol]
-    NM = NM[NM[:, 0].argsort()]
-
-    # remove possible double nodes in NodeMatching Matrix
-    tmp, tmp_idx = np.unique(NM[:, 1], True, axis=0)
-    tmp_idx.sort(axis=0)
-    NM = NM[tmp_idx]
-    tmp, tmp_idx = np.unique(NM[:, 2], True, axis=0)
-    tmp_idx.sort(axis=0)
-    NM = NM[tmp_idx]
+    NM = match_node_pairs(node_coordinates(w1_nodes), [w1.id for w1 in w1_nodes], node_coordinates(w2_nodes), [w2.id for w2 in w2_nodes], w_tol)
 
     # MERGE Nodes according to NodeMatching(NM) Matrix:
+    w1_by_id = {}
+    for x in reversed(w1_nodes):
+        w1_by_id[x.id] = x
+    w2_by_id = {}
+    for x in reversed(w2_nodes):
+        w2_by_id[x.id] = x
+
+    replace = {}
     for match in NM:
         # print int(match[1]),int(match[2])
-        n1 = [x for x in w1_nodes if x.id == match[1]][0]
-        n2 = [x for x in w2_nodes if x.id == match[2]][0]
+        n1 = w1_by_id[match[1]]
+        n2 = w2_by_id[match[2]]
         # move the first node to the middle!
-        n1.Pnt2d
         v = gp_Vec2d(n1.Pnt2d, n2.Pnt2d)
         v.Multiply(0.5)
         n1.Pnt2d.Translate(v)
+        replace[n2.id] = n1
 
-        # find all cells that contain n2 and replace it with n1
-        disco_cells = find_cells_that_contain_node(mesh, n2)
-        for c in disco_cells:
-            c.nodes = [n1 if x == n2 else x for x in c.nodes]
+    # replace the matched w2 nodes with their w1 node in one pass over the cells
+    for c in mesh:
+        if any(x.id in replace for x in c.nodes):
+            c.nodes = [replace.get(x.id, x) for x in c.nodes]
+    current_span().count("merged_nodes", len(NM))
 
     # determine ramaining w1 and w2_nodes. If w1_node.id is not in NM[:,1]
-    rem_w1_nodes = [w1 for w1 in w1_nodes if w1.id not in NM[:, 1]]
-    rem_w2_nodes = [w2 for w2 in w2_nodes if w2.id not in NM[:, 2]]
+    (matched_w1, matched_w2) = (set(NM[:, 1].tolist()), set(NM[:, 2].tolist()))
+    rem_w1_nodes = [w1 for w1 in w1_nodes if w1.id not in matched_w1]
+    rem_w2_nodes = [w2 for w2 in w2_nodes if w2.id not in matched_w2]
 
     #    if display !=  None:
     #        for n in rem_w1_nodes:
@@ -162,6 +161,7 @@ def split_cells_to_consolidate(cells, rem_nodes, display):
             tc.theta_1 = c.theta_1
             tc.theta_3 = c.theta_3
             tc.MatID = c.MatID
+            tc.LayerID = c.LayerID
         newcells.extend(tmp_newcells)
 
     return newcells
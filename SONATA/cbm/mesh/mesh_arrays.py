@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Struct-of-arrays representation of a cross-section mesh.
+
+@author: TPflumm
+"""
+# Third party modules
+import numpy as np
+from OCC.Core.gp import gp_Pnt2d
+
+# First party modules
+from SONATA.cbm.mesh.cell import Cell
+from SONATA.cbm.mesh.node import Node
+from SONATA.vabs.classStrain import Strain
+from SONATA.vabs.classStress import Stress
+
+MAX_CELL_NODES = 8
+
+
+class MeshArrays(object):
+    """
+    mesh of a cross-section as plain numpy arrays instead of a list of Cell
+    instances that hold Node instances. The node of row i has the id i+1
+    and the cell of row j has the id j+1, like after sort_and_reassignID.
+    The exporters (export_cells_for_VABS, build_dolfin_mesh), plot_cells,
+    sort_and_reassignID and CBM.cbm_calc_failurecriteria accept a
+    MeshArrays instance instead of the list of cells.
+
+    Attributes
+    ----------
+    nodes : ndarray
+        (N,2) float64 node coordinates
+    cells : ndarray
+        (M,8) int connectivity with zero based node indices, padded with -1
+    MatID : ndarray
+        (M,) int material ids
+    theta_1 : ndarray
+        (M,9) float ply plane angles (see Cell.calc_theta_1)
+    theta_3 : ndarray
+        (M,) float fiber orientations, nan if undefined
+    structured : ndarray
+        (M,) bool, False for the core cells
+    LayerID : ndarray
+        (M,) int id of the layer of each cell, -1 for core and balance
+        weight cells
+    displacement : ndarray
+        (N,3) float displacement of the nodes, nan if undefined
+    strainM, stressM : ndarray or None
+        (M,3,3) strain and stress tensors in the material coordinate system
+        if they are defined for all cells
+    sf : ndarray or None
+        (M,) safety factors of the failure criteria
+    failure_mode : ndarray or None
+        (M,) failure modes of the failure criteria
+
+    Examples
+    --------
+    ::
+
+        arrays = MeshArrays.from_cells(job.mesh)
+        export_cells_for_VABS(arrays, arrays.nodes, 'section.vab', VABSConfig(), job.materials)
+        (cells, nodes) = arrays.to_cells()
+
+    """
+
+    __slots__ = ("nodes", "cells", "MatID", "theta_1", "theta_3", "structured", "LayerID", "displacement", "strainM", "stressM", "sf", "failure_mode")
+
+    def __init__(self, nodes, cells, MatID=None, theta_1=None, theta_3=None, structured=None, LayerID=None):
+        self.nodes = np.asarray(nodes, dtype=float).reshape(-1, 2)
+        cells = np.asarray(cells, dtype=int).reshape(len(cells), -1) if len(cells) else np.empty((0, 0), dtype=int)
+        self.cells = np.full((len(cells), MAX_CELL_NODES), -1, dtype=int)
+        self.cells[:, : cells.shape[1]] = cells
+        m = len(self.cells)
+        self.MatID = np.full(m, -1, dtype=int) if MatID is None else np.asarray(MatID, dtype=int)
+        self.theta_1 = np.zeros((m, 9)) if theta_1 is None else np.asarray(theta_1, dtype=float)
+        self.theta_3 = np.full(m, np.nan) if theta_3 is None else np.asarray(theta_3, dtype=float)
+        self.structured = np.ones(m, dtype=bool) if structured is None else np.asarray(structured, dtype=bool)
+        self.LayerID = np.full(m, -1, dtype=int) if LayerID is None else np.asarray(LayerID, dtype=int)
+        self.displacement = np.full((len(self.nodes), 3), np.nan)
+        self.strainM = None
+        self.stressM = None
+        self.sf = None
+        self.failure_mode = None
+
+    def __repr__(self):
+        return "<MeshArrays: %i nodes, %i cells>" % (self.n_nodes, self.n_cells)
+
+    def __len__(self):
+        return self.n_cells
+
+    @property
+    def n_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def n_cells(self):
+        return len(self.cells)
+
+    @property
+    def nodes_per_cell(self):
+        """ (M,) number of nodes of every cell """
+        return np.count_nonzero(self.cells >= 0, axis=1)
+
+    @property
+    def theta_11(self):
+        return self.theta_1[:, 0]
+
+    def cell_data(self, attr):
+        """ returns the cell attribute attr (e.g. 'MatID', 'theta_3',
+        'stressM.sigma11') as array """
+        if "." in attr:
+            (tensor, component) = attr.split(".")
+            tmp = Strain() if tensor == "strainM" else Stress()
+            values = []
+            for t in getattr(self, tensor):
+                tmp.tensor = np.array(t)
+                values.append(getattr(tmp, component))
+            return np.asarray(values)
+        return np.asarray(getattr(self, attr))
+
+    @classmethod
+    def from_cells(cls, cells, nodes=None):
+        """
+        creates the MeshArrays from a list of Cell instances. The nodes and
+        cells are ordered by their ids, as in sort_and_reassignID, but the ids
+        of the objects are not changed.
+
+        Parameters
+        ----------
+        cells : list
+            list of Cell instances
+        nodes : list, optional
+            the list of nodes of the cells. The default collects the nodes
+            of the cells.
+        """
+        cells = sorted(cells, key=lambda c: c.id)
+        if nodes is None:
+            nodes = {id(n): n for c in cells for n in c.nodes}.values()
+        nodes = sorted(nodes, key=lambda n: n.id)
+        index = {id(n): i for (i, n) in enumerate(nodes)}
+
+        conn = np.full((len(cells), MAX_CELL_NODES), -1, dtype=int)
+        for (j, c) in enumerate(cells):
+            conn[j, : len(c.nodes)] = [index[id(n)] for n in c.nodes]
+
+        self = cls(
+            [(n.Pnt2d.X(), n.Pnt2d.Y()) for n in nodes],
+            conn,
+            MatID=[-1 if c.MatID is None else c.MatID for c in cells],
+            theta_1=[c.theta_1 for c in cells],
+            theta_3=[np.nan if c.theta_3 is None else c.theta_3 for c in cells],
+            structured=[c.structured for c in cells],
+            LayerID=[-1 if c.LayerID is None else c.LayerID for c in cells],
+        )
+        self.displacement = np.array([[np.nan if d is None else d for d in n.displacement] for n in nodes], dtype=float).reshape(-1, 3)
+
+        for attr in ("strainM", "stressM"):
+            tensors = [getattr(c, attr, None) for c in cells]
+            if cells and all(t is not None for t in tensors):
+                setattr(self, attr, np.array([t.tensor for t in tensors]))
+        sf = [getattr(c, "sf", None) for c in cells]
+        if cells and all(s is not None for s in sf):
+            self.sf = np.asarray(sf, dtype=float)
+            self.failure_mode = np.array([getattr(c, "failure_mode", None) for c in cells], dtype=object)
+        return self
+
+    def to_cells(self):
+        """
+        creates Node and Cell instances with the ids 1..N and 1..M from the
+        arrays
+
+        Returns
+        -------
+        (cells, nodes) : tuple of lists
+        """
+        nodes = []
+        for (i, xy) in enumerate(self.nodes.tolist()):
+            n = Node(gp_Pnt2d(xy[0], xy[1]))
+            n.id = i + 1
+            d = self.displacement[i]
+            if not np.isnan(d).all():
+                n.displacement = d.tolist()
+            nodes.append(n)
+
+        cells = []
+        nodes_per_cell = self.nodes_per_cell
+        for j in range(self.n_cells):
+            c = Cell([nodes[k] for k in self.cells[j, : nodes_per_cell[j]]])
+            c.id = j + 1
+            c.MatID = None if self.MatID[j] < 0 else int(self.MatID[j])
+            c.theta_1 = self.theta_1[j].tolist()
+            c.theta_3 = None if np.isnan(self.theta_3[j]) else float(self.theta_3[j])
+            c.structured = bool(self.structured[j])
+            c.LayerID = None if self.LayerID[j] < 0 else int(self.LayerID[j])
+            if self.strainM is not None:
+                c.strainM = Strain()
+                c.strainM.tensor = np.array(self.strainM[j])
+            if self.stressM is not None:
+                c.stressM = Stress()
+                c.stressM.tensor = np.array(self.stressM[j])
+            if self.sf is not None:
+                c.sf = float(self.sf[j])
+                c.failure_mode = self.failure_mode[j]
+            cells.append(c)
+        return (cells, nodes)
@@ -5,13 +5,11 @@ Created on Tue Mar 28 09:58:14 2017
 @author: TPflumm
 """
 # Core Library modules
-import itertools
 import math
 
 # Third party modules
 import numpy as np
-from OCC.Core.Geom2dAPI import (Geom2dAPI_PointsToBSpline,
-                                Geom2dAPI_ProjectPointOnCurve,)
+from OCC.Core.Geom2dAPI import Geom2dAPI_PointsToBSpline
 from OCC.Core.gp import gp_Pnt, gp_Pnt2d, gp_Vec, gp_Vec2d
 from OCC.Display.SimpleGui import init_display
 
@@ -21,7 +19,8 @@ from SONATA.cbm.mesh.cell import Cell
 from SONATA.cbm.mesh.node import Node
 from SONATA.cbm.topo.BSplineLst_utils import (
     ProjectPointOnBSplineLst, find_BSplineLst_coordinate, get_BSplineLst_length,
-    get_BSplineLst_Pnt2d, intersect_BSplineLst_with_BSpline,)
+    get_BSplineLst_Pnt2d, intersect_BSplineLst_with_BSpline,
+    project_Pnts_on_BSplineLst,)
 from SONATA.cbm.topo.utils import point2d_list_to_TColgp_Array1OfPnt2d
 
 
@@ -48,6 +47,9 @@ def mesh_by_projecting_nodes_on_BSplineLst(a_BSplineLst, a_nodes, b_BSplineLst,
     
     Notes & Comments:
     ----------  
+    All nodes are projected at once with project_Pnts_on_BSplineLst, 
+    including the removal of coincident projection points.
+
     TODO: * scale distance not only to layerthickenss but also to min_len.
             or adapt the distance individually for each node. 
     """
@@ -74,43 +76,18 @@ def mesh_by_projecting_nodes_on_BSplineLst(a_BSplineLst, a_nodes, b_BSplineLst,
     else:
         prj_nodes = a_nodes[1:-1]
 
+    u_tol = 2e-6 * refL
+    unique_tol = 5e-5 * refL
+    prj = project_Pnts_on_BSplineLst(b_BSplineLst, [n.coordinates for n in prj_nodes], distance, u_tol, unique_tol)
+
     for i, node in enumerate(prj_nodes, start=1):
         Pnt2d = node.Pnt2d
-        pPnts = []
-        pPara = []
-        pIdx = []
-
-        for idx, item in enumerate(b_BSplineLst):
-            first = item.FirstParameter()
-            last = item.LastParameter()
-            tol = 2e-6 * refL
-            Umin = first - (last - first) * tol
-            Umax = last + (last - first) * tol
-            projection = Geom2dAPI_ProjectPointOnCurve(Pnt2d, item, Umin, Umax)
-            # projection = Geom2dAPI_ProjectPointOnCurve(Pnt2d,item)
-
-            for j in range(1, projection.NbPoints() + 1):
-                if projection.Distance(j) <= distance:
-                    pPnts.append(projection.Point(j))
-                    pPara.append(projection.Parameter(j))
-                    pIdx.append(idx)
-                else:
-                    None
+        pPnts = [p[0] for p in prj[i - 1]]
+        pPara = [p[2] for p in prj[i - 1]]
+        pIdx = [p[1] for p in prj[i - 1]]
 
         # display.DisplayShape(pPnts[0], color='GREEN')
 
-        # ==================making sure the pPnts are unique:
-        """It happend that somehow the same points were found multiple times"""
-        unique_tol = 5e-5 * refL
-        rm_idx = []
-        for a, b in itertools.combinations(enumerate(pPnts), 2):
-            if a[1].IsEqual(b[1], unique_tol):
-                rm_idx.append(a[0])
-
-        pPnts = [j for k, j in enumerate(pPnts) if k not in rm_idx]
-        pPara = [j for k, j in enumerate(pPara) if k not in rm_idx]
-        pIdx = [j for k, j in enumerate(pIdx) if k not in rm_idx]
-
         # =========if 3 Points are found. Select the 2 points that create the larger angle.
         if len(pPnts) == 3:
             v0 = gp_Vec2d(Pnt2d, pPnts[0])
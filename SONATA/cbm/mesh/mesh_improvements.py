@@ -13,6 +13,7 @@ from OCC.Core.gp import gp_Pnt2d, gp_Vec2d
 
 # First party modules
 from SONATA.cbm.mesh.cell import Cell
+from SONATA.cbm.mesh.mesh_index import MeshIndex
 from SONATA.cbm.mesh.mesh_utils import (move_node_on_BSplineLst,
                                         theta_1_from_2nodes,)
 from SONATA.cbm.mesh.node import Node
@@ -235,6 +236,7 @@ def second_stage_improvements(cells, b_BSplineLst, global_minLen, LayerID=0, fac
     if kw.get("display") != None:
         display = kw.get("display")
 
+    index = MeshIndex(cells)
     enhanced_cells2 = []
     new_b_nodes = []
     for i, c in enumerate(cells):
@@ -260,6 +262,7 @@ def second_stage_improvements(cells, b_BSplineLst, global_minLen, LayerID=0, fac
                 # Append last triangle
                 enhanced_cells2.append(Cell([nodeLst[3], newNode, nodeLst[2]]))
                 enhanced_cells2[-1].calc_theta_1()
+                index.split_cell(c, enhanced_cells2[-3:])
 
             # MERGE NODES when to small
             elif magnitude <= factor2 * global_minLen and c.nodes[1].corner == False and c.nodes[2].corner == False:
@@ -272,12 +275,12 @@ def second_stage_improvements(cells, b_BSplineLst, global_minLen, LayerID=0, fac
                 nodeLst[2].Pnt2d = p2[0]
                 nodeLst[2].parameters = [LayerID, p2[1], p2[2]]
                 # MODIFY EXISTING CELL
-                c.nodes = [nodeLst[0], nodeLst[2], nodeLst[3]]
+                index.set_cell_nodes(c, [nodeLst[0], nodeLst[2], nodeLst[3]])
                 c.theta_1 = theta_1_from_2nodes(nodeLst[0], nodeLst[3])
                 enhanced_cells2.append(c)
 
-                # MODIFY Last CELL
-                cells[i - 1].nodes[2] = nodeLst[2]
+                # MODIFY the neighbouring cells that contain the merged node
+                index.merge_nodes(nodeLst[1], nodeLst[2])
 
             else:
                 enhanced_cells2.append(c)
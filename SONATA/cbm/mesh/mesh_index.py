@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Adjacency index of a mesh for constant time node and cell lookups.
+
+@author: TPflumm
+"""
+
+
+def _edge_key(n1, n2):
+    return (n1.id, n2.id) if n1.id <= n2.id else (n2.id, n1.id)
+
+
+class MeshIndex(object):
+    """
+    adjacency index of a list of cells: node id -> node, node id -> cells
+    and edge -> cells. Nodes are identified by their id, like in
+    Node.__eq__. The index is built once and kept up to date with
+    add_cell, remove_cell, set_cell_nodes, split_cell and merge_nodes. After
+    the ids were reassigned (e.g. by sort_and_reassignID) it is rebuilt with
+    renumber.
+
+    find_cells_that_contain_node and find_node_by_ID accept a MeshIndex
+    instead of the list of cells or nodes.
+
+    Attributes
+    ----------
+    nodes : dict
+        node id -> node (the first registered node of that id)
+    node_cells : dict
+        node id -> list of cells that contain the node
+    edge_cells : dict
+        (id1, id2) with id1 <= id2 -> list of cells that contain the edge
+
+    Examples
+    --------
+    ::
+
+        index = MeshIndex(cells)
+        index.cells_of_node(node)
+        index.split_cell(c, [c, newcell])
+        index.merge_nodes(n1, n2)
+    """
+
+    __slots__ = ("nodes", "node_cells", "edge_cells", "_cell_nodes")
+
+    def __init__(self, cells=(), nodes=()):
+        self.nodes = {}
+        self.node_cells = {}
+        self.edge_cells = {}
+        self._cell_nodes = {}  # id(cell) -> (cell, nodes when indexed)
+        for n in nodes:
+            self.add_node(n)
+        for c in cells:
+            self.add_cell(c)
+
+    def __repr__(self):
+        return "<MeshIndex: %i nodes, %i cells>" % (len(self.nodes), len(self._cell_nodes))
+
+    def __len__(self):
+        return len(self._cell_nodes)
+
+    def __contains__(self, cell):
+        return id(cell) in self._cell_nodes
+
+    @property
+    def cells(self):
+        return [c for (c, nodes) in self._cell_nodes.values()]
+
+    def add_node(self, node):
+        if node.id not in self.nodes:
+            self.nodes[node.id] = node
+
+    def add_cell(self, cell):
+        """ adds the cell and its nodes to the index """
+        nodes = tuple(cell.nodes)
+        self._cell_nodes[id(cell)] = (cell, nodes)
+        for n in nodes:
+            self.add_node(n)
+            lst = self.node_cells.setdefault(n.id, [])
+            if not any(c is cell for c in lst):
+                lst.append(cell)
+        for i in range(len(nodes)):
+            self.edge_cells.setdefault(_edge_key(nodes[i - 1], nodes[i]), []).append(cell)
+
+    def remove_cell(self, cell):
+        """ removes the cell with the nodes it had when it was indexed """
+        (cell, nodes) = self._cell_nodes.pop(id(cell))
+        for n in set(n.id for n in nodes):
+            self.node_cells[n] = [c for c in self.node_cells[n] if c is not cell]
+        for i in range(len(nodes)):
+            key = _edge_key(nodes[i - 1], nodes[i])
+            self.edge_cells[key] = [c for c in self.edge_cells[key] if c is not cell]
+
+    def set_cell_nodes(self, cell, nodeLst):
+        """ changes the nodes of an indexed cell """
+        self.remove_cell(cell)
+        cell.nodes = nodeLst
+        self.add_cell(cell)
+
+    def split_cell(self, cell, new_cells):
+        """ replaces the cell by new_cells, which may contain the modified cell
+        itself """
+        self.remove_cell(cell)
+        for c in new_cells:
+            self.add_cell(c)
+
+    def merge_nodes(self, node, into):
+        """ replaces node by into in all cells that contain node and returns
+        these cells """
+        cells = list(self.node_cells.get(node.id, []))
+        for c in cells:
+            self.set_cell_nodes(c, [into if n == node else n for n in c.nodes])
+        if self.nodes.get(node.id) is node:
+            del self.nodes[node.id]
+        return cells
+
+    def renumber(self):
+        """ rebuilds the index after the ids of the nodes were reassigned """
+        cells = self.cells
+        nodes = list(self.nodes.values())
+        (self.nodes, self.node_cells, self.edge_cells, self._cell_nodes) = ({}, {}, {}, {})
+        for n in nodes:
+            self.add_node(n)
+        for c in cells:
+            self.add_cell(c)
+
+    def find_node(self, ID):
+        return self.nodes.get(ID)
+
+    def cells_of_node(self, node):
+        return list(self.node_cells.get(node.id, []))
+
+    def cells_of_edge(self, n1, n2):
+        return list(self.edge_cells.get(_edge_key(n1, n2), []))
+
+    def neighbours(self, cell):
+        """ returns the cells that share an edge with the cell """
+        nodes = cell.nodes
+        neighbours = []
+        for i in range(len(nodes)):
+            for c in self.edge_cells.get(_edge_key(nodes[i - 1], nodes[i]), []):
+                if c is not cell and not any(c is x for x in neighbours):
+                    neighbours.append(c)
+        return neighbours
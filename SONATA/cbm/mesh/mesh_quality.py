@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized quality metrics of a cross-section mesh.
+
+@author: TPflumm
+"""
+# Third party modules
+import numpy as np
+
+# First party modules
+from SONATA.cbm.mesh.mesh_arrays import MeshArrays
+
+QUALITY_METRICS = ("area", "min_angle", "max_angle", "aspect_ratio", "jacobian_ratio", "skew")
+
+
+class MeshQuality(object):
+    """
+    result of mesh_quality
+
+    Attributes
+    ----------
+    table : ndarray
+        structured array with one row per cell and the fields id, nodes,
+        area, orientation, min_angle, max_angle, aspect_ratio,
+        jacobian_ratio and skew
+    histograms : dict
+        (counts, bin_edges) of every metric in QUALITY_METRICS
+    offending : list
+        ids of the cells that violate one of the limits
+    limits : dict
+        the limits that were applied
+    """
+
+    __slots__ = ("table", "histograms", "offending", "limits")
+
+    def __init__(self, table, histograms, offending, limits):
+        self.table = table
+        self.histograms = histograms
+        self.offending = offending
+        self.limits = limits
+
+    def __repr__(self):
+        return "<MeshQuality: %i cells, %i offending>" % (len(self.table), len(self.offending))
+
+    def __getitem__(self, key):
+        return self.table[key]
+
+
+def _histogram(values, bins):
+    """np.histogram of the values. Values that only differ by round-off
+    (e.g. the skew of ideal cells) are counted like equal values in the
+    bins around their mean instead of raising a ValueError."""
+    if len(values) and np.ptp(values) <= 1e-9 * max(np.abs(values).max(), 1.0):
+        c = values.mean()
+        return np.histogram(values, bins=bins, range=(c - 0.5, c + 0.5))
+    return np.histogram(values, bins=bins)
+
+
+def _corner_coordinates(mesh):
+    """returns the ids, the (M,K,2) padded corner coordinates and the number
+    of corners of every cell of a list of cells or a MeshArrays"""
+    if isinstance(mesh, MeshArrays):
+        k = mesh.nodes_per_cell
+        P = mesh.nodes[np.where(mesh.cells >= 0, mesh.cells, 0)]
+        return (np.arange(1, mesh.n_cells + 1), P, k)
+
+    k = np.array([len(c.nodes) for c in mesh], dtype=int)
+    P = np.zeros((len(mesh), k.max() if len(mesh) else 0, 2))
+    for (j, c) in enumerate(mesh):
+        P[j, : k[j]] = [n.coordinates for n in c.nodes]
+    return (np.array([c.id for c in mesh], dtype=int), P, k)
+
+
+def mesh_quality(mesh, min_angle=5.0, max_angle=175.0, max_aspect_ratio=100.0, min_jacobian_ratio=0.0, max_skew=0.95, bins=10):
+    """
+    computes the quality metrics of all cells in one pass over the padded
+    corner coordinates of the mesh. The angles are the unsigned corner angles
+    as in calc_cell_angles, the area is the signed area of PolygonArea.
+
+    Parameters
+    ----------
+    mesh : list or MeshArrays
+        list of cells or the MeshArrays of the mesh
+    min_angle, max_angle : float, optional
+        limits of the corner angles in degree
+    max_aspect_ratio : float, optional
+        limit of the ratio of the longest to the shortest edge
+    min_jacobian_ratio : float, optional
+        cells with a ratio of the smallest to the largest corner Jacobian
+        at or below this value are reported. The corner Jacobians are taken
+        with the sign of the cell orientation, so a concave or folded cell
+        has a negative ratio.
+    max_skew : float, optional
+        limit of the equiangular skew, 0 for an equilateral triangle or a
+        rectangle and 1 for a degenerated cell
+    bins : int, optional
+        number of bins of the histograms
+
+    Returns
+    -------
+    MeshQuality
+
+    Examples
+    --------
+    ::
+
+        q = mesh_quality(job.mesh)
+        q['min_angle'].min(), q.offending
+    """
+    limits = {"min_angle": min_angle, "max_angle": max_angle, "max_aspect_ratio": max_aspect_ratio, "min_jacobian_ratio": min_jacobian_ratio, "max_skew": max_skew}
+    dtype = [("id", int), ("nodes", int), ("area", float), ("orientation", bool)] + [(name, float) for name in QUALITY_METRICS[1:]]
+    (ids, P, k) = _corner_coordinates(mesh)
+    (m, K) = P.shape[:2]
+    if m == 0:
+        histograms = {name: np.histogram(np.empty(0), bins=bins) for name in QUALITY_METRICS}
+        return MeshQuality(np.empty(0, dtype=dtype), histograms, [], limits)
+
+    idx = np.arange(K)
+    valid = idx[None, :] < k[:, None]
+    kk = np.maximum(k, 1)[:, None]
+    nxt = (idx[None, :] + 1) % kk
+    prv = (idx[None, :] - 1) % kk
+    Pn = np.take_along_axis(P, nxt[:, :, None], axis=1)
+    Pp = np.take_along_axis(P, prv[:, :, None], axis=1)
+
+    # signed area (shoelace) and orientation
+    area = 0.5 * np.where(valid, P[:, :, 0] * Pn[:, :, 1] - Pn[:, :, 0] * P[:, :, 1], 0.0).sum(axis=1)
+    orientation = area > 0
+
+    v1 = Pp - P
+    v2 = Pn - P
+    l1 = np.linalg.norm(v1, axis=2)
+    l2 = np.linalg.norm(v2, axis=2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # corner angles
+        cos = np.einsum("ijk,ijk->ij", v1, v2) / (l1 * l2)
+        angles = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+        min_angles = np.where(valid, angles, np.inf).min(axis=1)
+        max_angles = np.where(valid, angles, -np.inf).max(axis=1)
+
+        # edge lengths
+        aspect_ratio = np.where(valid, l2, -np.inf).max(axis=1) / np.where(valid, l2, np.inf).min(axis=1)
+
+        # corner jacobians with the sign of the cell orientation
+        J = (v2[:, :, 0] * v1[:, :, 1] - v2[:, :, 1] * v1[:, :, 0]) * np.where(orientation, 1.0, -1.0)[:, None]
+        Jmin = np.where(valid, J, np.inf).min(axis=1)
+        Jmax = np.where(valid, J, -np.inf).max(axis=1)
+        jacobian_ratio = np.where(Jmax > 0, Jmin / Jmax, -1.0)
+
+        # equiangular skew
+        theta_e = 180.0 * (k - 2) / kk[:, 0]
+        skew = np.maximum((max_angles - theta_e) / (180.0 - theta_e), (theta_e - min_angles) / theta_e)
+
+    table = np.empty(m, dtype=dtype)
+    table["id"] = ids
+    table["nodes"] = k
+    table["area"] = area
+    table["orientation"] = orientation
+    table["min_angle"] = min_angles
+    table["max_angle"] = max_angles
+    table["aspect_ratio"] = aspect_ratio
+    table["jacobian_ratio"] = jacobian_ratio
+    table["skew"] = skew
+
+    histograms = {}
+    for name in QUALITY_METRICS:
+        values = table[name][np.isfinite(table[name])]
+        histograms[name] = _histogram(values, bins)
+
+    with np.errstate(invalid="ignore"):
+        bad = (
+            ~orientation
+            | ~(min_angles >= min_angle)
+            | ~(max_angles <= max_angle)
+            | ~(aspect_ratio <= max_aspect_ratio)
+            | ~(jacobian_ratio > min_jacobian_ratio)
+            | ~(skew <= max_skew)
+        )
+    offending = ids[bad].tolist()
+
+    return MeshQuality(table, histograms, offending, limits)
@@ -24,13 +24,20 @@ from OCC.Display.SimpleGui import init_display
 from SONATA.cbm.fileIO.CADinput import (Check_BSplineLst_Head2Tail,
                                         order_BSplineLst_Head2Tail,)
 from SONATA.cbm.mesh.cell import Cell
+from SONATA.cbm.mesh.mesh_arrays import MeshArrays
+from SONATA.cbm.mesh.mesh_index import MeshIndex
 from SONATA.cbm.mesh.node import Node
-from SONATA.cbm.topo.BSplineLst_utils import (BSplineLst_Orientation,
+from SONATA.cbm.mesh.node_search import (merge_close_consecutive,
+                                          remaining_node_indices,)
+from SONATA.cbm.topo.BSplineLst_utils import (ArcLengthBSplineLst,
+                                              BSplineLst_Orientation,
                                               ProjectPointOnBSplineLst,
                                               copy_BSplineLst,
                                               distance_on_BSplineLst,
+                                              as_ArcLengthBSplineLst,
                                               findPnt_on_BSplineLst,
                                               get_BSpline_length,
+                                              get_BSplineLst_index,
                                               get_BSplineLst_length,
                                               isPnt_on_BSplineLst,
                                               reverse_BSplineLst,
@@ -43,10 +50,13 @@ from SONATA.cbm.topo.utils import (Pnt2dLst_to_npArray,
                                    calc_DCT_angles, unique_rows,)
 from SONATA.cbm.topo.wire_utils import (build_wire_from_BSplineLst,
                                         get_wire_length,)
+from SONATA.utl.trace import current_span
 
 
 def find_cells_that_contain_node(cells, n2find):
     # search cells that contain the node n2find
+    if isinstance(cells, MeshIndex):
+        return cells.cells_of_node(n2find)
     disco_cells = []
     for c in cells:
         if n2find in c.nodes:
@@ -55,11 +65,17 @@ def find_cells_that_contain_node(cells, n2find):
 
 
 def find_node_by_ID(nodes, ID):
+    if isinstance(nodes, MeshIndex):
+        return nodes.find_node(ID)
     node = next((n for n in nodes if n.id == ID), None)
     return node
 
 
 def sort_and_reassignID(mesh):
+    # a MeshArrays is ordered by construction, its ids are the row indices + 1
+    if isinstance(mesh, MeshArrays):
+        return mesh, mesh.nodes
+
     # Get all nodes in cells
     temp = []
     for cell in mesh:
@@ -148,6 +164,18 @@ def equidistant_nodes_on_BSplineLst(BSplineLst, IC=False, IncStart=True, IncEnd=
 
 
 def move_node_on_BSplineLst(BSplineLst, node, dist, tol=1e-6):
+    if isinstance(BSplineLst, ArcLengthBSplineLst):
+        # cached arc-length lookup on the closed BSplineLst
+        L = BSplineLst.length
+        s = (BSplineLst.cumlengths[node.parameters[1]] + BSplineLst.abscissa(node.parameters[1], node.parameters[2]) + dist) % L
+        [idx, X] = BSplineLst.coordinate(s / L)
+        P = gp_Pnt2d()
+        BSplineLst[idx].D0(X, P)
+        node.Pnt2d = P
+        node.parameters[1] = idx
+        node.parameters[2] = X
+        return None
+
     CRL = 0  # Cummulative Remaining Length
     direction = True
     idx = node.parameters[1]
@@ -213,6 +241,7 @@ def grab_nodes_of_cells_on_BSplineLst(cells, BSplineLst):
         the BSplineLst 
     """
 
+    BSplineLst = as_ArcLengthBSplineLst(BSplineLst)  # builds the spatial index only once
     disco_nodes = []
     disco_cells = []
     #    tmp_nodes = [y for c in cells for y in c.nodes]
@@ -247,14 +276,24 @@ def grab_nodes_on_BSplineLst(nodes, BSplineLst, tolerance=1e-5):
         disco_nodes: (list of nodes) the discovered nodes that are located on 
         the BSplineLst 
         
-    Notes: Projection is slow. It would be nice to not use this function very 
-        often.
+    Notes: Projection is slow. Therefore the nodes are only projected onto 
+        the BSplines that come close to them according to the spatial index 
+        of the BSplineLst (BSplineLstIndex, cached for an ArcLengthBSplineLst),
+        which gives the same result as projecting onto all BSplines.
     """
+    if not nodes:
+        return []
+    if isinstance(BSplineLst, ArcLengthBSplineLst) or len(nodes) * len(BSplineLst) > 64:
+        xy = np.array([n.Pnt2d.Coord() for n in nodes])
+        candidates = get_BSplineLst_index(BSplineLst).candidates(xy, tolerance)
+    else:
+        candidates = [range(len(BSplineLst))] * len(nodes)
 
     disco_nodes = []
-    for n in nodes:
-        for idx, item in enumerate(BSplineLst):
-            projection = Geom2dAPI_ProjectPointOnCurve(n.Pnt2d, item)
+    for (n, indices) in zip(nodes, candidates):
+        for idx in indices:
+            idx = int(idx)
+            projection = Geom2dAPI_ProjectPointOnCurve(n.Pnt2d, BSplineLst[idx])
             for j in range(1, projection.NbPoints() + 1):
                 if projection.Distance(j) <= tolerance:
                     n.parameters[1] = idx
@@ -318,20 +357,27 @@ def determine_a_nodes(mesh, a_BSplineLst, global_minLen, LayerID, factor=5):
     return disco_nodes
 
 
+def node_coordinates(nodes):
+    """ returns the (N,2) array of the coordinates of the nodes """
+    return np.array([(n.Pnt2d.X(), n.Pnt2d.Y()) for n in nodes], dtype=float).reshape(-1, 2)
+
+
 def remove_dublicate_nodes(nodes, tol=1e-6):
+    """
+    removes every node that coincides within tol with a node of another id
+    further down the list, so that the last node of each group of coincident
+    nodes remains (see node_search.remaining_node_indices). The number of
+    removed nodes is counted as 'dublicate_nodes' on the current trace span.
+    """
     # nodes = list(set(nodes))
     nodes = remove_duplicates_from_list_preserving_order(nodes)
-    doublicated_nodes = []
-    for i, a in enumerate(nodes):
-        for b in nodes[i:]:
-            if a.id != b.id and a.Pnt2d.IsEqual(b.Pnt2d, tol):
-                doublicated_nodes.append(a)
-
-    # print 'doublicated nodes:', doublicated_nodes
-    doublicated_nodes = list(set(doublicated_nodes))
-    for dn in doublicated_nodes:
-        nodes.remove(dn)
-    return nodes
+    keep = remaining_node_indices(node_coordinates(nodes), [n.id for n in nodes], tol)
+    if len(keep) == len(nodes):
+        return nodes
+
+    remaining = [nodes[k] for k in keep]
+    current_span().count("dublicate_nodes", len(nodes) - len(remaining))
+    return remaining
 
 
 def remove_duplicates_from_list_preserving_order(seq):
@@ -354,21 +400,26 @@ def theta_1_from_2nodes(node1, node2):
 
 
 def merge_nodes_if_too_close(nodes, BSplineLst, global_minLen, tol=0.1):
-    rm_idx = []
-    for i, n1 in enumerate(nodes[0:], start=0):
-        n2 = nodes[i - 1]
-        v = gp_Vec2d(n1.Pnt2d, n2.Pnt2d)
-        magnitude = v.Magnitude()
-
-        if magnitude <= tol * global_minLen:
-            cP = n1.Pnt2d.Translated(v.Multiplied(0.5))
-            p2 = ProjectPointOnBSplineLst(BSplineLst, cP, 1)
-            n1.Pnt2d = p2[0]
-            n1.parameters = ["modified", p2[1], p2[2]]
-            rm_idx.append(i - 1)
+    """
+    merges consecutive nodes (the first node with the last one included)
+    that are closer than tol*global_minLen. The node is moved to the
+    projection of the midpoint onto BSplineLst and its predecessor is
+    removed (see node_search.merge_close_consecutive). The number of merged
+    nodes is counted as 'merged_nodes' on the current trace span.
+    """
+    if not nodes:
+        return nodes
+
+    def _move(i, cP):
+        p2 = ProjectPointOnBSplineLst(BSplineLst, gp_Pnt2d(*cP), 1)
+        nodes[i].Pnt2d = p2[0]
+        nodes[i].parameters = ["modified", p2[1], p2[2]]
+        return (p2[0].X(), p2[0].Y())
 
+    rm_idx = merge_close_consecutive(node_coordinates(nodes), tol * global_minLen, _move)
     for index in sorted(rm_idx, reverse=True):
         del nodes[index]
+    current_span().count("merged_nodes", len(rm_idx))
     return nodes
 
 
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Searches for coincident and close nodes on the arrays of their coordinates 
+with a cKDTree and numpy. The functions are independent of OCC, 
+mesh_utils and consolidate_mesh apply them to the nodes.
+
+@author: TPflumm
+"""
+# Third party modules
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def remaining_node_indices(xy, ids, tol=1e-6):
+    """
+    returns the indices of the nodes that remain if every node that 
+    coincides within tol with a node of another id further down the list is 
+    removed. Like list.remove with Node.__eq__, every removal takes the first 
+    node of the same id, so that the last node of each group of coincident 
+    nodes remains.
+
+    Parameters
+    ----------
+    xy : array_like
+        (N,2) coordinates of the nodes
+    ids : array_like
+        (N,) ids of the nodes
+    tol : float, optional
+        distance below which two nodes coincide. The default is 1e-6.
+
+    Returns
+    -------
+    ndarray
+        ascending indices of the remaining nodes
+
+    Examples
+    --------
+    >>> remaining_node_indices([[0, 0], [1, 0], [0, 0]], [1, 2, 3])
+    array([1, 2])
+    """
+    ids = np.asarray(ids)
+    if len(ids) < 2:
+        return np.arange(len(ids))
+
+    pairs = cKDTree(np.asarray(xy, dtype=float)).query_pairs(tol, output_type="ndarray")  # i < j
+    pairs = pairs[ids[pairs[:, 0]] != ids[pairs[:, 1]]]
+    n_remove = {}
+    for i in ids[np.unique(pairs[:, 0])].tolist():
+        n_remove[i] = n_remove.get(i, 0) + 1
+
+    keep = []
+    for (k, i) in enumerate(ids.tolist()):
+        if n_remove.get(i, 0):
+            n_remove[i] -= 1
+        else:
+            keep.append(k)
+    return np.asarray(keep, dtype=int)
+
+
+def merge_close_consecutive(xy, max_dist, move):
+    """
+    merges consecutive nodes (the first node with the last one included) 
+    that are not more than max_dist apart. In station order, node i is moved 
+    by move(i, midpoint) and its predecessor i-1 is marked for removal. The 
+    distances of all consecutive nodes are screened at once, only the close 
+    pairs and the successors of moved nodes are visited.
+
+    Parameters
+    ----------
+    xy : array_like
+        (N,2) coordinates of the nodes
+    max_dist : float
+        merge distance
+    move : callable
+        move(i, midpoint) moves node i towards the midpoint (ndarray of 
+        shape (2,)) between node i and node i-1 and returns its new 
+        coordinates
+
+    Returns
+    -------
+    list
+        indices of the nodes to remove, -1 for the last node
+
+    Examples
+    --------
+    >>> merge_close_consecutive([[0, 0], [1, 0], [1.01, 0], [2, 0]], 0.1, lambda i, p: p)
+    [1]
+    """
+    xy = np.array(xy, dtype=float).reshape(-1, 2)
+    if not len(xy):
+        return []
+
+    d = xy - np.roll(xy, 1, axis=0)
+    magnitude = np.sqrt(d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1])
+    pending = np.flatnonzero(magnitude <= max_dist).tolist()[::-1]
+
+    rm_idx = []
+    while pending:
+        i = pending.pop()
+        v = xy[i - 1] - xy[i]
+        if np.sqrt(v[0] * v[0] + v[1] * v[1]) <= max_dist:
+            xy[i] = move(i, xy[i] + 0.5 * v)
+            rm_idx.append(i - 1)
+            # node i moved, so the distance to the next node has changed
+            if i + 1 < len(xy) and not (pending and pending[-1] == i + 1):
+                pending.append(i + 1)
+    return rm_idx
+
+
+def match_node_pairs(xy1, ids1, xy2, ids2, tol):
+    """
+    returns the node matching matrix of consolidate_mesh_on_web: the pairs 
+    of a node of the first and a node of the second list that are closer 
+    than tol, sorted by their distance. Every node appears in at most one 
+    pair. The pairs within tol are found with a cKDTree instead of the full 
+    distance matrix, the result is the same.
+
+    Parameters
+    ----------
+    xy1, xy2 : array_like
+        (N,2) and (M,2) coordinates of the nodes
+    ids1, ids2 : array_like
+        (N,) and (M,) ids of the nodes
+    tol : float
+        matching distance
+
+    Returns
+    -------
+    ndarray
+        (K,3) rows [distance, id1, id2]
+
+    Examples
+    --------
+    >>> match_node_pairs([[0, 0], [1, 0]], [1, 2], [[0, 0.01], [3, 0]], [3, 4], 0.1)
+    array([[0.01, 1.  , 3.  ]])
+    """
+    xy1 = np.asarray(xy1, dtype=float).reshape(-1, 2)
+    xy2 = np.asarray(xy2, dtype=float).reshape(-1, 2)
+    # ordered like the full 1 x 2 distance matrix
+    pairs = cKDTree(xy1).sparse_distance_matrix(cKDTree(xy2), tol, output_type="ndarray")
+    pairs = pairs[np.lexsort((pairs["j"], pairs["i"]))]
+    tmp = np.column_stack((pairs["v"], np.asarray(ids1, dtype=float)[pairs["i"]], np.asarray(ids2, dtype=float)[pairs["j"]]))
+
+    NM = tmp[tmp[:, 0] < tol]
+    NM = NM[NM[:, 0].argsort()]
+
+    # remove possible double nodes in NodeMatching Matrix
+    tmp, tmp_idx = np.unique(NM[:, 1], True, axis=0)
+    tmp_idx.sort(axis=0)
+    NM = NM[tmp_idx]
+    tmp, tmp_idx = np.unique(NM[:, 2], True, axis=0)
+    tmp_idx.sort(axis=0)
+    NM = NM[tmp_idx]
+    return NM
@@ -25,6 +25,7 @@ from OCC.Core.GeomAPI import (GeomAPI_IntCS, GeomAPI_Interpolate,
 from OCC.Core.gp import (gp_Dir, gp_Dir2d, gp_Pln, gp_Pnt,
                          gp_Pnt2d, gp_Vec, gp_Vec2d,)
 from scipy.optimize import leastsq
+from scipy.spatial import cKDTree
 
 # First party modules
 from SONATA.cbm.topo.para_Geom2d_BsplineCurve import Para_Geom2d_BSplineCurve
@@ -35,6 +36,7 @@ from SONATA.cbm.topo.utils import (P2Pdistance, Pnt2dLst_to_npArray,
                                    TColgp_HArray1OfPnt2d_from_nparray,
                                    TColgp_HArray1OfPnt_from_nparray,
                                    calc_DCT_angles, curvature_of_curve,
+                                   decimate_polyline,
                                    discrete_stepsize, fuse_rows, isclose,
                                    unique_rows,)
 
@@ -70,8 +72,18 @@ def ProjectPointOnBSplineLst(BSplineLst, Pnt2d, tolerance_distance=100):
     p2 : list 
      list of projection information [gp_Pnt2d, index of BSplineLst, curve parameter u, distance]
          
+    Notes
+    ----------
+    If the BSplineLst is an ArcLengthBSplineLst, its cached spatial index 
+    (BSplineLstIndex) is used to project the point only onto the BSplines 
+    close to it. The search radius starts at the distance to the closest
+    sample and is doubled until the closest projection is guaranteed to be
+    the same as the one of the brute-force loop over all BSplines.
     
     """
+    if isinstance(BSplineLst, ArcLengthBSplineLst) and len(BSplineLst) > 1:
+        return _project_Pnt2d_indexed(BSplineLst, Pnt2d, tolerance_distance)
+
     p2 = []
     for idx, item in enumerate(BSplineLst):
         projection2 = Geom2dAPI_ProjectPointOnCurve(Pnt2d, item)
@@ -89,6 +101,43 @@ def ProjectPointOnBSplineLst(BSplineLst, Pnt2d, tolerance_distance=100):
         return []
 
 
+def _project_Pnt2d_on_BSplines(BSplineLst, Pnt2d, indices, tolerance_distance):
+    """ projects Pnt2d onto the BSplines of the given indices and returns the
+    list of [gp_Pnt2d, index, u, distance] within the tolerance_distance """
+    p2 = []
+    for idx in indices:
+        projection2 = Geom2dAPI_ProjectPointOnCurve(Pnt2d, BSplineLst[idx])
+        for j in range(1, projection2.NbPoints() + 1):
+            if projection2.Distance(j) <= tolerance_distance:
+                p2.append([projection2.Point(j), int(idx), projection2.Parameter(j), projection2.Distance(j)])
+    return p2
+
+
+def _project_Pnt2d_indexed(BSplineLst, Pnt2d, tolerance_distance):
+    """ ProjectPointOnBSplineLst with the spatial index of the BSplineLst """
+    index = get_BSplineLst_index(BSplineLst)
+    xy = np.array([Pnt2d.Coord()])
+    r = min(float(index.upper_distance(xy)[0]), tolerance_distance)
+    done = set()
+    p2 = []
+    while True:
+        cand = [i for i in index.candidates(xy, r)[0] if i not in done]
+        p2.extend(_project_Pnt2d_on_BSplines(BSplineLst, Pnt2d, cand, tolerance_distance))
+        done.update(cand)
+        # the BSplines that are not yet projected are farther away than r
+        if len(done) == len(BSplineLst) or r >= tolerance_distance or (p2 and min(p[3] for p in p2) <= r):
+            break
+        r = min(2 * r + index.margin, tolerance_distance)
+
+    if p2:
+        p2 = sorted(p2, key=lambda p: p[1])
+        p2 = np.asarray(p2, dtype=object)
+        min_index = p2[:, 3].astype(float).argmin()
+        return p2[min_index, :]
+    else:
+        return []
+
+
 def distance_on_BSplineLst(BSplineLst, para1, para2):
     #    para1 = findPnt_on_BSplineLst(P1,BSplineLst)
     #    para2 = findPnt_on_BSplineLst(P2,BSplineLst)
@@ -99,6 +148,8 @@ def distance_on_BSplineLst(BSplineLst, para1, para2):
     #        print para1,para2
     tol = 1e-7
     # print para1,para2
+    if isinstance(BSplineLst, ArcLengthBSplineLst) and (para1[0], para1[1]) <= (para2[0], para2[1]):
+        return BSplineLst.distance(para1, para2)
 
     Distance = 0
     for i, item in enumerate(BSplineLst):
@@ -277,12 +328,395 @@ def get_BSplineLst_length(BSplineLst):
     Returns the cummulated length of the BSplineLst
     """
 
+    if isinstance(BSplineLst, ArcLengthBSplineLst):
+        return BSplineLst.length
+
     CummLength = 0
     for i, item in enumerate(BSplineLst):
         CummLength += get_BSpline_length(item)
     return CummLength
 
 
+# Gauss-Legendre quadrature of the arc length
+_GL_X, _GL_W = np.polynomial.legendre.leggauss(5)
+
+
+def _BSpline_speed(BSpline, u):
+    """ returns the norm of the first derivative of the BSpline at the 
+    parameters u """
+    u = np.atleast_1d(np.asarray(u, dtype=float))
+    if isinstance(BSpline, Geom_BSplineCurve):
+        (P, V) = (gp_Pnt(), gp_Vec())
+    else:
+        (P, V) = (gp_Pnt2d(), gp_Vec2d())
+    speed = np.empty(len(u))
+    for (i, ui) in enumerate(u):
+        BSpline.D1(float(ui), P, V)
+        speed[i] = V.Magnitude()
+    return speed
+
+
+class ArcLengthBSplineLst(list):
+    """
+    list of BSplines (Geom2d_BSplineCurve or Geom_BSplineCurve) that caches
+    its arc-length parametrization. The per-spline lengths and the 
+    cummulated lengths are computed at construction, a dense table of 
+    parameter <-> arc-length pairs of each spline is built on its first 
+    lookup. The table is aligned with the knots of the spline and 
+    integrated with Gauss-Legendre quadrature.
+
+    A normalized coordinate S is located by binary search in the cummulated
+    lengths and in the table, the parameter is then polished by Newton 
+    iterations, so that lookups are O(log n) without calls to 
+    GCPnts_AbscissaPoint.
+
+    Since it is a list, it can be passed to all functions that expect a 
+    BSplineLst. get_BSplineLst_length, find_BSplineLst_coordinate, 
+    find_BSplineLst_pos, distance_on_BSplineLst, trim_BSplineLst, 
+    get_BSplineLst_Pnt2d, get_BSplineLst_D2 and move_node_on_BSplineLst 
+    use the cache automatically. Modifying the list drops the cache, the 
+    BSplines themselves must not be modified in place (e.g. by Reverse() or 
+    Segment()).
+
+    Attributes
+    ----------
+    lengths : ndarray
+        length of every BSpline
+    cumlengths : ndarray
+        cummulated lengths, starting with 0
+    n_table : int
+        minimum number of table intervals per BSpline
+
+    Examples
+    --------
+    ::
+
+        lst = ArcLengthBSplineLst(layer.BSplineLst)
+        [idx, U] = find_BSplineLst_coordinate(lst, 0.3, 0.0, 1.0)
+    """
+
+    __slots__ = ("lengths", "cumlengths", "n_table", "_tables", "_index")
+
+    def __init__(self, BSplineLst=(), n_table=32):
+        list.__init__(self, BSplineLst)
+        self.n_table = n_table
+        self._reset()
+
+    def _reset(self):
+        self.lengths = np.array([get_BSpline_length(item) for item in self], dtype=float)
+        self.cumlengths = np.concatenate(([0.0], np.cumsum(self.lengths)))
+        self._tables = [None] * len(self)
+        self._index = None
+
+    @property
+    def length(self):
+        return self.cumlengths[-1]
+
+    def _gauss(self, i, a, b):
+        """ arc length of BSpline i between the parameters a and b """
+        b = np.asarray(b, dtype=float)
+        m = 0.5 * (a + b)
+        h = 0.5 * (b - a)
+        u = m[..., None] + h[..., None] * _GL_X
+        speed = _BSpline_speed(self[i], u.ravel()).reshape(u.shape)
+        return h * np.dot(speed, _GL_W)
+
+    def table(self, i):
+        """ returns the parameters u and arc lengths s of the table of BSpline i """
+        if self._tables[i] is None:
+            item = self[i]
+            (first, last) = (item.FirstParameter(), item.LastParameter())
+            knots = np.array([item.Knot(k) for k in range(1, item.NbKnots() + 1)])
+            knots = np.unique(np.concatenate(([first, last], knots[(knots > first) & (knots < last)])))
+            n = max(1, -(-self.n_table // (len(knots) - 1)))
+            u = np.concatenate([np.linspace(a, b, n + 1)[:-1] for (a, b) in zip(knots[:-1], knots[1:])] + [[last]])
+            s = np.concatenate(([0.0], np.cumsum(self._gauss(i, u[:-1], u[1:]))))
+            self._tables[i] = (u, s)
+        return self._tables[i]
+
+    def abscissa(self, i, U):
+        """ arc length from the first parameter of BSpline i to U """
+        (u, s) = self.table(i)
+        k = min(max(int(np.searchsorted(u, U, side="right")) - 1, 0), len(u) - 2)
+        return s[k] + float(self._gauss(i, u[k], U))
+
+    def parameter(self, i, d, tol=1e-12, max_iter=8):
+        """ parameter of BSpline i at the arc length d from its first 
+        parameter. The table lookup is polished by Newton iterations."""
+        (u, s) = self.table(i)
+        d = min(max(d, 0.0), s[-1])
+        k = min(max(int(np.searchsorted(s, d, side="right")) - 1, 0), len(u) - 2)
+        (a, b) = (u[k], u[k + 1])
+        U = a + (b - a) * (d - s[k]) / max(s[k + 1] - s[k], 1e-300)
+        for it in range(max_iter):
+            f = s[k] + float(self._gauss(i, a, U)) - d
+            if abs(f) <= tol * max(s[-1], 1.0):
+                break
+            U = min(max(U - f / max(_BSpline_speed(self[i], U)[0], 1e-300), a), b)
+        return U
+
+    def coordinate(self, S, start=0.0, end=1.0):
+        """ returns [index of the bspline, parameter U] of the normalized 
+        coordinate S of the interval [start, end], see 
+        find_BSplineLst_coordinate """
+        x = self.length * (S - start) / (end - start)
+        i = min(int(np.searchsorted(self.cumlengths[1:], x)), len(self) - 1)
+        if i > 0 and isclose(x, self.cumlengths[i]):
+            i -= 1
+        return [i, self.parameter(i, x - self.cumlengths[i])]
+
+    def position(self, para):
+        """ returns the normalized coordinate [0..1] of [index, U] """
+        return (self.cumlengths[para[0]] + self.abscissa(para[0], para[1])) / self.length
+
+    def distance(self, para1, para2):
+        """ arc length between [index1, U1] and [index2, U2] """
+        return (self.cumlengths[para2[0]] + self.abscissa(para2[0], para2[1])) - (self.cumlengths[para1[0]] + self.abscissa(para1[0], para1[1]))
+
+
+def _invalidating(name):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._reset()
+        return result
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "append", "extend", "insert", "pop", "remove", "reverse", "sort"):
+    setattr(ArcLengthBSplineLst, _name, _invalidating(_name))
+
+
+def as_ArcLengthBSplineLst(BSplineLst):
+    """ returns BSplineLst as ArcLengthBSplineLst (without copying the 
+    BSplines). None and empty lists are returned unchanged. """
+    if not BSplineLst or isinstance(BSplineLst, ArcLengthBSplineLst):
+        return BSplineLst
+    return ArcLengthBSplineLst(BSplineLst)
+
+
+class BSplineLstIndex(object):
+    """
+    spatial index of a BSplineLst that is used to find the BSplines that 
+    come close to a point, so that only those are projected exactly with 
+    Geom2dAPI_ProjectPointOnCurve. 
+
+    The BSplines are sampled with an arc-length spacing of about 
+    length/n_samples and the samples are stored in a scipy cKDTree. Every 
+    point of a BSpline lies within the margin (half the arc length between
+    two samples) of one of its samples, so a BSpline can only come closer 
+    than r to a point, if one of its samples lies within r + margin.
+
+    Attributes
+    ----------
+    points : ndarray
+        (n,2) sample points
+    spline : ndarray
+        index of the BSpline of every sample point
+    margin : float
+        upper bound of the distance between a point of a BSpline and its 
+        closest sample point
+    tree : scipy.spatial.cKDTree
+
+    Examples
+    --------
+    ::
+
+        index = BSplineLstIndex(BSplineLst)
+        index.candidates([[0.2, 0.01]], 1e-5)   # e.g. [array([3])]
+    """
+
+    __slots__ = ("points", "spline", "margin", "tree")
+
+    def __init__(self, BSplineLst, n_samples=256):
+        lst = as_ArcLengthBSplineLst(BSplineLst)
+        h = lst.length / n_samples
+        (points, spline) = ([], [])
+        self.margin = 0.0
+        for (i, item) in enumerate(lst):
+            (u, s) = lst.table(i)
+            n = max(int(math.ceil(s[-1] / h)), 4)
+            uq = np.interp(np.linspace(0.0, s[-1], n + 1), s, u)
+            points.append(_BSpline_D1_array(item, uq)[0])
+            spline.append(np.full(n + 1, i))
+            self.margin = max(self.margin, 0.5 * s[-1] / n)
+        self.margin *= 1.25  # the samples are only approximately equidistant
+        self.points = np.vstack(points)
+        self.spline = np.concatenate(spline)
+        self.tree = cKDTree(self.points)
+
+    def candidates(self, pts, radius):
+        """ returns for every point of pts (n,2) the sorted indices of the 
+        BSplines that may come closer than radius to it """
+        lst = self.tree.query_ball_point(np.atleast_2d(pts), radius + self.margin)
+        return [np.unique(self.spline[idx]) if idx else np.zeros(0, dtype=int) for idx in lst]
+
+    def upper_distance(self, pts):
+        """ returns the distance of every point of pts to its closest sample,
+        which is an upper bound of its distance to the BSplineLst """
+        return self.tree.query(np.atleast_2d(pts))[0]
+
+
+def get_BSplineLst_index(BSplineLst):
+    """ returns the BSplineLstIndex of the BSplineLst. It is cached if the 
+    BSplineLst is an ArcLengthBSplineLst. """
+    if isinstance(BSplineLst, ArcLengthBSplineLst):
+        if BSplineLst._index is None:
+            BSplineLst._index = BSplineLstIndex(BSplineLst)
+        return BSplineLst._index
+    return BSplineLstIndex(BSplineLst)
+
+
+def _foot_of_perpendicular(BSpline, xy, ua, ub, fa, fb, tol=1e-12, max_iter=30):
+    """ root of f(u) = (C(u)-P).C'(u) in the bracket [ua, ub] with 
+    fa*fb < 0 by safeguarded Newton iterations """
+    (P, V1, V2) = (gp_Pnt2d(), gp_Vec2d(), gp_Vec2d())
+    eps = tol * max(abs(ub - ua), 1e-300)
+    u = ua - fa * (ub - ua) / (fb - fa)
+    for it in range(max_iter):
+        BSpline.D2(u, P, V1, V2)
+        (dx, dy) = (P.X() - xy[0], P.Y() - xy[1])
+        f = dx * V1.X() + dy * V1.Y()
+        df = V1.X() * V1.X() + V1.Y() * V1.Y() + dx * V2.X() + dy * V2.Y()
+        if f == 0:
+            break
+        if (f < 0) == (fa < 0):
+            (ua, fa) = (u, f)
+        else:
+            (ub, fb) = (u, f)
+        # Newton step, bisection if it leaves the bracket
+        un = u - f / df if df != 0 else ua
+        if not (min(ua, ub) < un < max(ua, ub)):
+            un = 0.5 * (ua + ub)
+        if abs(un - u) <= eps:
+            u = un
+            break
+        u = un
+    return u
+
+
+def project_Pnts_on_BSplineLst(BSplineLst, pts, distance, u_tol=0.0, unique_tol=0.0, n_samples=256, max_samples=16384):
+    """
+    projects all points of pts at once onto the BSplineLst. It returns the 
+    same feet of perpendicular as Geom2dAPI_ProjectPointOnCurve called for 
+    every point and every BSpline with the parameter range extended by 
+    u_tol*(last-first) on both ends, keeping the ones within distance.
+
+    The BSplines are sampled once (with ArcLength spacing and at most 
+    max_samples points in total). The samples within reach of the points are
+    found with a cKDTree, and the sign changes of f(u) = (C(u)-P).C'(u) 
+    between neighboring samples bracket the feet of perpendicular, which are
+    polished by safeguarded Newton iterations. Projection points of a point 
+    that coincide within unique_tol are removed by sorting them, from every 
+    coincident pair the one that comes first in the order of the 
+    BSplineLst is removed.
+
+    The sample spacing is at most distance/4 (unless limited by 
+    max_samples). Within one sample interval f can only have two roots 
+    without a sign change if the radius of curvature is smaller than the 
+    distance of the point and the point lies beyond the centre of curvature.
+    Such pairs (a local minimum and maximum of the distance) are not found.
+
+    Parameters
+    ----------
+    BSplineLst : list
+        list of Geom2d_BSplineCurves
+    pts : array_like
+        (n,2) coordinates of the points
+    distance : float
+        maximum distance of the projection points
+    u_tol : float, optional
+        relative extension of the parameter range of every BSpline
+    unique_tol : float, optional
+        tolerance to remove coincident projection points of a point
+
+    Returns
+    -------
+    p2 : list
+        for every point the list of [gp_Pnt2d, index of BSplineLst, curve 
+        parameter u, distance] of its projection points, ordered by index
+        and parameter.
+    """
+    pts = np.asarray(pts, dtype=float).reshape(-1, 2)
+    lst = as_ArcLengthBSplineLst(BSplineLst)
+    h = max(min(lst.length / n_samples, 0.25 * distance), lst.length / max_samples)
+
+    # ==================sample the BSplines once
+    (points, tangents, params, spline) = ([], [], [], [])
+    margin = 0.0
+    for (i, item) in enumerate(lst):
+        (first, last) = (item.FirstParameter(), item.LastParameter())
+        (u, s) = lst.table(i)
+        n = max(int(math.ceil(s[-1] / h)), 8)
+        uq = np.interp(np.linspace(0.0, s[-1], n + 1), s, u)
+        uq[0] = first - (last - first) * u_tol
+        uq[-1] = last + (last - first) * u_tol
+        (P, T) = _BSpline_D1_array(item, uq)
+        points.append(P)
+        tangents.append(T)
+        params.append(uq)
+        spline.append(np.full(n + 1, i))
+        margin = max(margin, 0.5 * s[-1] / n)
+    points = np.vstack(points)
+    tangents = np.vstack(tangents)
+    params = np.concatenate(params)
+    spline = np.concatenate(spline)
+    margin *= 1.25  # the samples are only approximately equidistant
+
+    # ==================bracket the feet of perpendicular
+    near = cKDTree(points).query_ball_point(pts, distance + margin)
+    node = np.repeat(np.arange(len(pts)), [len(k) for k in near])
+    k = np.concatenate([np.asarray(k, dtype=int) for k in near]) if len(pts) else np.zeros(0, dtype=int)
+    # intervals [k-1, k] and [k, k+1] of the samples within reach
+    (node, k) = (np.concatenate((node, node)), np.concatenate((k - 1, k)))
+    ok = (k >= 0) & (k + 1 < len(points))
+    (node, k) = (node[ok], k[ok])
+    ok = spline[k] == spline[k + 1]
+    key = np.unique(node[ok] * len(points) + k[ok])
+    (node, k) = (key // len(points), key % len(points))
+
+    f0 = np.einsum("ij,ij->i", points[k] - pts[node], tangents[k])
+    f1 = np.einsum("ij,ij->i", points[k + 1] - pts[node], tangents[k + 1])
+    # a root on a sample is assigned to the interval that starts there, or
+    # to the last interval of the BSpline
+    last = (k + 2 >= len(points)) | (spline[k + 1] != spline[np.minimum(k + 2, len(points) - 1)])
+    roots = (f0 == 0) | (((f0 < 0) != (f1 < 0)) & (f1 != 0)) | ((f1 == 0) & last)
+
+    # ==================polish and collect
+    p2 = [[] for x in pts]
+    Pnt = gp_Pnt2d()
+    for (j, kj, a, b) in zip(node[roots].tolist(), k[roots].tolist(), f0[roots].tolist(), f1[roots].tolist()):
+        idx = int(spline[kj])
+        if a == 0:
+            u = params[kj]
+        elif b == 0:
+            u = params[kj + 1]
+        else:
+            u = _foot_of_perpendicular(lst[idx], pts[j], params[kj], params[kj + 1], a, b)
+        lst[idx].D0(u, Pnt)
+        d = math.hypot(Pnt.X() - pts[j][0], Pnt.Y() - pts[j][1])
+        if d <= distance:
+            p2[j].append([gp_Pnt2d(Pnt.X(), Pnt.Y()), idx, u, d])
+
+    # ==================remove coincident projection points by sorting
+    for (j, p) in enumerate(p2):
+        if len(p) > 1:
+            xy = np.array([(x[0].X(), x[0].Y()) for x in p])
+            order = np.argsort(xy[:, 0], kind="stable")
+            rm = np.zeros(len(p), dtype=bool)
+            for s in range(1, len(p)):
+                (a, b) = (order[:-s], order[s:])
+                close = np.hypot(xy[a, 0] - xy[b, 0], xy[a, 1] - xy[b, 1]) <= unique_tol
+                rm[np.minimum(a, b)[close]] = True
+                if not (xy[b, 0] - xy[a, 0] <= unique_tol).any():
+                    break
+            p2[j] = [x for (x, r) in zip(p, rm) if not r]
+    return p2
+
+
 def equidistant_Points_on_BSplineLst(BSplineLst, minLen):
     """ minLen = the minimum distance between points. Should be determined by the segment0.BSplineLstLenght/Resolution
     """
@@ -360,6 +794,8 @@ def find_BSplineLst_coordinate(BSplineLst, S, start, end):
         Return [index of the bspline, parameter U on the bspline]
         
     """
+    if isinstance(BSplineLst, ArcLengthBSplineLst):
+        return BSplineLst.coordinate(S, start, end)
 
     if all(isinstance(s, Geom_BSplineCurve) for s in BSplineLst):
         twoD = False
@@ -391,6 +827,9 @@ def find_BSplineLst_coordinate(BSplineLst, S, start, end):
 
 
 def find_BSplineLst_pos(BSplineLst, para):
+    if isinstance(BSplineLst, ArcLengthBSplineLst):
+        return BSplineLst.position(para)
+
     idx = para[0]
     U = para[1]
     tol = 1e-7
@@ -955,11 +1394,137 @@ def discretize_BSplineLst(BSplineLst, Deflection=2e-4, AngularDeflection=0.02, C
     return npArray
 
 
+def _BSpline_D1_array(BSpline, u):
+    """ evaluates the points and unit tangents of BSpline at the parameters u """
+    pts = np.empty((len(u), 2))
+    tan = np.empty((len(u), 2))
+    P = gp_Pnt2d()
+    V = gp_Vec2d()
+    for i, ui in enumerate(u):
+        BSpline.D1(float(ui), P, V)
+        pts[i] = P.Coord()
+        tan[i] = V.Coord()
+    norm = np.linalg.norm(tan, axis=1)
+    bad = norm < 1e-12
+    if bad.any():  # singular parametrization: use the chord direction
+        chord = np.gradient(pts, axis=0)
+        tan[bad] = chord[bad]
+        norm[bad] = np.linalg.norm(chord[bad], axis=1)
+    return pts, tan / np.maximum(norm, 1e-300)[:, None]
+
+
+def discretize_BSplineLst_D1(BSplineLst, Deflection=2e-4, offset=0.0, max_angle=4.0, max_iter=10):
+    """
+    discretizes every BSpline of the BSplineLst and returns the points 
+    together with their exact unit tangent vectors. The discretization starts
+    with GCPnts_QuasiUniformDeflection and subdivides every segment whose 
+    estimated sagitta on a curve with the distance offset, 
+    h**2 * k * (1 + |offset| * k) / 8, exceeds the Deflection or whose 
+    tangent turns by more than max_angle [deg]. 
+    
+    Parameters
+    ----------
+    BSplineLst : list of Geom2d_BSplineCurve
+    Deflection : float, optional
+    offset : float, optional
+        distance of the offset curve that is going to be created from the 
+        points, e.g. the layer thickness. The default is 0.
+    max_angle : float, optional
+        maximum angle between the tangents of neighboring points in degree.
+    max_iter : int, optional
+        maximum number of subdivision steps.
+
+    Returns
+    -------
+    list of tuples
+        (points (n,2), unit tangents (n,2)) of every BSpline
+    """
+    max_angle = math.radians(max_angle)
+    lst = []
+    for item in BSplineLst:
+        Adaptor = Geom2dAdaptor_Curve(item)
+        discretization = GCPnts_QuasiUniformDeflection(Adaptor, Deflection, 1)
+        u = np.array([discretization.Parameter(j) for j in range(1, discretization.NbPoints() + 1)])
+        (pts, tan) = _BSpline_D1_array(item, u)
+
+        for it in range(max_iter):
+            h = np.linalg.norm(np.diff(pts, axis=0), axis=1)
+            theta = np.arccos(np.clip(np.einsum("ij,ij->i", tan[:-1], tan[1:]), -1.0, 1.0))
+            k = theta / np.maximum(h, 1e-300)
+            flag = (theta > max_angle) | (h ** 2 * k * (1 + abs(offset) * k) / 8 > Deflection)
+            if not flag.any():
+                break
+            um = 0.5 * (u[:-1][flag] + u[1:][flag])
+            (pm, tm) = _BSpline_D1_array(item, um)
+            idx = np.nonzero(flag)[0] + 1
+            u = np.insert(u, idx, um)
+            pts = np.insert(pts, idx, pm, axis=0)
+            tan = np.insert(tan, idx, tm, axis=0)
+
+        lst.append((pts, tan))
+    return lst
+
+
 
 # return data
 
 
-def BSplineLst_from_dct(DCT_data, angular_deflection=15, closed=False, tol_interp=1e-6, twoD=True):
+def split_DCT_at_corners(DCT_data, angular_deflection=15):
+    """
+    splits the discrete definition DCT_data at its corners, i.e. the points 
+    where the direction changes by more than angular_deflection degrees. 
+    Neighboring segments share the corner point. If DCT_data is closed, the 
+    segment over the start point is joined.
+
+    Returns
+    -------
+    list of ndarray
+    """
+    DCT_angles = calc_DCT_angles(DCT_data)
+    corners = np.flatnonzero((DCT_angles < (180 - angular_deflection)) | (DCT_angles > (180 + angular_deflection)))
+    if corners.size == 0:
+        return [DCT_data]
+
+    DCT_Segments = [DCT_data[a : b + 1] for (a, b) in zip(corners[:-1], corners[1:])]
+    if np.allclose(DCT_data[0], DCT_data[-1]):  # Closed:
+        if not (corners[0] == 0 and corners[-1] == len(DCT_data) - 1):
+            # join the segment over the start point:
+            DCT_Segments.insert(0, np.concatenate((DCT_data[corners[-1] : -1], DCT_data[: corners[0] + 1])))
+
+    else:  # Open:
+        DCT_Segments.insert(0, DCT_data[: corners[0] + 1])  # first
+        DCT_Segments.append(DCT_data[corners[-1] :])  # last segment
+    return DCT_Segments
+
+
+def BSplineLst_from_dct(DCT_data, angular_deflection=15, closed=False, tol_interp=1e-6, twoD=True, decimate=False):
+    """
+    interpolates the discrete definition DCT_data with a list of BSplines. 
+    The data is split at its corners (see split_DCT_at_corners) and every 
+    segment is interpolated with Geom2dAPI_Interpolate (GeomAPI_Interpolate).
+    
+    Parameters
+    ----------
+    DCT_data : ndarray
+        (n,2) or (n,3) array of points
+    angular_deflection : float, optional
+        minimum change of direction in degree of a corner
+    closed : bool, optional
+        closes the definition if the last point differs from the first one
+    tol_interp : float, optional
+        tolerance of the interpolation
+    twoD : bool, optional
+        returns Geom2d_BSplineCurves if True, Geom_BSplineCurves otherwise
+    decimate : bool or float, optional
+        removes the points of every segment that lie within this distance 
+        (tol_interp if True) of the reduced polyline before the 
+        interpolation (see decimate_polyline). Straight parts are reduced 
+        much more than curved ones.
+
+    Returns
+    -------
+    list_of_bsplines : list 
+    """
     # Close DCT_date if closed == True
     if closed and not np.allclose(DCT_data[0], DCT_data[-1]):
         print("INFO:\t Closing open discrete definition")
@@ -967,54 +1532,12 @@ def BSplineLst_from_dct(DCT_data, angular_deflection=15, closed=False, tol_inter
 
     DCT_data = fuse_rows(DCT_data, 1e-6)  # check all datapoints and merge if allclose is true
 
-    # Find corners and edges of data
-    # print(DCT_data)
-    DCT_angles = calc_DCT_angles(DCT_data)
-    # print(DCT_angles)
-    corners = []
-    for i in range(0, DCT_angles.shape[0]):
-        if DCT_angles[i] < (180 - angular_deflection) or DCT_angles[i] > (180 + angular_deflection):
-            corners.append(i)
-    NbCorners = np.size(corners)
-
     # Segmenting data according to corners
     # ====================================
-    DCT_Segments = []
-
-    # Closed:
-    if np.allclose(DCT_data[0], DCT_data[-1]):
-        closed = True
-        if NbCorners == 0:
-            DCT_Segments.append(DCT_data)
-
-        elif NbCorners > 0:
-
-            if corners[0] == 0 and corners[-1] == len(DCT_data) - 1:
-                for i in range(0, NbCorners - 2):
-                    DCT_Segments.append(DCT_data[corners[i] : corners[i + 1] + 1])
-                DCT_Segments.append(DCT_data[corners[-2] : corners[-1] + 1])  # last segment
-
-            # regular case:
-            else:
-                DCT_Segments.append(DCT_data[: corners[0] + 1])  # first
-                if NbCorners > 1:  # intermediate segments:
-                    for i in range(0, NbCorners - 1):
-                        DCT_Segments.append(DCT_data[corners[i] : corners[i + 1] + 1])
-                DCT_Segments.append(DCT_data[corners[-1] :])  # last
-                DCT_Segments[0] = np.concatenate((DCT_Segments[-1][:-1], DCT_Segments[0]))
-                del DCT_Segments[-1]
-
-    else:  # Open:
-        closed = False
-        if NbCorners == 0:
-            DCT_Segments.append(DCT_data)
-
-        if NbCorners > 0:
-            DCT_Segments.append(DCT_data[: corners[0] + 1])  # first
-            if NbCorners > 1:  # intermediate segments:
-                for i in range(0, NbCorners - 1):
-                    DCT_Segments.append(DCT_data[corners[i] : corners[i + 1] + 1])
-            DCT_Segments.append(DCT_data[corners[-1] :])  # last segment
+    DCT_Segments = split_DCT_at_corners(DCT_data, angular_deflection)
+    if decimate:
+        tol = tol_interp if decimate is True else float(decimate)
+        DCT_Segments = [decimate_polyline(item, tol) for item in DCT_Segments]
 
     list_of_bsplines = []
     for i, item in enumerate(DCT_Segments):
@@ -18,9 +18,11 @@ from SONATA.cbm.mesh.mesh_utils import (
     remove_duplicates_from_list_preserving_order, sort_and_reassignID,)
 from SONATA.cbm.topo.BSplineLst_utils import (BSplineLst_from_dct,
                                               BSplineLst_Orientation,
+                                              as_ArcLengthBSplineLst,
                                               ProjectPointOnBSplineLst,
                                               copy_BSpline, copy_BSplineLst,
                                               discretize_BSplineLst,
+                                              discretize_BSplineLst_D1,
                                               find_BSplineLst_pos,
                                               findPnt_on_BSplineLst,
                                               get_BSpline_length,
@@ -30,14 +32,16 @@ from SONATA.cbm.topo.BSplineLst_utils import (BSplineLst_from_dct,
                                               trim_BSplineLst,)
 from SONATA.cbm.topo.cutoff import cutoff_layer
 from SONATA.cbm.topo.layer_utils import get_layer, get_segment, get_web
-from SONATA.cbm.topo.offset import shp_parallel_offset
+from SONATA.cbm.topo.offset import (np_parallel_offset, offset_deflection,
+                                    shp_parallel_offset,)
 from SONATA.cbm.topo.para_Geom2d_BsplineCurve import (BSplineLst_from_ParaLst,
                                                       ParaLst_from_BSplineLst,)
-from SONATA.cbm.topo.utils import isclose
+from SONATA.cbm.topo.utils import LazyAttributes, isclose
 from SONATA.cbm.topo.wire_utils import build_wire_from_BSplineLst
+from SONATA.utl.trace import current_span, span, traced
 
 
-class Layer(object):
+class Layer(LazyAttributes):
     """ 
     The layer object is constructed from multiple BSplineCurveSegments. It is the basis for all future operations. 
     The object can be constructed from either a discrete formulation of point tables or from an existing TopoDS_Wire.
@@ -84,16 +88,18 @@ class Layer(object):
         return self.BSplineLst[-1].EndPoint()
 
     @property
-    def a_BSplineLst(self):  # gp_Pnt2d
+    def a_BSplineLst(self):  # ArcLengthBSplineLst of the layer
+        self.BSplineLst = as_ArcLengthBSplineLst(self.BSplineLst)
         return self.BSplineLst
 
     @property
-    def b_BSplineLst(self):  # gp_Pnt2d
+    def b_BSplineLst(self):  # ArcLengthBSplineLst of the boundary
+        self.Boundary_BSplineLst = as_ArcLengthBSplineLst(self.Boundary_BSplineLst)
         return self.Boundary_BSplineLst
 
     @property
     def IsClosed(self):
-        return self.a_BSplineLst[0].StartPoint().IsEqual(self.a_BSplineLst[-1].EndPoint(), 1e-5)
+        return self.BSplineLst[0].StartPoint().IsEqual(self.BSplineLst[-1].EndPoint(), 1e-5)
 
     def __str__(self):
         # we can tell Python how to prepresent an object of our class (when using a print statement) for general purposes use  __repr__(self):
@@ -156,13 +162,36 @@ class Layer(object):
         self.BSplineLst = trim_BSplineLst(self.BSplineLst, self.globalStart, self.globalEnd, start, end)
         return self.BSplineLst
 
+    @traced("build_layer")
     def build_layer(self, l0=1):
-        npArray = discretize_BSplineLst(self.Boundary_BSplineLst, 1.2e-6 * l0)
+        """
+        builds the BSplineLst of the layer by offsetting its boundary by the 
+        layer thickness. The boundary is discretized with a deflection that 
+        scales with the thickness (offset_deflection) and refined where the
+        curvature is high. The points are offset along their exact normals
+        (np_parallel_offset). Only if that offset intersects itself, the 
+        dense discretization and the polygon offset of shapely are used.
+        The point counts are recorded in the 'discretize' and 'offset' spans
+        (SONATA.utl.trace).
+        """
+        with span("discretize") as sp:
+            chains = discretize_BSplineLst_D1(self.Boundary_BSplineLst, offset_deflection(self.thickness, l0), offset=self.thickness)
+            sp["points"] = sum(len(p) for (p, t) in chains)
         # plt.plot(*npArray.T, '.-')
-        self.offlinepts = shp_parallel_offset(npArray, self.thickness, self.join_style)
+        with span("offset") as sp:
+            self.offlinepts = np_parallel_offset(chains, self.thickness, join_style=self.join_style)
+            if self.offlinepts is None:  # self-intersecting offset
+                npArray = discretize_BSplineLst(self.Boundary_BSplineLst, 1.2e-6 * l0)
+                self.offlinepts = shp_parallel_offset(npArray, self.thickness, self.join_style)
+                sp["fallback"] = 1
+                sp["fallback_points"] = len(npArray)
+            sp["points"] = len(self.offlinepts)
         # plt.plot(*self.offlinepts.T, 'x-')
-        OffsetBSplineLst = BSplineLst_from_dct(self.offlinepts, angular_deflection=15, tol_interp=1e-8 * l0)
-        OffsetBSplineLst = cutoff_layer(self.Boundary_BSplineLst, OffsetBSplineLst, self.S1, self.S2, self.cutoff_style)
+        with span("interpolate") as sp:
+            OffsetBSplineLst = BSplineLst_from_dct(self.offlinepts, angular_deflection=15, tol_interp=1e-8 * l0)
+            sp["bsplines"] = len(OffsetBSplineLst)
+        with span("cutoff"):
+            OffsetBSplineLst = cutoff_layer(self.Boundary_BSplineLst, OffsetBSplineLst, self.S1, self.S2, self.cutoff_style)
         self.BSplineLst = OffsetBSplineLst
 
     def determine_a_nodes(self, SegmentLst, global_minLen, display=None):
@@ -224,6 +253,7 @@ class Layer(object):
         self.a_nodes = remove_duplicates_from_list_preserving_order(new_a_nodes)
         self.a_nodes = merge_nodes_if_too_close(self.a_nodes, self.a_BSplineLst, global_minLen, 0.01)
 
+    @traced("mesh_layer")
     def mesh_layer(self, SegmentLst, global_minLen, proj_tol_1=9e-2, proj_tol_2=4e-1, crit_angle_1=110, alpha_crit_2=60, growing_factor=1.8, shrinking_factor=0.01, display=None, l0=None):
         """
         The mesh layer function discretizes the layer, which is composed of a 
@@ -260,18 +290,23 @@ class Layer(object):
         -------
         self.cells: (list of cells) 
         """
-        self.determine_a_nodes(SegmentLst, global_minLen, display)
-        self.a_nodes, self.b_nodes, self.cells = mesh_by_projecting_nodes_on_BSplineLst(
-            self.a_BSplineLst, self.a_nodes, self.b_BSplineLst, self.thickness, proj_tol_1, crit_angle_1, LayerID=self.ID, refL=l0, display=display
-        )
+        with span("determine_a_nodes"):
+            self.determine_a_nodes(SegmentLst, global_minLen, display)
+        with span("mesh_by_projection"):
+            self.a_nodes, self.b_nodes, self.cells = mesh_by_projecting_nodes_on_BSplineLst(
+                self.a_BSplineLst, self.a_nodes, self.b_BSplineLst, self.thickness, proj_tol_1, crit_angle_1, LayerID=self.ID, refL=l0, display=display
+            )
         # enhanced_cells = modify_cornerstyle_one(cells,self.b_BSplineLst)
-        self.cells, nb_nodes = modify_sharp_corners(self.cells, self.b_BSplineLst, global_minLen, self.thickness, self.ID, proj_tol_2, alpha_crit_2, display=display)
+        with span("modify_sharp_corners"):
+            self.cells, nb_nodes = modify_sharp_corners(self.cells, self.b_BSplineLst, global_minLen, self.thickness, self.ID, proj_tol_2, alpha_crit_2, display=display)
         self.b_nodes.extend(nb_nodes)
         try:
-            self.cells, nb_nodes = second_stage_improvements(self.cells, self.b_BSplineLst, global_minLen, self.ID, growing_factor, shrinking_factor, display=display)
+            with span("second_stage_improvements"):
+                self.cells, nb_nodes = second_stage_improvements(self.cells, self.b_BSplineLst, global_minLen, self.ID, growing_factor, shrinking_factor, display=display)
             self.b_nodes.extend(nb_nodes)
         except:
             pass
+        current_span()["cells"] = len(self.cells)
 
         # self.b_nodes = sorted(self.b_nodes, key=lambda Node: (Node.parameters[1],Node.parameters[2]))
 
@@ -279,6 +314,7 @@ class Layer(object):
             c.calc_theta_1()
             c.theta_3 = self.Orientation
             c.MatID = int(self.MatID)
+            c.LayerID = self.ID
             c.structured = True
 
         return self.cells
@@ -4,6 +4,9 @@ Created on Mon Nov 21 15:37:44 2016
 
 @author: TPflumm
 """
+# Core Library modules
+import math
+
 # Third party modules
 import matplotlib.pyplot as plt
 import numpy as np
@@ -137,6 +140,194 @@ def shp_parallel_offset(arrPts, dist, join_style=1, side="right", res=16):
     return data
 
 
+def offset_deflection(thickness, l0, rel_tol=1e-2, min_rel=1.2e-6, max_rel=1e-4):
+    """
+    returns the deflection that is used to discretize the boundary of a 
+    layer before it is offset. It scales with the layer thickness and is 
+    bounded by min_rel*l0 (the former fixed value) and max_rel*l0.
+    """
+    return float(np.clip(rel_tol * abs(thickness), min_rel * l0, max_rel * l0))
+
+
+def _shapely_reverses_right_offset():
+    """ returns True if LineString.parallel_offset returns right hand side 
+    offsets in reverse direction (shapely < 2.0) """
+    global _REVERSED_RIGHT_OFFSET
+    if _REVERSED_RIGHT_OFFSET is None:
+        offset = shp.LineString([(0, 0), (1, 0)]).parallel_offset(0.1, "right", 16, 1)
+        _REVERSED_RIGHT_OFFSET = bool(np.asarray(offset.coords)[0, 0] > 0.5)
+    return _REVERSED_RIGHT_OFFSET
+
+
+_REVERSED_RIGHT_OFFSET = None
+
+
+def _cross(a, b):
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+def _join_points(c, qa, qb, ta, tb, sigma, dist, join_style, res, mitre_limit=5.0):
+    """ returns the points that are inserted between qa and qb at a convex 
+    corner c (1:round, 2:mitre, 3:bevel) """
+    if join_style == 1:
+        a0 = math.atan2(*(qa - c)[::-1])
+        a1 = math.atan2(*(qb - c)[::-1])
+        da = (a1 - a0 + math.pi) % (2 * math.pi) - math.pi
+        n = int(math.ceil(abs(da) / (0.5 * math.pi / res)))
+        if n < 2:
+            return np.empty((0, 2))
+        a = a0 + da * np.arange(1, n) / n
+        return c + dist * np.column_stack((np.cos(a), np.sin(a)))
+    elif join_style == 2:
+        denom = _cross(ta, tb)
+        s = _cross(qb - qa, tb) / denom
+        m = qa + s * ta
+        if np.linalg.norm(m - c) <= mitre_limit * dist:
+            return m[None, :]
+    return np.empty((0, 2))
+
+
+def _trim_concave(A, B, c, dist, phi):
+    """
+    intersects the tail of the offset chain A with the head of the offset 
+    chain B at a concave corner c and returns (ia, ib, X) so that 
+    A[:ia+1], X, B[ib+1:] is the trimmed polyline, or None.
+    """
+    r = 4 * dist / max(math.sin(0.5 * phi), 0.05) + dist
+    na = np.nonzero(np.linalg.norm(A - c, axis=1) > r)[0]
+    nb = np.nonzero(np.linalg.norm(B - c, axis=1) > r)[0]
+    a0 = max(na[-1] if len(na) else 0, 0)
+    b1 = min(nb[0] if len(nb) else len(B) - 1, len(B) - 1)
+    if len(A) - a0 < 2 or b1 < 1:
+        return None
+    P0 = A[a0:-1][:, None, :]
+    R = (A[a0 + 1:] - A[a0:-1])[:, None, :]
+    Q0 = B[:b1][None, :, :]
+    W = (B[1:b1 + 1] - B[:b1])[None, :, :]
+    denom = _cross(R, W)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = _cross(Q0 - P0, W) / denom
+        u = _cross(Q0 - P0, R) / denom
+    hit = (np.abs(denom) > 1e-300) & (s >= 0) & (s <= 1) & (u >= 0) & (u <= 1)
+    if not hit.any():
+        return None
+    (i, j) = np.nonzero(hit)
+    k = np.lexsort((j, -i))[0]  # closest to the corner: last segment of A, first of B
+    (i, j) = (i[k], j[k])
+    X = A[a0 + i] + s[i, j] * (A[a0 + i + 1] - A[a0 + i])
+    return (a0 + i, j, X)
+
+
+def np_parallel_offset(chains, dist, side="right", join_style=1, res=16, Resolution=100):
+    """
+    offsets a discretized BSplineLst with the exact normals of its points. 
+    The offset points of smooth curves lie on the exact offset curve, so the
+    boundary can be discretized much coarser than for the polygon offset of
+    shp_parallel_offset. Convex corners between the BSplines are joined 
+    (1:round, 2:mitre, 3:bevel), the offset chains at concave corners are 
+    trimmed to their intersection. Closed curves are offset inwards.
+    
+    Parameters
+    ----------
+    chains : list of tuples
+        (points (n,2), unit tangents (n,2)) of consecutive BSplines, see 
+        discretize_BSplineLst_D1
+    dist : float
+        offset distance
+    side : str, optional
+        'right' or 'left' for open curves. The default is 'right'.
+    join_style : int, optional
+        1:round, 2:mitre, 3:bevel. The default is 1.
+    res : int, optional
+        number of segments of a quarter circle of round joins.
+    Resolution : int, optional
+        long segments are subdivided to a length below 
+        total length / Resolution, equivalent to shp_parallel_offset.
+
+    Returns
+    -------
+    data : ndarray or None
+        the offset polyline with the same orientation conventions as 
+        shp_parallel_offset or None if the offset intersects itself. In 
+        that case shp_parallel_offset has to be used.
+    """
+    pts = np.vstack([p for (p, t) in chains])
+    closed = P2Pdistance(pts[0], pts[-1]) <= 1e-6
+    if closed:
+        area = 0.5 * np.sum(_cross(pts[:-1], pts[1:]))
+        sigma = -1.0 if area > 0 else 1.0  # inwards: left of a counter-clockwise curve
+    else:
+        sigma = 1.0 if side == "right" else -1.0
+
+    # the offset of a curve develops cusps if the curvature on the offset side exceeds 1/dist
+    for (p, t) in chains:
+        h = np.linalg.norm(np.diff(p, axis=0), axis=1)
+        turn = _cross(t[:-1], t[1:]) * sigma
+        theta = np.arccos(np.clip(np.einsum("ij,ij->i", t[:-1], t[1:]), -1.0, 1.0))
+        if np.any((turn < 0) & (theta * dist >= h)):
+            return None
+
+    Q = [p + sigma * dist * np.column_stack((t[:, 1], -t[:, 0])) for (p, t) in chains]
+    n = len(Q)
+    head = [0] * n
+    tail = [len(q) for q in Q]
+    post = [np.empty((0, 2))] * n
+
+    for k in range(n if closed else n - 1):
+        l = (k + 1) % n
+        (ta, tb) = (chains[k][1][-1], chains[l][1][0])
+        c = 0.5 * (chains[k][0][-1] + chains[l][0][0])
+        cross = _cross(ta, tb)
+        dot = float(np.dot(ta, tb))
+        if abs(cross) < 1e-9 and dot > 0:  # smooth transition
+            head[l] = max(head[l], 1)
+        elif cross * sigma > 0:  # convex corner
+            post[k] = _join_points(c, Q[k][-1], Q[l][0], ta, tb, sigma, dist, join_style, res)
+        else:  # concave corner
+            trim = _trim_concave(Q[k][: tail[k]], Q[l][head[l]:], c, dist, math.pi - math.acos(np.clip(dot, -1, 1)))
+            if trim is None:
+                return None
+            (ia, ib, X) = trim
+            tail[k] = ia + 1
+            head[l] = head[l] + ib + 1
+            post[k] = X[None, :]
+
+    parts = []
+    for k in range(n):
+        if head[k] > tail[k]:
+            return None
+        parts.append(Q[k][head[k]: tail[k]])
+        parts.append(post[k])
+    data = np.vstack(parts)
+    if closed:
+        data = np.vstack((data, data[0]))
+
+    # remove coincident points
+    keep = np.ones(len(data), dtype=bool)
+    keep[1:] = np.linalg.norm(np.diff(data, axis=0), axis=1) > 1e-9 * max(np.ptp(data, axis=0).max(), 1e-300)
+    data = data[keep]
+    if len(data) < 2 or not shp.LineString(data).is_simple:
+        return None
+    if closed and np.sign(0.5 * np.sum(_cross(data[:-1], data[1:]))) != np.sign(area):
+        return None
+
+    # ==============CHECK ORIENTATION (equivalent to shp_parallel_offset)======
+    if closed:
+        if 0.5 * np.sum(_cross(data[:-1], data[1:])) > 0:
+            data = np.flipud(data)
+    elif side == "right" and _shapely_reverses_right_offset():
+        data = np.flipud(data)
+
+    # ==============Interpolate large linear spaces=============================
+    seg = np.linalg.norm(np.diff(data, axis=0), axis=1)
+    nsub = np.ceil(seg / (seg.sum() / Resolution)).astype(int)
+    if (nsub > 1).any():
+        f = np.concatenate([np.arange(m) / m for m in nsub])
+        i = np.repeat(np.arange(len(seg)), nsub)
+        data = np.vstack((data[i] + f[:, None] * (data[i + 1] - data[i]), data[-1]))
+    return data
+
+
 # ==============================================================================
 if __name__ == "__main__":
     exec(compile(open("SONATA.py").read(), "SONATA.py", "exec"))
@@ -1,5 +1,6 @@
 # PythonOCC Libraries
 # Third party modules
+import numpy as np
 from OCC.Core.Geom2d import Geom2d_BSplineCurve
 from OCC.Core.Geom2dAPI import Geom2dAPI_Interpolate, Geom2dAPI_PointsToBSpline
 from OCC.Core.gp import gp_Pnt2d
@@ -41,6 +42,19 @@ class Para_Geom2d_BSplineCurve(object):
         self.Degree_bin = Geom2d_BSplineCurve.Degree()  # np.array
         self.Periodic_bin = Geom2d_BSplineCurve.IsPeriodic()  # np.array
 
+    @classmethod
+    def from_arrays(cls, Poles, Weights, Knots, Multiplicities, Degree, Periodic):
+        """creates the Para_Geom2d_BSplineCurve from the arrays of poles 
+        (n,2), weights, knots and multiplicities without an OCC curve"""
+        self = cls.__new__(cls)
+        self.Poles_bin = np.asarray(Poles, dtype=float)
+        self.Weights_bin = np.asarray(Weights, dtype=float)
+        self.Knots_bin = np.asarray(Knots, dtype=float)
+        self.Multiplicities_bin = np.asarray(Multiplicities, dtype=int)
+        self.Degree_bin = int(Degree)
+        self.Periodic_bin = bool(Periodic)
+        return self
+
     def BSplineCurve2d(self):
         Poles = TColgp_Array1OfPnt2d_from_nparray(self.Poles_bin.T)
         Weights = _Tcol_dim_1(self.Weights_bin.tolist(), TColStd_Array1OfReal)
@@ -1,24 +1,25 @@
 # -*- coding: utf-8 -*-
 """
-The SONATA.topo.projection module uses the python invervaltree package 
-(Editable interval tree data structure for Python) to determine the cummulated 
-layup boundaries of the SONATA Layup definition.
+The SONATA.topo.projection module determines the cummulated layup boundaries
+of the SONATA Layup definition. The intervals are stored in the IntervalLayup
+structure of sorted breakpoints, which replaces the former intervaltree
+(Editable interval tree data structure for Python) representation.
 
  consits of the following functions:
     
     - timelines(y, xstart, xstop, c='b'): Plot timelines at y from xstart to 
             xstop with given color.
-    - datafunc1(interval,islower=None): boolean function that can be used in 
-            the intervaltree slice function 
-    - datafunc2(interval,islower=None): boolean function that can be used in 
-            the intervaltree slice function 
+    - IntervalLayup: persistent sorted-breakpoint interval structure that
+            handles wrap-around intervals (begin > end) natively.
+    - layup_boundaries(Layup, start, values): determines the relevant and
+            cummulated boundaries of all layers in one pass.
     - projection_of_layers2(layup,begin,end,idx): Truthfully I currently don't
             know the exact inded of this funtion.
     - insert_interval_in_layup(layup,begin,end): insert_interval_in_layup 
-            generates a intervaltree structure t1 from layup 
-            and inserts a new intervaltree set t2 [begin, end] or 
+            generates a IntervalLayup structure t1 from layup 
+            and inserts a new interval [begin, end] or 
             [0,end][begin,1] into the existing the set t1
-    - chop_interval_from_layup(layup,begin,end): chops an intervaltree 
+    - chop_interval_from_layup(layup,begin,end): chops an IntervalLayup 
             structure t1 from layup to a given interval [begin, end] or 
             [0,end][begin,1].
     - cummulated_layup_boundaries(Layup): fuctions generates a interval 
@@ -30,7 +31,6 @@ Created on Mon Dec 19 16:32:15 2016
 @author: TPflumm
 """
 # Third party modules
-import intervaltree
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -45,93 +45,201 @@ def timelines(y, xstart, xstop, c="b"):
         plt.hlines(y, xstart, xstop, colors=c, lw=4)
 
 
-def datafunc1(interval, islower=None):
-    """boolean function that can be used in the intervaltree slice function """
-    if islower == True:
-        return False
-    elif islower == False:
-        return True
-    else:
-        return False
+class IntervalLayup(object):
+    """
+    persistent interval structure on the normalized coordinate [0, 1] of a
+    segment boundary. It replaces the intervaltree representation of the
+    layup projections.
+
+    The intervals are stored as sorted breakpoints and the value (layer
+    number, layer ID or negative web ID) of each piece between two
+    neighbouring breakpoints. Uncovered pieces have the value NaN. Wrap-around
+    intervals (begin > end, the layer is defined across the origin) are
+    handled natively as [0, end] and [begin, 1]. Breakpoints are located by
+    binary search (np.searchsorted), so that chop, insert and query run in
+    O(log n) plus the copy of the (short) breakpoint arrays.
+
+    Attributes
+    ----------
+    breaks : ndarray
+        sorted breakpoints, always starting with 0 and ending with 1
+    values : ndarray
+        values of the len(breaks)-1 pieces, NaN where nothing is defined
+
+    Examples
+    --------
+    >>> t = IntervalLayup.from_array(np.array([[0.3, 0.5, 0]]))
+    >>> t.insert(0.7, 0.3, 1)
+    >>> t.to_array()
+    array([[0.7, 1. , 1. ],
+           [0. , 0.3, 1. ],
+           [0.3, 0.5, 0. ]])
+
+    """
 
+    __slots__ = ("breaks", "values")
 
-def datafunc2(interval, islower=None):
-    """boolean function that can be used in the intervaltree slice function """
-    if islower == True:
-        return True
-    elif islower == False:
-        return False
-    else:
-        return False
+    def __init__(self, breaks=None, values=None):
+        if breaks is None:
+            self.breaks = np.array([0.0, 1.0])
+            self.values = np.array([np.nan])
+        else:
+            self.breaks = np.asarray(breaks, dtype=float)
+            self.values = np.asarray(values, dtype=float)
+
+    @classmethod
+    def from_array(cls, layup):
+        """ generates the structure from an array of non-overlapping
+        [start, end, value] rows, e.g. the result of insert_interval_in_layup.
+        Wrap-around rows (start > end) are split at the origin."""
+        t = cls()
+        layup = np.asarray(layup, dtype=float)
+        if layup.size == 0:
+            return t
+        for row in layup.reshape(-1, layup.shape[-1]):
+            t.insert(row[0], row[1], row[2])
+        return t
+
+    def copy(self):
+        return IntervalLayup(self.breaks.copy(), self.values.copy())
+
+    def __repr__(self):
+        return "<IntervalLayup: %i intervals>" % int(np.count_nonzero(~np.isnan(self.values)))
+
+    def _split(self, x):
+        """ inserts the breakpoint x and returns its index """
+        i = int(np.searchsorted(self.breaks, x))
+        if i < len(self.breaks) and self.breaks[i] == x:
+            return i
+        self.breaks = np.insert(self.breaks, i, x)
+        self.values = np.insert(self.values, i, self.values[i - 1])
+        return i
+
+    def _assign(self, begin, end, value):
+        """ assigns value to the regular interval [begin, end] and removes
+        all breakpoints inside of it """
+        if not begin < end:
+            return None
+        i = self._split(begin)
+        j = self._split(end)
+        self.breaks = np.concatenate((self.breaks[: i + 1], self.breaks[j:]))
+        self.values = np.concatenate((self.values[:i], [value], self.values[j:]))
+        return None
+
+    def insert(self, begin, end, value):
+        """ inserts the interval [begin, end] (or [0,end][begin,1] if
+        begin > end) with the given value. The existing intervals are chopped
+        where they overlap with the new interval."""
+        (begin, end) = (float(begin), float(end))
+        if begin > end:
+            self._assign(0.0, end, value)
+            self._assign(begin, 1.0, value)
+        else:
+            self._assign(begin, end, value)
+        return None
+
+    def chop(self, begin, end):
+        """ chops the structure to the interval [begin, end] or
+        [0,end][begin,1] if begin > end """
+        (begin, end) = (float(begin), float(end))
+        if begin > end:
+            self._assign(end, begin, np.nan)
+        else:
+            self._assign(0.0, begin, np.nan)
+            self._assign(end, 1.0, np.nan)
+        return None
+
+    def chopped(self, begin, end):
+        """ returns a chopped copy of the structure """
+        t = self.copy()
+        t.chop(begin, end)
+        return t
+
+    def query(self, s):
+        """ returns the value at the coordinate s (NaN if s is not covered).
+        At breakpoints the value of the following interval is returned."""
+        i = int(np.searchsorted(self.breaks, s, side="right")) - 1
+        return self.values[min(max(i, 0), len(self.values) - 1)]
+
+    def to_array(self, sort=True):
+        """ returns the intervals as numpy array of [start, end, value] rows.
+
+        With sort=True the rows are ordered along the boundary as by
+        sort_layup_projection: an interval chain that wraps around the
+        origin starts behind its first gap, otherwise the rows are sorted by
+        their start.
+        """
+        mask = ~np.isnan(self.values)
+        arr = np.column_stack((self.breaks[:-1], self.breaks[1:], self.values))[mask]
+        if sort and len(arr) > 1 and mask[0] and mask[-1] and not np.all(mask):
+            gap = np.flatnonzero(~mask)
+            first = gap[0] + np.flatnonzero(mask[gap[0]:])[0]
+            k = int(np.count_nonzero(mask[:first]))
+            arr = np.vstack((arr[k:], arr[:k]))
+        return arr
+
+
+def layup_boundaries(Layup, start=None, values=None):
+    """The layup_boundaries function determines the relevant and the
+    cummulated layup boundaries of all layers of a Layup in a single pass over
+    one IntervalLayup structure.
+
+    Args:
+        Layup: np.array of the form [[Start[-], End[-], ...]]
+        start: np.array of [start, end, value] rows the layers are put onto,
+            e.g. the boundary_ivLst of a Segment. Default: [[0, 1, 0]]
+        values: list of the values of the layers. Default: 1 ... nlayers
+
+    Returns:
+        (relevant, cummulated): the sorted [start, end, value] arrays of the
+            relevant boundaries of each layer (the part of the cummulated
+            boundary below the layer in its own interval) and the nlayers+1
+            cummulated boundaries before the first and after each layer.
+    """
+    if start is None:
+        start = np.array([[0.0, 1.0, 0.0]])
+    nlayers = 0 if np.size(Layup) == 0 else int(np.size(Layup, 0))
+    if values is None:
+        values = np.arange(1, nlayers + 1)
+
+    t = IntervalLayup.from_array(start)
+    relevant = []
+    cummulated = [t.to_array()]
+    for i in range(nlayers):
+        (begin, end) = (float(Layup[i][0]), float(Layup[i][1]))
+        relevant.append(t.chopped(begin, end).to_array())
+        t.insert(begin, end, values[i])
+        cummulated.append(t.to_array())
+    return (relevant, cummulated)
 
 
 # =====================================================
 def projection_of_layers2(layup, begin, end, idx):
-    """Truthfully, I currently don'tknow the exact itend of this funtion."""
+    """Truthfully, I currently don'tknow the exact itend of this funtion.
+    It returns the layup intervals together with the parts of [begin, end]
+    that are not covered by the layup, which get the value idx."""
     if layup.ndim == 1:
         layup = np.array([layup])
-    # print layup
-
-    # Define gloab interval between 0 and 1
-    t0 = intervaltree.IntervalTree()
-    t0.addi(0, 1)
 
-    # Put layup format into Intervaltree datastructure
-    t1 = intervaltree.IntervalTree()
+    rows = []
+    t2 = IntervalLayup()
+    t2.insert(begin, end, idx)
     for i, item in enumerate(layup):
         if item[1] < item[0]:
-            t1.addi(0, float(item[1]), i + 1)
-            t1.addi(float(item[0]), 1, i + 1)
+            rows.extend([[0.0, float(item[1]), i + 1], [float(item[0]), 1.0, i + 1]])
         else:
-            t1.addi(float(item[0]), float(item[1]), i + 1)
-
-    # Initialize to be projected interval between begin and end
-    t2 = intervaltree.IntervalTree()
-    t2.addi(begin, end)
-
-    # Generate Negativ of Intervals
-    for iv in t1:
-        t0.chop(iv.begin, iv.end)
-
-    # Intersect t0 with t2 and add to t1
-    for iv in t0:
-        t2.slice(iv.begin, datafunc1)
-
-    for iv in t0:
-        t2.slice(iv.end, datafunc2)
-
-    for iv in t1:
-        t2.remove_overlap(iv.begin, iv.end)
-
-    # Define Layer Number
-    #    datalist = []
-    #    for iv in t1:
-    #        datalist.append(iv.data)
-    #    nextlayer = max(datalist)+1
-
-    # Bring everything together
-    for iv in t2:
-        if iv.data == True:
-            t1.addi(iv.begin, iv.end, idx)
-        elif iv.data == None:
-            t1.addi(iv.begin, iv.end, idx)
-
-    # transform back to python np.array
-    tmp = []
-    for iv in t1:
-        tmp.append([iv.begin, iv.end, iv.data])
-    Projection = np.asarray(tmp)
+            rows.append([float(item[0]), float(item[1]), i + 1])
+        t2.insert(item[0], item[1], np.nan)
 
+    Projection = np.vstack((np.asarray(rows), t2.to_array(sort=False)))
     return Projection
 
 
 def insert_interval_in_layup(layup, begin, end, **kw):
-    """ insert_interval_in_layup generates a intervaltree structure t1 from layup 
-    and inserts a new intervaltree set t2 [begin, end] or [0,end][begin,1] into
-    the existing the set t1. First t1 is chopped with t2, then t2 is added to t1.
-    
-    for documentation of the intervaltree module refer to: 
-        https://pypi.python.org/pypi/intervaltree
+    """ insert_interval_in_layup generates a IntervalLayup structure t1 from
+    layup and inserts a new interval [begin, end] or [0,end][begin,1] into
+    the existing the set t1. The intervals of t1 are chopped where they
+    overlap with the new interval.
     
     Args:
         begin: float[0:1]: start of the interval 
@@ -139,11 +247,11 @@ def insert_interval_in_layup(layup, begin, end, **kw):
             can be larger than end (The layer is defined across the origin)
             
     Returns: 
-        Projection: numpy array of the intervaltree structure of the form:
+        Projection: sorted numpy array of the interval structure of the form:
                   start end layer#
-        np.array([[ 0.3  0.7  3. ]
-                  [ 0.7  1.   2. ]
-                  [ 0.   0.3  2. ]])                
+        np.array([[ 0.7  1.   2. ]
+                  [ 0.   0.3  2. ]
+                  [ 0.3  0.7  3. ]])                
     """
 
     # KWARGS:
@@ -152,40 +260,14 @@ def insert_interval_in_layup(layup, begin, end, **kw):
     else:
         idx = max(layup[:, 2]) + 1
 
-    t1 = intervaltree.IntervalTree()
-    for i, item in enumerate(layup):
-        t1.addi(float(item[0]), float(item[1]), int(item[2]))
-
-    # Initialize to be projected interval between begin and end
-    t2 = intervaltree.IntervalTree()
-    if begin > end:
-        t2.addi(0, end)
-        t2.addi(begin, 1)
-    else:
-        t2.addi(begin, end)
-
-    # chop intervaltree t1
-    for iv in t2:
-        t1.chop(iv.begin, iv.end)
-
-    # insert t2
-    for iv in t2:
-        t1.addi(iv.begin, iv.end, idx)
-
-    # transform back to python np.array
-    tmp_pj = []
-    for iv in t1:
-        tmp_pj.append([iv.begin, iv.end, iv.data])
-    Projection = np.asarray(tmp_pj)
-    return Projection
+    t1 = IntervalLayup.from_array(layup)
+    t1.insert(begin, end, idx)
+    return t1.to_array()
 
 
 def chop_interval_from_layup(layup, begin, end):
-    """ chop_interval_from_layup chops an intervaltree structure t1 from layup 
-    to a given interval [begin, end] or [0,end][begin,1].
-    
-    for documentation of the intervaltree module refer to: 
-        https://pypi.python.org/pypi/intervaltree
+    """ chop_interval_from_layup chops an IntervalLayup structure t1 from
+    layup to a given interval [begin, end] or [0,end][begin,1].
     
     Args:
         begin: float[0:1]: start of the interval 
@@ -194,44 +276,29 @@ def chop_interval_from_layup(layup, begin, end):
         the origin)
             
     Returns: 
-        Projection: numpy.array of the intervaltree structure of the form:
+        Projection: sorted numpy.array of the interval structure of the form:
                   start end layer#
-        np.array([[ 0.3  0.7  3. ]
-                  [ 0.7  1.   2. ]
-                  [ 0.   0.3  2. ]])                
+        np.array([[ 0.7  1.   2. ]
+                  [ 0.   0.3  2. ]
+                  [ 0.3  0.7  3. ]])                
     """
-    # get layup to intervaltree definition
-    t1 = intervaltree.IntervalTree()
-    for i, item in enumerate(layup):
-        t1.addi(float(item[0]), float(item[1]), int(item[2]))
-
-    # result_tree chop
-    if begin > end:
-        t1.chop(end, begin)
-    else:
-        t1.chop(0, begin)
-        t1.chop(end, 1)
-
-    # transform back to python np.array
-    tmp_pj = []
-    for iv in t1:
-        tmp_pj.append([iv.begin, iv.end, iv.data])
-    Projection = np.asarray(tmp_pj)
-    return Projection
+    t1 = IntervalLayup.from_array(layup)
+    t1.chop(begin, end)
+    return t1.to_array()
 
 
 def sort_layup_projection(Projection):
     """The sort_layup_projection fuctions sorts the interval structure.
         
     Args:         
-        Projection: list of numpy array of the intervaltree structure of the form:
+        Projection: list of numpy array of the interval structure of the form:
                   start end layer#
         np.array([[ 0.3  0.5  3. ]
                   [ 0.7  1.   2. ]
                   [ 0.   0.3  2. ]])    
             
     Returns: 
-        Projection: list of sorted numpy array of the intervaltree structure of the form:
+        Projection: list of sorted numpy array of the interval structure of the form:
                   start end layer#
         np.array([[ 0.7  1.   2. ]
                   [ 0.   0.3  2. ]
@@ -240,6 +307,9 @@ def sort_layup_projection(Projection):
     # print(Projection)
     sorted_Projection = []
     for i, proj in enumerate(Projection):
+        if len(proj) == 0:
+            sorted_Projection.append(proj)
+            continue
         a = proj[:, :2].flatten()
         unique, counts = np.unique(a, return_counts=True)
         iv_boundaries = np.sort(unique[np.where(counts == 1)])
@@ -277,32 +347,13 @@ def cummulated_layup_boundaries(Layup):
                   #Start[-]	End[-] thickness [mm] Orientation [deg] MatID
             
     Returns: 
-        Projection: numpy array of the intervaltree structure of the form:
+        Projection: list of the nlayers+1 sorted numpy arrays of the form:
                   start end layer#
-        np.array([[ 0.3  0.7  3. ]
-                  [ 0.7  1.   2. ]
-                  [ 0.   0.3  2. ]])                
+        np.array([[ 0.7  1.   2. ]
+                  [ 0.   0.3  2. ]
+                  [ 0.3  0.7  3. ]])                
     """
-
-    nlayers = int(np.size(Layup, 0))
-    # clean up Layup array
-    a = np.delete(Layup, [2, 3, 4], 1)
-    b = np.transpose(np.linspace(1, nlayers, nlayers))
-    c = np.c_[a, b]
-    clean_layup = np.insert(c, 0, np.array((0, 1, 0)), 0)
-    tmp = clean_layup[[0]]
-
-    # Iterate over Layup
-    projectionlist = []
-    projectionlist.append(tmp)
-    for i in range(1, nlayers + 1, 1):
-        begin = float(clean_layup[i][0])
-        end = float(clean_layup[i][1])
-        tmp = insert_interval_in_layup(tmp, begin, end)
-        tmp = tmp[np.lexsort(np.fliplr(tmp).T)]
-        projectionlist.append(tmp)
-
-    return sort_layup_projection(projectionlist)
+    return layup_boundaries(Layup)[1]
 
 
 def relevant_cummulated_layup_boundaries(Layup):
@@ -317,7 +368,7 @@ def relevant_cummulated_layup_boundaries(Layup):
                   [  0.25 ,  0.3 ,  0.6  , 45.  ,   2.  ]],)
                   #Start[-]	End[-] thickness [mm] Orientation [deg] MatID
             
-        Returns: Projection: list of numpy arrays of the intervaltree structure 
+        Returns: Projection: list of numpy arrays of the interval structure 
             of the form:
                           start end layer#
                   np.array([[ 0.3  0.7  3. ]
@@ -328,25 +379,7 @@ def relevant_cummulated_layup_boundaries(Layup):
         return []
 
     else:
-        nlayers = int(np.size(Layup, 0))
-        # clean up Layup array
-        a = np.delete(Layup, [2, 3, 4], 1)
-        b = np.transpose(np.linspace(1, nlayers, nlayers))
-        c = np.c_[a, b]
-        clean_layup = np.insert(c, 0, np.array((0, 1, 0)), 0)
-        tmp = clean_layup[[0]]
-        # print clean_layup
-
-        # Iterate over Layup
-        relevant_projectionlist = []
-        for i in range(1, nlayers + 1, 1):
-            begin = float(clean_layup[i][0])
-            end = float(clean_layup[i][1])
-            relevant_projectionlist.append(chop_interval_from_layup(tmp, begin, end))
-            tmp = insert_interval_in_layup(tmp, begin, end)
-            tmp = tmp[np.lexsort(np.fliplr(tmp).T)]
-
-        return sort_layup_projection(relevant_projectionlist)
+        return layup_boundaries(Layup)[0]
 
 
 def inverse_relevant_cummulated_layup_boundaries(Layup):
@@ -362,7 +395,7 @@ def inverse_relevant_cummulated_layup_boundaries(Layup):
                   [  0.25 ,  0.3 ,  0.6  , 45.  ,   2.  ]],)
                   #Start[-]	End[-] thickness [mm] Orientation [deg] MatID
             
-    Returns: Projection: list of numpy arrays of the intervaltree structure 
+    Returns: Projection: list of numpy arrays of the interval structure 
             of the form:
                       start end layer#
             np.array([[ 0.3  0.7  3. ]
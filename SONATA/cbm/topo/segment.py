@@ -14,6 +14,7 @@ from SONATA.cbm.mesh.mesh_utils import (
     grab_nodes_on_BSplineLst, remove_dublicate_nodes,
     remove_duplicates_from_list_preserving_order, sort_and_reassignID,)
 from SONATA.cbm.topo.BSplineLst_utils import (BSplineLst_from_dct,
+                                              as_ArcLengthBSplineLst,
                                               copy_BSplineLst,
                                               find_BSplineLst_coordinate,
                                               get_BSpline_length,
@@ -30,14 +31,16 @@ from SONATA.cbm.topo.layer_utils import get_layer, get_segment, get_web
 from SONATA.cbm.topo.para_Geom2d_BsplineCurve import (BSplineLst_from_ParaLst,
                                                       ParaLst_from_BSplineLst,)
 from SONATA.cbm.topo.projection import (
-    chop_interval_from_layup, cummulated_layup_boundaries,
+    IntervalLayup, chop_interval_from_layup, cummulated_layup_boundaries,
     insert_interval_in_layup, inverse_relevant_cummulated_layup_boundaries,
-    plot_layup_projection, relevant_cummulated_layup_boundaries,
-    sort_layup_projection,)
+    layup_boundaries, plot_layup_projection,
+    relevant_cummulated_layup_boundaries, sort_layup_projection,)
+from SONATA.cbm.topo.utils import LazyAttributes
 from SONATA.cbm.topo.wire_utils import build_wire_from_BSplineLst
+from SONATA.utl.trace import span, status, traced
 
 
-class Segment(object):
+class Segment(LazyAttributes):
     """ 
     The Segment object is constructed from multiple Layers obejcts. 
     Each Segment has one Segment boundary.
@@ -146,6 +149,7 @@ class Segment(object):
         for iv in ivLst:
             # print iv[0],iv[1],iv[2]
             if int(iv[2]) == 0:
+                self.BSplineLst = as_ArcLengthBSplineLst(self.BSplineLst)
                 BSplineLst = self.BSplineLst
                 start = 0.0
                 end = 1.0
@@ -167,13 +171,13 @@ class Segment(object):
                 lid = iv[2] - (self.ID * 1000)
                 # print iv[2],(self.ID*1000)
                 layer = self.LayerLst[int(lid) - 1]
-                BSplineLst = layer.BSplineLst
+                BSplineLst = layer.a_BSplineLst
                 start = layer.S1
                 end = layer.S2
 
             else:
                 layer = self.Segment0.LayerLst[int(iv[2]) - 1]
-                BSplineLst = layer.BSplineLst
+                BSplineLst = layer.a_BSplineLst
                 start = layer.S1
                 end = layer.S2
 
@@ -189,6 +193,7 @@ class Segment(object):
 
         if lid == 0:
             get_segment(lid, SegmentLst)
+            SegmentLst[0].BSplineLst = as_ArcLengthBSplineLst(SegmentLst[0].BSplineLst)
             BSplineLst = SegmentLst[0].BSplineLst
             start = 0.0
             end = 1.0
@@ -251,21 +256,21 @@ class Segment(object):
         p1 = p0.Translated(v)
         return p1
 
+    @traced("segment", lambda self, *args, **kwargs: {"ID": self.ID})
     def build_layers(self, WebLst=None, Segment0=None, display=None, l0=None, **kwargs):
         """The build_layers member function of the class Segment generates all Layer objects and it's associated wires
         and return the relevant_boundary_BSplineLst"""
         # plot_layup_projection(self.Layup)
-        cum_ivLst = self.boundary_ivLst
-
         if self.Layup.size != 0:
+            # relevant, cummulated and inverse boundaries of all layers in one pass
+            values = [int((self.ID * 1000) + i) for i in range(1, len(self.Layup) + 1)]
+            (relevant_ivLsts, cum_ivLsts) = layup_boundaries(self.Layup, self.boundary_ivLst, values)
+            inverse_ivLsts = inverse_relevant_cummulated_layup_boundaries(self.Layup)
+
             for i in range(1, len(self.Layup) + 1):
-                print("STATUS:\t Building Segment %d, Layer: %d" % (self.ID, i))
+                status("Building Segment %d, Layer: %d", self.ID, i)
 
-                begin = float(self.Layup[i - 1][0])
-                end = float(self.Layup[i - 1][1])
-                # print cum_ivLst, begin, end
-                ivLst = chop_interval_from_layup(cum_ivLst, begin, end)
-                ivLst = sort_layup_projection([ivLst])[0]
+                ivLst = relevant_ivLsts[i - 1]
                 relevant_boundary_BSplineLst = self.ivLst_to_BSplineLst(ivLst)
 
                 # CREATE LAYER Object
@@ -283,28 +288,25 @@ class Segment(object):
                     name="test",
                 )
 
-                tmp_Layer.build_layer(l0)
-                tmp_Layer.ivLst = ivLst
+                with span("layer", ID=lid):
+                    tmp_Layer.build_layer(l0)
+                    tmp_Layer.ivLst = ivLst
 
-                if tmp_Layer.IsClosed:
-                    # tmp_Layer.BSplineLst = set_BSplineLst_to_Origin(tmp_Layer.BSplineLst, self.Theta)
-                    tmp_Layer.set_layer_origin()
+                    if tmp_Layer.IsClosed:
+                        # tmp_Layer.BSplineLst = set_BSplineLst_to_Origin(tmp_Layer.BSplineLst, self.Theta)
+                        tmp_Layer.set_layer_origin()
 
-                # tmp_Layer.cumB_ivLst = cummulated_layup_boundaries(self.Layup)[i-1]
-                tmp_Layer.cumB_ivLst = cum_ivLst
-                cum_ivLst = insert_interval_in_layup(cum_ivLst, begin, end, value=self.ID * 1000 + i)
-                cum_ivLst = sort_layup_projection([cum_ivLst])[0]
-                # tmp_Layer.cumA_ivLst = cummulated_layup_boundaries(self.Layup)[i]
-                tmp_Layer.cumA_ivLst = cum_ivLst
+                    tmp_Layer.cumB_ivLst = cum_ivLsts[i - 1]
+                    tmp_Layer.cumA_ivLst = cum_ivLsts[i]
+                    tmp_Layer.inverse_ivLst = inverse_ivLsts[i - 1]
 
-                tmp_Layer.inverse_ivLst = inverse_relevant_cummulated_layup_boundaries(self.Layup)[i - 1]
-
-                tmp_Layer.build_wire()
+                    tmp_Layer.build_wire()
 
                 self.LayerLst.append(tmp_Layer)
 
             return relevant_boundary_BSplineLst
 
+    @traced("segment", lambda self, *args, **kwargs: {"ID": self.ID})
     def mesh_layers(self, SegmentLst, global_minLen, WebLst=None, display=None, l0=None):
         """
         More Commenting!!!!
@@ -318,45 +320,41 @@ class Segment(object):
             # initialize inv_ivLst
             self.inv_cumivLst = np.array([[0, 1, self.LayerLst[-1].ID + 1]])
 
+            inv_cum = IntervalLayup.from_array(self.inv_cumivLst)
+
             if self.ID == 0:  # concatenate ivLsts of the previous segments!
-                ivCollector = self.inv_cumivLst
                 for seg in SegmentLst[1:]:
+                    seg_inv_cum = IntervalLayup.from_array(seg.inv_cumivLst)
                     if seg.ID == 1:
-                        tmp_ivLst = chop_interval_from_layup(seg.inv_cumivLst, WebLst[0].Pos1, WebLst[0].Pos2)
-                        for iv in tmp_ivLst:
-                            ivCollector = insert_interval_in_layup(ivCollector, iv[0], iv[1], value=iv[2])
-
+                        chops = [(WebLst[0].Pos1, WebLst[0].Pos2)]
                     elif seg.ID == len(WebLst) + 1:
-                        tmp_ivLst = chop_interval_from_layup(seg.inv_cumivLst, WebLst[-1].Pos2, WebLst[-1].Pos1)
-                        for iv in tmp_ivLst:
-                            ivCollector = insert_interval_in_layup(ivCollector, iv[0], iv[1], value=iv[2])
+                        chops = [(WebLst[-1].Pos2, WebLst[-1].Pos1)]
                     else:
                         # print seg.inv_cumivLst, WebLst[seg.ID-2].Pos2,WebLst[seg.ID-1].Pos2
-                        tmp_ivLst = chop_interval_from_layup(seg.inv_cumivLst, WebLst[seg.ID - 1].Pos1, WebLst[seg.ID - 2].Pos1)
-                        for iv in tmp_ivLst:
-                            ivCollector = insert_interval_in_layup(ivCollector, iv[0], iv[1], value=iv[2])
-                        tmp_ivLst = chop_interval_from_layup(seg.inv_cumivLst, WebLst[seg.ID - 2].Pos2, WebLst[seg.ID - 1].Pos2)
-                        for iv in tmp_ivLst:
-                            ivCollector = insert_interval_in_layup(ivCollector, iv[0], iv[1], value=iv[2])
-                    # print sort_layup_projection([ivCollector])[0]
+                        chops = [(WebLst[seg.ID - 1].Pos1, WebLst[seg.ID - 2].Pos1), (WebLst[seg.ID - 2].Pos2, WebLst[seg.ID - 1].Pos2)]
+                    for (begin, end) in chops:
+                        for iv in seg_inv_cum.chopped(begin, end).to_array(sort=False):
+                            inv_cum.insert(iv[0], iv[1], iv[2])
 
-                ivCollector = sort_layup_projection([ivCollector])[0]
-                self.inv_cumivLst = ivCollector
+                self.inv_cumivLst = inv_cum.to_array()
 
             for i, layer in enumerate(reversed(self.LayerLst)):
-                print("STATUS:\t Meshing Segment %s, Layer %s" % (self.ID, len(self.LayerLst) - i))
+                status("Meshing Segment %s, Layer %s", self.ID, len(self.LayerLst) - i)
 
-                layer.inverse_ivLst = chop_interval_from_layup(self.inv_cumivLst, layer.S1, layer.S2)
-                layer.inverse_ivLst = sort_layup_projection([layer.inverse_ivLst])[0]
-                layer.mesh_layer(SegmentLst, global_minLen, display=display, l0=1.5 * l0)
-                self.inv_cumivLst = insert_interval_in_layup(self.inv_cumivLst, layer.S1, layer.S2, value=layer.ID)
+                layer.inverse_ivLst = inv_cum.chopped(layer.S1, layer.S2).to_array()
+                with span("layer", ID=layer.ID):
+                    layer.mesh_layer(SegmentLst, global_minLen, display=display, l0=1.5 * l0)
+                inv_cum.insert(layer.S1, layer.S2, layer.ID)
                 self.l_cells.extend(layer.cells)
 
+            self.inv_cumivLst = inv_cum.to_array()
+
             self.cells.extend(self.l_cells)
             return self.l_cells
         else:
             return []
 
+    @traced("segment_core", lambda self, *args, **kwargs: {"ID": self.ID})
     def mesh_core(self, SegmentLst, WebLst, core_cell_area, display=None):
         if self.ID == 0 and len(SegmentLst) > 1:
             pass
@@ -365,7 +363,7 @@ class Segment(object):
             pass
 
         else:
-            print("STATUS:\t Meshing Segment %s, Core" % (self.ID))
+            status("Meshing Segment %s, Core", self.ID)
             # print self.final_Boundary_ivLst
             core_a_nodes = []
             for iv in self.final_Boundary_ivLst:
@@ -425,12 +423,12 @@ class Segment(object):
         returns: None, but assignes the final_Boundary_BSplineLst class 
             attribute
         """
-        cum_ivLst = self.boundary_ivLst
+        cum_ivLst = IntervalLayup.from_array(self.boundary_ivLst)
         if self.Layup.size != 0:
             for i in range(1, len(self.Layup) + 1):
-                cum_ivLst = insert_interval_in_layup(cum_ivLst, float(self.Layup[i - 1][0]), float(self.Layup[i - 1][1]), value=self.ID * 1000 + i)
+                cum_ivLst.insert(float(self.Layup[i - 1][0]), float(self.Layup[i - 1][1]), self.ID * 1000 + i)
 
-        self.final_Boundary_ivLst = sort_layup_projection([cum_ivLst])[0]
+        self.final_Boundary_ivLst = cum_ivLst.to_array()
         self.final_Boundary_BSplineLst = self.ivLst_to_BSplineLst(self.final_Boundary_ivLst)
         return None
 
@@ -464,8 +462,22 @@ class Segment(object):
         # BSplineLst_from_dct
         return self.BSplineLst
 
+    def build_from_WebLst(self, WebLst, Segment0, l0=None):
+        """builds the boundary, the layers and the final boundary of a 
+        subordinate segment (ID > 0) from the WebLst and Segment0. It only 
+        reads WebLst and Segment0, so that the segments 1..n can be built 
+        concurrently."""
+        with span("segment_topo", ID=self.ID):
+            self.Segment0 = Segment0
+            self.WebLst = WebLst
+            self.build_segment_boundary_from_WebLst(WebLst, Segment0)
+            self.build_layers(WebLst, Segment0, l0=l0)
+            self.determine_final_boundary(WebLst, Segment0)
+            self.build_wire()
+        return self
+
     def build_segment_boundary_from_WebLst(self, WebLst, Segment0):
-        print("STATUS:\t Building Segment Boundaries %s" % (self.ID))
+        status("Building Segment Boundaries %s", self.ID)
         i = self.ID - 1
 
         if self.ID == 0:
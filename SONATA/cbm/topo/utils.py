@@ -22,6 +22,24 @@ from scipy.spatial import cKDTree
 
 
 #######################UTILITY FUNCTIONS######################################
+class LazyAttributes(object):
+    """
+    mixin for objects whose costly attributes (e.g. OCC curves and wires of 
+    a loaded topology) are only created when they are accessed for the 
+    first time. The dictionary _lazy maps the attribute names to callables 
+    without arguments that return the value.
+    """
+
+    def __getattr__(self, name):
+        # only called if the attribute does not exist (yet)
+        lazy = self.__dict__.get("_lazy")
+        if lazy is not None and name in lazy:
+            value = lazy.pop(name)()
+            setattr(self, name, value)
+            return value
+        raise AttributeError("%r object has no attribute %r" % (type(self).__name__, name))
+
+
 def partition(alist, indices):
     return [alist[i:j] for i, j in zip([0] + indices, indices + [None])]
 
@@ -37,10 +55,16 @@ def allunique(x):
 
 
 def unique_rows(a):
+    """ returns the unique rows of the 2d array a in the order of their first 
+    occurrence """
     a = np.ascontiguousarray(a)
-    unique_a, idx = np.unique(a.view([("", a.dtype)] * a.shape[1]), return_index=True)
-    unique_a = unique_a[np.argsort(idx)]
-    return unique_a.view(a.dtype).reshape((unique_a.shape[0], a.shape[1]))
+    if len(a) < 2:
+        return a.copy()
+    order = np.lexsort(a.T[::-1])  # stable: first occurrence comes first
+    b = a[order]
+    first = np.ones(len(a), dtype=bool)
+    first[1:] = np.any(b[1:] != b[:-1], axis=1)
+    return a[np.sort(order[first])]
 
 
 def isclose(a, b, rel_tol=2e-09, abs_tol=2e-09):
@@ -87,7 +111,9 @@ def fuse_rows(a, tol=1e-5, keep_closed=True):
     else:
         c = b
 
-    d = np.asarray([e for i, e in enumerate(a) if i not in c])
+    keep = np.ones(len(a), dtype=bool)
+    keep[c] = False
+    d = np.asarray(a)[keep]
     return d
 
 
@@ -295,36 +321,93 @@ def calc_angle_between(v1, v2):
 
 
 def calc_DCT_angles(DCT_data):
-    temp = []
+    """
+    returns the angles in degree between the vectors to the previous and to 
+    the next point of every point of the discrete definition DCT_data. 
+    For a closed definition the first and last point are connected, for an 
+    open one the angle at both ends is 180.
+    """
+    DCT_data = np.asarray(DCT_data, dtype=float)
+    n = DCT_data.shape[0]
+    prev = np.arange(-1, n - 1)
+    nxt = np.arange(1, n + 1)
     if np.array_equal(DCT_data[0], DCT_data[-1]):  # closed
-        for i in range(0, DCT_data.shape[0]):
-            if i == 0:  # first point
-                v1 = DCT_data[i - 2] - DCT_data[i]
-                v2 = DCT_data[i + 1] - DCT_data[i]
-            elif i == DCT_data.shape[0] - 1:  # last point
-                v1 = DCT_data[i - 1] - DCT_data[i]
-                v2 = DCT_data[1] - DCT_data[i]
-            else:
-                v1 = DCT_data[i - 1] - DCT_data[i]
-                v2 = DCT_data[i + 1] - DCT_data[i]
-            # print(v1,v2)
-            temp.append(calc_angle_between(v1, v2))
+        prev[0] = n - 2
+        nxt[-1] = 1
+        v1 = DCT_data[prev] - DCT_data
+        v2 = DCT_data[nxt] - DCT_data
 
     else:  # open
-        for i in range(0, DCT_data.shape[0]):
-            if i == 0:  # first point
-                v2 = DCT_data[i + 1] - DCT_data[i]
-                v1 = -v2
-            elif i == DCT_data.shape[0] - 1:  # last point
-                v1 = DCT_data[i - 1] - DCT_data[i]
-                v2 = -v1
-            else:
-                v1 = DCT_data[i - 1] - DCT_data[i]
-                v2 = DCT_data[i + 1] - DCT_data[i]
-            # print(v1,v2)
-            temp.append(calc_angle_between(v1, v2))
-
-    return np.array(temp)
+        prev[0] = 1
+        nxt[-1] = n - 2
+        v1 = DCT_data[prev] - DCT_data
+        v2 = DCT_data[nxt] - DCT_data
+        v1[0] = -v2[0]
+        v2[-1] = -v1[-1]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        v1_u = v1 / np.sqrt(np.sum(v1 * v1, axis=1))[:, None]
+        v2_u = v2 / np.sqrt(np.sum(v2 * v2, axis=1))[:, None]
+        return np.degrees(np.arccos(np.clip(np.sum(v1_u * v2_u, axis=1), -1.0, 1.0)))
+
+
+def decimate_polyline(pts, tol):
+    """
+    reduces the points of the polyline pts with the Ramer-Douglas-Peucker 
+    algorithm, so that every removed point lies within the distance tol of 
+    the remaining polyline. Straight parts are reduced to their end points 
+    while strongly curved parts keep their points. The first and the last 
+    point are always kept. All intervals of a refinement level are 
+    processed at once.
+    
+    Parameters
+    --------
+    pts : ndarray
+        (n,2) or (n,3) array of coordinate points
+    tol : float
+        tolerance distance
+        
+    Returns
+    -------
+    ndarray 
+        the remaining points in their original order
+    """
+    pts = np.asarray(pts, dtype=float)
+    n = len(pts)
+    if n < 3 or tol <= 0:
+        return pts
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+
+    starts = np.array([0])
+    ends = np.array([n - 1])
+    while len(starts):
+        lens = ends - starts - 1
+        m = lens > 0
+        (starts, ends, lens) = (starts[m], ends[m], lens[m])
+        if not len(starts):
+            break
+        offs = np.cumsum(lens) - lens
+        seg = np.repeat(np.arange(len(starts)), lens)
+        idx = np.arange(lens.sum()) - offs[seg] + starts[seg] + 1
+
+        # distance of the interior points to the chord of their interval
+        a = pts[starts][seg]
+        ab = pts[ends][seg] - a
+        ap = pts[idx] - a
+        L2 = np.sum(ab * ab, axis=1)
+        t = np.clip(np.sum(ap * ab, axis=1) / np.where(L2 > 0, L2, 1.0), 0.0, 1.0)
+        d = np.linalg.norm(ap - t[:, None] * ab, axis=1)
+
+        dmax = np.maximum.reduceat(d, offs)
+        cand = np.flatnonzero(d == dmax[seg])
+        (segs, first) = np.unique(seg[cand], return_index=True)
+        imax = idx[cand[first]]
+        split = dmax[segs] > tol
+        (segs, imax) = (segs[split], imax[split])
+        keep[imax] = True
+        (starts, ends) = (np.concatenate((starts[segs], imax)), np.concatenate((imax, ends[segs])))
+    return pts[keep]
 
 
 def radius_of_curve(curve, u):
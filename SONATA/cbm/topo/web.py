@@ -8,7 +8,7 @@ from OCC.Core.Geom2dAPI import Geom2dAPI_PointsToBSpline
 from OCC.Core.gp import gp_Pnt, gp_Pnt2d, gp_Vec2d
 
 from SONATA.cbm.topo.BSplineLst_utils import get_BSplineLst_Pnt2d, intersect_BSplineLst_with_BSpline, find_BSplineLst_coordinate, get_BSplineLst_length
-from SONATA.cbm.topo.utils import point2d_list_to_TColgp_Array1OfPnt2d
+from SONATA.cbm.topo.utils import LazyAttributes, point2d_list_to_TColgp_Array1OfPnt2d
 from SONATA.cbm.topo.para_Geom2d_BsplineCurve import ParaLst_from_BSplineLst, BSplineLst_from_ParaLst
 
 from OCC.Core.GCE2d import GCE2d_MakeEllipse
@@ -22,7 +22,7 @@ from OCC.Core.Geom2d import Geom2d_BezierCurve
 # display, start_display, add_menu, add_function_to_menu = init_display()
 # from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeEdge2d
 
-class Web(object):
+class Web(LazyAttributes):
       #Build Webs:
         #TODO: CHECK IF WEB DEFINITION INTERSECT EACH OTHER
         #TODO: SORT WEBS BY POS1 VALUES:
@@ -85,7 +85,7 @@ class Airfoil(object):
     """
 
     class_counter = 1  # class attribute
-    __slots__ = ("name", "id", "coordinates", "polars", "relative_thickness", "wire", "BSplineLst", "display", "start_display", "add_menu", "add_function_to_menu")
+    __slots__ = ("name", "id", "coordinates", "polars", "relative_thickness", "wire", "BSplineLst", "eq_coordinates", "resampled_coordinates", "display", "start_display", "add_menu", "add_function_to_menu")
 
     def __init__(self, yml=None, name="NONAME", coordinates=None, polars=None, relative_thickness=None):
         self.name = "NONAME"
@@ -97,6 +97,8 @@ class Airfoil(object):
         self.relative_thickness = None
         self.wire = None
         self.BSplineLst = None
+        self.eq_coordinates = {}  # equidistant discretizations of the wire, {NbPoints: array}
+        self.resampled_coordinates = {}  # arc-length resampled coordinates, {n: array}
 
         if isinstance(yml, dict):
             self.read_yaml_airfoil(yml)
@@ -224,6 +226,32 @@ class Airfoil(object):
         # print(BSplineLst)
         return (wire, te_pnt)  # bspline, nodes, normals
 
+    def equidistant_coordinates(self, NbPoints):
+        """
+        returns NbPoints equidistant points on the airfoil wire in 
+        nondimensional airfoil coordinates. The result is stored, so every 
+        airfoil is discretized only once. Since the transformation to the 
+        blade reference frame only rotates, uniformly scales and translates 
+        the airfoil, the points can be transformed afterwards with 
+        trsf_af_to_blfr_array instead of discretizing every transformed wire.
+        
+        Parameters
+        ----------
+        NbPoints : int
+            number of points
+        
+        Returns
+        ---------
+        array : 
+            (NbPoints,2) array of coordinates
+        
+        """
+        if NbPoints not in self.eq_coordinates:
+            if self.wire == None:
+                self.gen_OCCtopo()
+            self.eq_coordinates[NbPoints] = PntLst_to_npArray(equidistant_Points_on_wire(self.wire, NbPoints))[:, :2]
+        return self.eq_coordinates[NbPoints]
+
     def gen_wopwop_dist(self, NbPoints=50, divide_surf=True):
         """
         distributes points and normal vectors on the upper and lower part of 
@@ -255,6 +283,34 @@ class Airfoil(object):
 
         return (BSplineLst2d, pnts2d, vecs2d)
 
+    def resample(self, n):
+        """
+        resamples the airfoil coordinates with n points that are equidistantly
+        distributed along the arc length of the closed polygon of coordinates.
+        Like the discretization of the closed wire, the first and the last 
+        point coincide at the trailing edge. The result is stored, so every airfoil is only resampled once per n. 
+        No OCC topology is needed.
+        
+        Parameters
+        ----------
+        n : int
+            number of points
+        
+        Returns
+        ---------
+        array : 
+            (n,2) array of coordinates
+        
+        """
+        if n not in self.resampled_coordinates:
+            coords = np.asarray(self.coordinates, dtype=float)
+            if np.any(coords[0] != coords[-1]):
+                coords = np.vstack((coords, coords[:1]))
+            s = np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(coords, axis=0), axis=1))))
+            s_new = np.linspace(0, s[-1], n)
+            self.resampled_coordinates[n] = np.column_stack((np.interp(s_new, s, coords[:, 0]), np.interp(s_new, s, coords[:, 1])))
+        return self.resampled_coordinates[n]
+
     def transformed(self, airfoil2, k=0.5, n=200):
         """
         Performs and linear interpolation of the airfoil with another airfoil 
@@ -278,24 +334,13 @@ class Airfoil(object):
             with the name = TRF_airfoil1_airfoil2_k
             
         """
-        # check if wire exists, else create it
-        if self.wire == None:
-            self.gen_OCCtopo()
-        if airfoil2.wire == None:
-            airfoil2.gen_OCCtopo()
-
-        p1_lst = equidistant_Points_on_wire(self.wire, n)
-        p2_lst = equidistant_Points_on_wire(airfoil2.wire, n)
-        v_lst = [gp_Vec(p1, p2) for p1, p2 in zip(p1_lst, p2_lst)]
-
-        pres = []
-        for i, p in enumerate(p1_lst):
-            pres.append(p.Translated(v_lst[i].Multiplied(k)))
+        p1 = self.resample(n)
+        p2 = airfoil2.resample(n)
 
         trf_af = Airfoil()
         str_k = "%.3f" % k
         trf_af.name = "TRF_" + self.name + "_" + airfoil2.name + "_" + str_k.replace(".", "")
-        trf_af.coordinates = PntLst_to_npArray(pres)[:, :2]
+        trf_af.coordinates = p1 + k * (p2 - p1)
         return trf_af
 
     def plot_polars(
@@ -8,6 +8,8 @@ Created on Wed Dec 19 09:38:19 2018
 # Core Library modules
 import logging
 import os
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Third party modules
 import matplotlib.pyplot as plt
@@ -30,7 +32,8 @@ from SONATA.cbm.display.display_utils import (display_Ax2,
                                               show_coordinate_system,
                                               transform_wire_2to3d,)
 
-from SONATA.cbm.fileIO.CADinput import intersect_shape_pln
+from SONATA.cbm.fileIO.CADinput import (batch_import_3d_stp,
+                                        intersect_shape_pln,)
 from SONATA.cbm.topo.BSplineLst_utils import (BSplineLst_from_dct,
                                               get_BSplineLst_D2,
                                               set_BSplineLst_to_Origin,
@@ -46,13 +49,18 @@ from SONATA.cbm.topo.wire_utils import (discretize_wire,
 from SONATA.classAirfoil import Airfoil
 from SONATA.classComponent import Component
 from SONATA.classMaterial import read_materials
-from SONATA.utl.blade_utl import (array_pln_intersect, check_uniformity,
+from SONATA.utl.blade_utl import (array_pln_intersect,
+                                  beam_props_interp_error, check_uniformity,
                                   interp_airfoil_position, interp_loads,
                                   make_loft,)
 from SONATA.utl.converter_WT import converter_WT
 from SONATA.utl.interpBSplineLst import interpBSplineLst
+from SONATA.utl.lazy_sections import LazySections
 from SONATA.utl.plot import plot_beam_properties
-from SONATA.utl.trsf import trsf_af_to_blfr, trsf_blfr_to_cbm, trsf_cbm_to_blfr
+from SONATA.utl.trace import span, status, traced
+from SONATA.utl.trsf import (apply_trsf_array, trsf_af_to_blfr,
+                             trsf_af_to_blfr_array, trsf_blfr_to_cbm,
+                             trsf_cbm_to_blfr,)
 from SONATA.vabs.classVABSConfig import VABSConfig
 from SONATA.anbax.classANBAXConfig import ANBAXConfig
 
@@ -70,6 +78,70 @@ def rotate(xo, yo, xp, yp, angle):
     qy = yo + np.sin(angle) * (xp - xo) + np.cos(angle) * (yp - yo)
     return qx, qy
 
+def run_section(cs, stages=("topo", "mesh"), mesh_kw=None, solver_kw=None, cache=None):
+    """
+    runs the requested stages of a single cross-section. This function lives 
+    on module level so that it can be send to the worker processes of a 
+    process pool. The CBM instance is pickled on the way there and back, 
+    using the Para_Geom2d_BSplineCurve representation of the OCC geometry.
+
+    Parameters
+    ----------
+    cs : CBM
+        cross-section instance
+    stages : tuple of str, optional
+        any combination of 'topo', 'mesh', 'vabs' and 'anbax' in that order. 
+        The default is ('topo', 'mesh').
+    mesh_kw : dict, optional
+        keyword arguments passed to cbm_gen_mesh
+    solver_kw : dict, optional
+        keyword arguments passed to cbm_run_vabs
+    cache : SectionCache, optional
+        if given, the topology, mesh and BeamProperties are loaded from the 
+        cache on a hit and are stored into it otherwise. Solver runs with 3D
+        recovery always run and are not cached.
+
+    Returns
+    -------
+    cs : CBM
+        the cross-section instance including its topology, mesh and 
+        BeamProperties
+
+    """
+    mesh_kw = mesh_kw or {}
+    solver_kw = solver_kw or {}
+    with span("section", section=cs.name) as sp:
+        if "topo" in stages and "mesh" in stages and cache is not None and cache.load_section(cs, **mesh_kw):
+            status("Loaded Topology and Mesh of Section %s from cache", cs.name)
+            sp["cache_hit"] = 1
+            stages = tuple(s for s in stages if s not in ("topo", "mesh"))
+
+        if "topo" in stages:
+            status("Building Section %s", cs.name)
+            cs.cbm_gen_topo()
+        if "mesh" in stages:
+            status("Meshing Section %s", cs.name)
+            cs.cbm_gen_mesh(**mesh_kw)
+            sp["cells"] = len(cs.mesh)
+            if "topo" in stages and cache is not None:
+                cache.store_section(cs, **mesh_kw)
+
+        for solver in ("vabs", "anbax"):
+            if solver not in stages:
+                continue
+            if cache is not None and cache.load_results(cs, solver):
+                status("Loaded %s results of Section %s from cache", solver.upper(), cs.name)
+                continue
+            status("Running %s for Section %s", solver.upper(), cs.name)
+            if solver == "vabs":
+                cs.cbm_run_vabs(**solver_kw)
+            else:
+                cs.cbm_run_anbax(**solver_kw)
+            if cache is not None:
+                cache.store_results(cs, solver)
+    return cs
+
+
 class Blade(Component):
     """
     SONATA Blade component object.
@@ -98,9 +170,10 @@ class Blade(Component):
         array of grid location and airfoil instance 
         nparray([[grid, airfoil instance]],dtype = object)
         
-    sections : ndarray
-        array of CBM cross-sections 
-        nparray([[grid, CBM instance]],dtype = object)
+    sections : LazySections
+        container of the CBM cross-sections that behaves like
+        nparray([[grid, CBM instance]],dtype = object). The CBM instances
+        are only generated when they are accessed for the first time.
         
     beam_properties : ndarray
         array of grid location and VABSSectionalProp instance
@@ -154,6 +227,7 @@ class Blade(Component):
         "curvature",
         "pitch_axis",
         "airfoils",
+        "airfoils_blfr",
         "sections",
         "beam_properties",
         "beam_ref_axis",
@@ -166,6 +240,7 @@ class Blade(Component):
         "f_beam_ref_axis",
         "f_pa",
         "f_curvature_k1",
+        "f_cbmconfigs",
         "anba_beam_properties",
         "wopwop_bsplinelst",
         "wopwop_pnts",
@@ -182,6 +257,8 @@ class Blade(Component):
         super().__init__(*args, **kwargs)
         self.beam_properties = None
         self.loft=None
+        self.airfoils_blfr = None
+        self.f_cbmconfigs = None
         
         if 'filename' in kwargs:
             filename = kwargs.get('filename')
@@ -296,6 +373,41 @@ class Blade(Component):
         local_Ax2 = tmp_Ax2.Rotated(gp_Ax1(p, gp_Dir(vx)), float(self.f_twist(x)))
         return local_Ax2
 
+    def _get_airfoils_blfr(self, nPoints=4000):
+        """
+        returns the equidistantly discretized airfoils of self.airfoils and 
+        their trailing edge points in the blade reference frame. Each airfoil
+        is discretized only once in nondimensional coordinates and the chord, 
+        twist, pitch-axis and reference axis transformation is applied to all 
+        airfoils at once. The result is stored for subsequent stations.
+
+        Parameters
+        ----------
+        nPoints : int, optional
+            number of discretization points per airfoil. The default is 4000.
+
+        Returns
+        -------
+        pnts : np.ndarray
+            (n_airfoils, nPoints, 3) coordinates in the blade reference frame
+        tes : np.ndarray
+            (n_airfoils, 3) trailing edge points in the blade reference frame
+
+        """
+        if self.airfoils_blfr is None or self.airfoils_blfr[0] != nPoints:
+            xi = self.airfoils[:, 0].astype(float)
+            loc = self.f_blade_ref_axis.interpolate(xi)[0]
+            pa = self.f_pa(xi)
+            chord = self.f_chord(xi)
+            twist = self.f_twist(xi)
+
+            pnts = np.asarray([trsf_af_to_blfr_array(af.equidistant_coordinates(nPoints), *args) for (af, *args) in zip(self.airfoils[:, 1], loc, pa, chord, twist)])
+            tes = np.asarray([trsf_af_to_blfr_array(np.atleast_2d(af.te_coordinates), *args)[0] for (af, *args) in zip(self.airfoils[:, 1], loc, pa, chord, twist)])
+            self.airfoils_blfr = (nPoints, pnts, tes)
+
+        return self.airfoils_blfr[1:]
+
+    @traced("interpolate_boundary")
     def _interpolate_cbm_boundary(self, x, fs=1.1, nPoints=4000):
         """
         interpolates a cbm boundary BSplineLst from the blade definition at a 
@@ -328,9 +440,10 @@ class Blade(Component):
 
         a = float(self.f_chord(x)) * float(self.f_pa(x))
         b = float(self.f_chord(x)) * (1 - float(self.f_pa(x)))
-        beta = self.Ax2.Angle(self._get_local_Ax2(x))
-        x0 = x - (np.sin(beta) * a * fs / self.f_blade_ref_axis.interpolate(1.0)[0][0, 0])
-        x1 = x + (np.sin(beta) * b * fs / self.f_blade_ref_axis.interpolate(1.0)[0][0, 0])
+        beta = self.Ax2.Angle(ax2)
+        R = self.f_blade_ref_axis.interpolate(1.0)[0][0, 0]
+        x0 = x - (np.sin(beta) * a * fs / R)
+        x1 = x + (np.sin(beta) * b * fs / R)
 
         # select all airfoil in the interval between x0 < x1 and their closest neigors
         idx0 = np.searchsorted(self.airfoils[:, 0], x0, side="left") - 1
@@ -339,55 +452,34 @@ class Blade(Component):
         if idx0 < 0:
             idx0 = 0
 
-        afs = self.airfoils[idx0 : idx1 + 1]
+        # airfoils discretized and transformed to the blade reference frame
+        (pnts, tes) = self._get_airfoils_blfr(nPoints)
+        pnts = pnts[idx0 : idx1 + 1]
+        tes = tes[idx0 : idx1 + 1]
 
-        # transform airfoils from nondimensional coordinates to coordinates
-        afs = self.airfoils[idx0 : idx1 + 1]
-        wireframe = []
-        tes = []
-        for item in afs:
-            xi = item[0]
-            af = item[1]
-            (wire, te_pnt) = af.trsf_to_blfr(self.f_blade_ref_axis.interpolate(xi)[0][0], float(self.f_pa(xi)), float(self.f_chord(xi)), float(self.f_twist(xi)))
-            wireframe.append(wire)
-            tes.append(te_pnt)
-
-        if len(wireframe) > 1:
-            tmp = []
-            for w in wireframe:
-                PntLst = equidistant_Points_on_wire(w, nPoints)
-                tmp.append(PntLst_to_npArray(PntLst))
-            array = np.asarray(tmp)
-            # tes = np.asarray([tes]
-            te_array = np.expand_dims(PntLst_to_npArray(tes), axis=1)
-            result = array_pln_intersect(array, ax2)
-            te_res = array_pln_intersect(te_array, ax2)
+        if len(pnts) > 1:
+            result = array_pln_intersect(pnts, ax2)
+            te_res = array_pln_intersect(np.expand_dims(tes, axis=1), ax2)
 
         else:
-            w = wireframe[0]
-            PntLst = equidistant_Points_on_wire(w, nPoints)
-            result = PntLst_to_npArray(PntLst)
-            te_res = PntLst_to_npArray(tes)
+            result = pnts[0]
+            te_res = tes
 
         trsf = trsf_blfr_to_cbm(self.Ax2, ax2)
 
         #        plt.plot(*result[:,1:].T)
         #        plt.plot(*te_res[:,1:].T,'s')
 
-        PntLst = Array_to_PntLst(result)
-        te_pnt = Array_to_PntLst(te_res)[0]
-        PntLst = [p.Transformed(trsf) for p in PntLst]
-        te_pnt = te_pnt.Transformed(trsf)
+        array = apply_trsf_array(trsf, result)
+        te_pnt = apply_trsf_array(trsf, te_res[0])
 
-        array = PntLst_to_npArray(PntLst)
-        # array = np.flipud(array)
-        # print(array)
         BSplineLst = BSplineLst_from_dct(array[:, 0:2], angular_deflection=30, tol_interp=1e-6)
 
-        BoundaryBSplineLst = set_BSplineLst_to_Origin2(BSplineLst, gp_Pnt2d(te_pnt.Coord()[0], te_pnt.Coord()[1]))
+        BoundaryBSplineLst = set_BSplineLst_to_Origin2(BSplineLst, gp_Pnt2d(te_pnt[0], te_pnt[1]))
 
         return BoundaryBSplineLst
 
+    @traced("read_yaml")
     def read_yaml(self, yml, airfoils, stations=None, npts=11, wt_flag=False, **kwargs):
         """
         reads the Beam or Blade dictionary
@@ -404,7 +496,7 @@ class Blade(Component):
         
         """
         self.name = self.yml.get('name')
-        print('STATUS:\t Reading YAML Dictionary for Beam/Blade: %s' % (self.name))
+        status('Reading YAML Dictionary for Beam/Blade: %s', self.name)
         c2_axis = kwargs.get('flags',{}).get('c2_axis')
         #Read chord, twist and nondim. pitch axis location and create interpolation
         tmp_chord = np.asarray((yml.get('outer_shape_bem').get('chord').get('grid'),yml.get('outer_shape_bem').get('chord').get('values'))).T
@@ -454,6 +546,7 @@ class Blade(Component):
                                          tmp_pa[:,0], arr[:,0], cs_pos))))
 
         self.airfoils = np.asarray([[x, interp_airfoil_position(airfoil_position, airfoils, x)] for x in x])
+        self.airfoils_blfr = None
         self.blade_ref_axis = np.hstack((np.expand_dims(x, axis=1), self.f_blade_ref_axis.interpolate(x)[0]))
         self.beam_ref_axis = np.hstack((np.expand_dims(x, axis=1), self.f_beam_ref_axis.interpolate(x)[0]))
         self.chord = np.vstack((x, self.f_chord(x))).T
@@ -481,9 +574,11 @@ class Blade(Component):
 
         #Generate CBMConfigs
         if kwargs.get('flags',{}).get('flag_wt_ontology'):
-            cbmconfigs = converter_WT(self, cs_pos, yml, self.materials, mesh_resolution = kwargs.get('flags').get('mesh_resolution'))
+            self.f_cbmconfigs = partial(converter_WT, self, byml=yml, materials=self.materials, mesh_resolution=kwargs.get('flags').get('mesh_resolution'))
+            cbmconfigs = self.f_cbmconfigs(cs_pos)
             
         else:
+            self.f_cbmconfigs = None
             lst = [[cs.get("position"), CBMConfig(cs, self.materials)] for cs in yml.get("internal_structure_2d_fem").get("sections")]
             cbmconfigs = np.asarray(lst)
 
@@ -494,20 +589,40 @@ class Blade(Component):
 
 
 
-        #Generate CBMs
-        tmp = []
-        for x, cfg in cbmconfigs:
-            print(self.name, x)
-            # get local beam coordinate system, and local cbm_boundary
-            tmp_Ax2 = self._get_local_Ax2(x)
-            tmp_blra = self.f_beam_ref_axis.interpolate(x)[0][0]
-            BoundaryBSplineLst = self._interpolate_cbm_boundary(x)
-            cs_name = self.name + '_section_R'+ ("%.3f" % x).replace('.','')
-            tmp.append([x, CBM(cfg, materials=self.materials, name=cs_name, Ax2=tmp_Ax2, BSplineLst=BoundaryBSplineLst)])
-        self.sections = np.asarray(tmp)
+        #Generate CBMs on first access
+        cbmconfigs = np.asarray(cbmconfigs)
+        self.sections = LazySections(cbmconfigs[:, 0].astype(float), cbmconfigs[:, 1], self._blade_build_section)
+        # section the 3D shapes of input_type 3 at all stations at once
+        batch_import_3d_stp(self.sections.configs)
 
         return None
 
+    def _blade_build_section(self, x, cfg):
+        """
+        generates the CBM instance of the cross-section at the grid location x
+        with its local beam coordinate system and the interpolated boundary. 
+        It is called by the LazySections container on first access.
+
+        Parameters
+        ----------
+        x : float
+            non-dimensional grid location
+        cfg : CBMConfig
+            configuration of the cross-section
+
+        Returns
+        -------
+        CBM
+            the cross-section instance
+
+        """
+        status('Generating Section %s at grid location %.3f', self.name, x)
+        # get local beam coordinate system, and local cbm_boundary
+        tmp_Ax2 = self._get_local_Ax2(x)
+        BoundaryBSplineLst = self._interpolate_cbm_boundary(x)
+        cs_name = self.name + '_section_R'+ ("%.3f" % x).replace('.','')
+        return CBM(cfg, materials=self.materials, name=cs_name, Ax2=tmp_Ax2, BSplineLst=BoundaryBSplineLst)
+
     @property
     def blade_matrix(self):
         """
@@ -538,7 +653,7 @@ class Blade(Component):
 
 
 
-    def blade_gen_section(self, topo_flag=True, mesh_flag=True, **kwargs):
+    def blade_gen_section(self, topo_flag=True, mesh_flag=True, n_workers=None, executor=None, cache=None, **kwargs):
         """
         generates and meshes all cross-sections of the blade
 
@@ -551,6 +666,15 @@ class Blade(Component):
             IF this flag is set true, the discretization of each cross-section 
             is generated if a topology is generated beforhand. 
             The default is True.
+        n_workers : int, optional
+            if given, the sections are processed in parallel by a pool of 
+            n_workers processes. The default is None (serial execution).
+        executor : concurrent.futures.Executor, optional
+            alternatively to n_workers an already running executor can be 
+            passed. The default is None.
+        cache : SectionCache, optional
+            on-disk cache (SONATA.cbm.fileIO.section_cache) that is used to 
+            skip sections that have been computed before. The default is None.
         **kwargs : TYPE
             keyword arguments can be passed down to the cbm_gen_mesh function
 
@@ -558,16 +682,216 @@ class Blade(Component):
         -------
         None.
 
+        """
+        stages = tuple(s for (s, f) in (("topo", topo_flag), ("mesh", mesh_flag)) if f)
+        self._blade_map_sections(stages, n_workers, executor, cache=cache, mesh_kw=kwargs)
+        return None
+
+    def blade_update_section(self, **kwargs):
+        """
+        brings all cross-sections up to date after the configuration or the 
+        materials have been changed. Only the stages whose inputs have changed
+        are rerun (see CBM.cbm_update), e.g. a change of the ply orientations 
+        only rewrites theta_3 of the affected cells. 
+
+        Parameters
+        ----------
+        **kwargs : TYPE
+            keyword arguments can be passed down to the cbm_gen_mesh function
+
+        Returns
+        -------
+        list
+            the return values of CBM.cbm_update for every section
+
+        """
+        lst = []
+        for (x, cs) in self.sections:
+            status("Updating Section at grid location %s", x)
+            lst.append(cs.cbm_update(**kwargs))
+        return lst
+
+    def iter_sections(self, stages=("topo", "mesh", "vabs"), loads=None, n_workers=None, executor=None, cache=None, mesh_kw=None, solver_kw=None):
+        """
+        generator that runs the given stages for every section and yields the
+        results as soon as each section is completed. With n_workers or an 
+        executor the sections are distributed to the workers and topology,
+        meshing and solving of the different sections overlap. The results 
+        are yielded in order of completion, the serial execution yields them 
+        in station order.
+        
+        A section that fails does not stop the others. Its exception is 
+        printed and the section is yielded with BeamProperties = None.
+        
+        The completed CBM instances are written back into self.sections and 
+        self.beam_properties is assembled after the last section if a solver 
+        stage has been requested.
+
+        Parameters
+        ----------
+        stages : tuple of str, optional
+            any combination of 'topo', 'mesh', 'vabs' and 'anbax'. 
+            The default is ('topo', 'mesh', 'vabs').
+        loads : dict, optional
+            loads passed to the VABSConfig or ANBAXConfig of each section, 
+            see blade_run_vabs.
+        n_workers : int, optional
+            number of worker processes. The default is None (serial 
+            execution).
+        executor : concurrent.futures.Executor, optional
+            alternatively to n_workers an already running executor can be 
+            passed. The default is None.
+        cache : SectionCache, optional
+            on-disk cache (SONATA.cbm.fileIO.section_cache). 
+            The default is None.
+        mesh_kw : dict, optional
+            keyword arguments passed to cbm_gen_mesh
+        solver_kw : dict, optional
+            keyword arguments passed to cbm_run_vabs or cbm_run_anbax
+
+        Yields
+        ------
+        tuple
+            (x, CBM instance, BeamSectionalProps or None)
+
+        Examples
+        --------
+        ::
+
+            for (x, cs, bp) in job.iter_sections(n_workers=4):
+                if bp is not None:
+                    writer.write(x, bp)
+
+        """
+        for solver in ("vabs", "anbax"):
+            if solver in stages:
+                self._blade_set_solver_cfg(solver, loads)
+        args = (stages, mesh_kw or {}, solver_kw or {}, cache)
+        idx = {}
+        results = {}
+
+        def _done(i, cs, err):
+            x = self.sections[i, 0]
+            if err is not None:
+                print("ERROR:\t Section %s at grid location %s failed: %r" % (self.sections[i, 1].name, x, err))
+                results[i] = None
+                return (x, self.sections[i, 1], None)
+            self.sections[i, 1] = cs
+            results[i] = cs.BeamProperties
+            return (x, cs, cs.BeamProperties)
+
+        if executor is None and n_workers is None:
+            for i in range(len(self.sections)):
+                try:
+                    cs = run_section(self.sections[i, 1], *args)
+                except Exception as err:
+                    yield _done(i, None, err)
+                else:
+                    yield _done(i, cs, None)
+
+        else:
+            pool = executor or ProcessPoolExecutor(max_workers=n_workers)
+            try:
+                for i in range(len(self.sections)):
+                    idx[pool.submit(run_section, self.sections[i, 1], *args)] = i
+                for fut in as_completed(idx):
+                    err = fut.exception()
+                    yield _done(idx[fut], None if err else fut.result(), err)
+            finally:
+                for fut in idx:
+                    fut.cancel()
+                if executor is None:
+                    pool.shutdown(wait=True)
+
+        if "vabs" in stages or "anbax" in stages:
+            self.beam_properties = np.asarray([[x, results.get(i)] for (i, x) in enumerate(self.sections[:, 0])])
+
+    def _blade_set_solver_cfg(self, solver="vabs", loads=None):
+        """
+        assigns a new VABSConfig or ANBAXConfig to every section. One config 
+        per section is used, since the sections may be pickled to worker 
+        processes. For VABS the initial twist and curvatures are determined
+        from the beam reference axis.
+
+        Parameters
+        ----------
+        solver : str, optional
+            'vabs' or 'anbax'. The default is 'vabs'.
+        loads : dict, optional
+            see blade_run_vabs
         """
         for (x, cs) in self.sections:
-            if topo_flag:
-                print("STATUS:\t Building Section at grid location %s" % x)
-                cs.cbm_gen_topo()
-            if mesh_flag:
-                print("STATUS:\t Meshing Section at grid location %s" % x)
-                cs.cbm_gen_mesh(**kwargs)
+            c = VABSConfig() if solver == "vabs" else ANBAXConfig()
+            if loads:
+                c.recover_flag = 1
+                load = interp_loads(loads, x)
+                for k,v in load.items():
+                    setattr(c,k,v)
+
+            if solver == "vabs":
+                #set initial twist and curvature
+                c.curve_flag = 1
+                c.k1 = float(self.f_curvature_k1(x))
+                (c.k2, c.k3) = self.f_beam_ref_axis.interpolate_curvature(x)
+                cs.config.vabs_cfg = c
+            else:
+                cs.config.anbax_cfg = c
         return None
 
+    def _blade_map_sections(self, stages, n_workers=None, executor=None, **kw):
+        """
+        runs the given stages for every section, either serially or 
+        distributed to the worker processes of a ProcessPoolExecutor, and 
+        writes the returned CBM instances back into self.sections in station 
+        order. A section that fails does not stop the others. Its exception 
+        is printed and the section keeps its CBM instance with 
+        BeamProperties = None.
+
+        Parameters
+        ----------
+        stages : tuple of str
+            stages passed to run_section
+        n_workers : int, optional
+            number of worker processes. The default (None) runs the sections 
+            serially in this process.
+        executor : concurrent.futures.Executor, optional
+            an already running executor that shall be used instead of 
+            starting a new process pool.
+        **kw : 
+            mesh_kw, solver_kw and cache arguments for run_section
+
+        Returns
+        -------
+        list
+            indices of the sections that failed
+
+        """
+        lst = list(self.sections[:, 1])
+        args = (stages, kw.get("mesh_kw", {}), kw.get("solver_kw", {}), kw.get("cache"))
+        failed = []
+
+        def _collect(i, result):
+            try:
+                self.sections[i, 1] = result()
+            except Exception as err:
+                print("ERROR:\t Section %s at grid location %s failed: %r" % (lst[i].name, self.sections[i, 0], err))
+                lst[i].BeamProperties = None
+                failed.append(i)
+
+        if executor is None and n_workers is None:
+            for (i, cs) in enumerate(lst):
+                _collect(i, lambda: run_section(cs, *args))
+        elif executor is None:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = [pool.submit(run_section, cs, *args) for cs in lst]
+                for (i, future) in enumerate(futures):
+                    _collect(i, future.result)
+        else:
+            futures = [executor.submit(run_section, cs, *args) for cs in lst]
+            for (i, future) in enumerate(futures):
+                _collect(i, future.result)
+        return failed
+
 
     def blade_gen_loft(self, **kwargs):
         """
@@ -671,7 +995,7 @@ class Blade(Component):
     
             return self.wopwop_bsplinelst, self.wopwop_pnts, self.wopwop_vecs
 
-    def blade_run_vabs(self, loads=None, **kwargs):
+    def blade_run_vabs(self, loads=None, n_workers=None, executor=None, cache=None, **kwargs):
         """
         Determines initial twist and curvatures and runs vabs for every section
 
@@ -691,31 +1015,29 @@ class Blade(Component):
             dddf : nparray([[grid, f1''', f2''', f3''']])
             dddm : nparray([[grid, m1''', m2''', m3''']])
 
+        n_workers : int, optional
+            if given, VABS is run in parallel by a pool of n_workers 
+            processes. The default is None (serial execution).
+        executor : concurrent.futures.Executor, optional
+            alternatively to n_workers an already running executor can be 
+            passed. The default is None.
+        cache : SectionCache, optional
+            on-disk cache (SONATA.cbm.fileIO.section_cache) that is used to 
+            skip sections that have been computed before. The default is None.
+
         """
 
-        vc = VABSConfig()
         lst = []
-        for (x, cs) in self.sections:
-            if loads:
-                vc.recover_flag = 1
-                load = interp_loads(loads, x)
-                for k,v in load.items():
-                    setattr(vc,k,v)
+        self._blade_set_solver_cfg("vabs", loads)
+        self._blade_map_sections(("vabs",), n_workers, executor, cache=cache, solver_kw=kwargs)
 
-            #set initial twist and curvature
-            vc.curve_flag = 1
-            vc.k1 = float(self.f_curvature_k1(x))
-            (vc.k2, vc.k3) = self.f_beam_ref_axis.interpolate_curvature(x)
-            cs.config.vabs_cfg = vc
-
-            print("STATUS:\t Running VABS at grid location %s" % (x))
-            cs.cbm_run_vabs(**kwargs)
+        for (x, cs) in self.sections:
             lst.append([x, cs.BeamProperties])
         self.beam_properties = np.asarray(lst)
         return None
 
 
-    def blade_run_anbax(self, loads=None, **kwargs):
+    def blade_run_anbax(self, loads=None, n_workers=None, executor=None, cache=None, **kwargs):
         """
         runs anbax for every section
 
@@ -726,27 +1048,139 @@ class Blade(Component):
             F : nparray([[grid, F1, F2, F3]])
             M : nparray([[grid, M1, M2, M3]])
 
+        n_workers : int, optional
+            if given, anbax is run in parallel by a pool of n_workers 
+            processes. The default is None (serial execution).
+        executor : concurrent.futures.Executor, optional
+            alternatively to n_workers an already running executor can be 
+            passed. The default is None.
+        cache : SectionCache, optional
+            on-disk cache (SONATA.cbm.fileIO.section_cache) that is used to 
+            skip sections that have been computed before. The default is None.
+
         """
 
-        ac = ANBAXConfig()
         lst = []
-        for (x, cs) in self.sections:
-            if loads:
-                ac.recover_flag = 1
-                load = interp_loads(loads, x)
-                for k,v in load.items():
-                    setattr(ac,k,v)
+        self._blade_set_solver_cfg("anbax", loads)
+        self._blade_map_sections(("anbax",), n_workers, executor, cache=cache, solver_kw=kwargs)
 
-            cs.config.anbax_cfg = ac
-            print("STATUS:\t Running ANBAX at grid location %s" % (x))
-            cs.cbm_run_anbax(**kwargs)
+        for (x, cs) in self.sections:
             lst.append([x, cs.BeamProperties])
         # self.anba_beam_properties = np.asarray(lst)
         self.beam_properties = np.asarray(lst)
         return None      
         
+    def blade_refine_stations(self, stations=None, tol=0.02, max_level=4, min_dx=5e-3, solver="vabs", coarse_factor=None, loads=None, n_workers=None, executor=None, cache=None, **kwargs):
+        """
+        adaptive refinement of the radial stations. Starting from a coarse 
+        set of stations, every interval is bisected and the beam properties 
+        at the midpoint are compared with the linear interpolation of the 
+        properties at the interval ends (see beam_props_interp_error). 
+        Intervals whose interpolation error exceeds tol are bisected again 
+        until max_level or min_dx is reached. Only stations that are needed 
+        to represent the stiffness (TS) and mass (MM) matrices with the 
+        requested accuracy are analysed. A section that fails in any stage
+        (topology, mesh or solver) keeps BeamProperties = None (see 
+        _blade_map_sections). Intervals with a failed section are reported 
+        and not refined further.
         
-     
+        With coarse_factor the refinement is performed on meshes with a 
+        reduced mesh_resolution and only the final stations are analysed 
+        with the full resolution.
+        
+        The stations need to be interpolated from the yaml file, thus this 
+        mode requires the wind turbine ontology (flag_wt_ontology).
+        Afterwards self.sections and self.beam_properties hold the results 
+        of the final stations.
+
+        Parameters
+        ----------
+        stations : array_like, optional
+            initial coarse set of non-dimensional radial stations. 
+            The default are the stations of self.sections.
+        tol : float, optional
+            tolerance of the scaled interpolation error of TS and MM. 
+            The default is 0.02.
+        max_level : int, optional
+            maximum number of bisections of the initial intervals. 
+            The default is 4.
+        min_dx : float, optional
+            minimum non-dimensional distance between two stations. 
+            The default is 5e-3.
+        solver : str, optional
+            'vabs' or 'anbax'. The default is 'vabs'.
+        coarse_factor : float, optional
+            factor that is applied to the mesh_resolution of the sections 
+            during the refinement, e.g. 0.5. The default is None (the 
+            refinement is performed with the full resolution).
+        loads : dict, optional
+            see blade_run_vabs
+        n_workers, executor, cache : optional
+            see blade_gen_section
+        **kwargs : TYPE
+            keyword arguments can be passed down to the cbm_gen_mesh function
+
+        Returns
+        -------
+        ndarray
+            the final non-dimensional radial stations
+
+        """
+        if self.f_cbmconfigs is None:
+            raise ValueError("blade_refine_stations requires the wind turbine ontology (flag_wt_ontology)")
+
+        stages = ("topo", "mesh", solver)
+
+        def _configs(xs):
+            cfgs = list(self.f_cbmconfigs(np.asarray(xs))[:, 1])
+            if coarse_factor:
+                for cfg in cfgs:
+                    cfg.setup["mesh_resolution"] = max(int(cfg.setup["mesh_resolution"] * coarse_factor), 10)
+            return cfgs
+
+        def _analyse(xs, cfgs):
+            self.sections = LazySections(xs, cfgs, self._blade_build_section)
+            batch_import_3d_stp(cfgs)
+            self._blade_set_solver_cfg(solver, loads)
+            self._blade_map_sections(stages, n_workers, executor, cache=cache, mesh_kw=kwargs)
+            return {x: cs for (x, cs) in self.sections}
+
+        x0 = np.unique(np.asarray(self.sections[:, 0] if stations is None else stations, dtype=float))
+        done = _analyse(x0, _configs(x0))
+        intervals = list(zip(x0[:-1], x0[1:]))
+        level = 0
+        while intervals and level < max_level:
+            pending = [(a, 0.5 * (a + b), b) for (a, b) in intervals if 0.5 * (b - a) >= min_dx]
+            if not pending:
+                break
+            xm = np.asarray([m for (a, m, b) in pending])
+            status("Refinement level %i: analysing %i additional stations", level + 1, len(xm))
+            done.update(_analyse(xm, _configs(xm)))
+
+            intervals = []
+            for (a, m, b) in pending:
+                err = beam_props_interp_error(done[a].BeamProperties, done[b].BeamProperties, done[m].BeamProperties)
+                if np.isnan(err):
+                    status("No beam properties for one of the stations %s, %s, %s, the interval is not refined", a, m, b)
+                elif err > tol:
+                    intervals += [(a, m), (m, b)]
+            level += 1
+
+        x = np.asarray(sorted(done))
+        status("Refinement finished with %i stations", len(x))
+        if coarse_factor:
+            status("Analysing the final stations with the full mesh resolution")
+            cfgs = list(self.f_cbmconfigs(x)[:, 1])
+            done = _analyse(x, cfgs)
+        else:
+            self.sections = LazySections(x, [done[xi].config for xi in x], self._blade_build_section)
+            for (i, xi) in enumerate(x):
+                self.sections[i, 1] = done[xi]
+
+        self.beam_properties = np.asarray([[xi, cs.BeamProperties] for (xi, cs) in self.sections])
+        return x
+
+
     def blade_exp_beam_props(self, cosy='local', style='DYMORE', eta_offset=0, solver='vabs', filename = None):
         """
         Exports the beam_properties in the 
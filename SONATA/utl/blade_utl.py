@@ -5,6 +5,9 @@ Created on Mon Jan 21 10:20:51 2019
 
 @author: gu32kij
 """
+# Core Library modules
+from functools import lru_cache
+
 # Third party modules
 import numpy as np
 from scipy.interpolate import interp1d
@@ -83,6 +86,18 @@ def interp_loads(loads, grid_loc):
     return d
 
 
+@lru_cache(maxsize=512)
+def transformed_airfoil(af1, af2, k, n=200):
+    """
+    memoized version of af1.transformed(af2, k, n). Airfoils are hashed by 
+    identity, so the same Airfoil instance is returned for the same pair of 
+    airfoils and the same factor k, e.g. to the read_yaml, 
+    _interpolate_cbm_boundary and blade_gen_wopwop_mesh calls of a blade.
+    Use transformed_airfoil.cache_clear() to empty the cache.
+    """
+    return af1.transformed(af2, k, n)
+
+
 def interp_airfoil_position(airfoil_position, airfoils, grid_loc):
     """
     
@@ -121,7 +136,7 @@ def interp_airfoil_position(airfoil_position, airfoils, grid_loc):
         return af1
 
     # return transformed airfoil
-    return af1.transformed(af2, k, 200)
+    return transformed_airfoil(af1, af2, round(float(k), 12), 200)
 
 
 def make_loft(elements, solid=False, ruled=False, tolerance=1e-6, 
@@ -205,56 +220,78 @@ def check_uniformity(grid, values, tol=1e-6):
     return all(mean - tol < x < mean + tol for x in grad)
 
 
+def beam_props_interp_error(bp_a, bp_b, bp_m, w=0.5):
+    """
+    estimates the error that is made by linearly interpolating the 6x6 
+    stiffness (TS) and mass (MM) matrices of two beam sections a and b at 
+    an intermediate section m. Every entry is scaled by the geometric mean 
+    of the corresponding diagonal entries, so that couplings and the 
+    different stiffness terms (EA, EI, GJ, ...) are weighted equally.
+    
+    Parameters
+    ----------
+    bp_a, bp_b, bp_m : BeamSectionalProps
+        beam properties of the sections a, b and the intermediate section m
+    w : float, optional
+        relative position of m between a (0) and b (1). (default = 0.5)
+    
+    Returns
+    ----------
+    float
+        maximum scaled interpolation error of TS and MM, nan if the beam 
+        properties of one of the sections are None (e.g. a failed section)
+    """
+    if bp_a is None or bp_b is None or bp_m is None:
+        return np.nan
+    err = 0.0
+    for attr in ("TS", "MM"):
+        (Pa, Pb, Pm) = (np.asarray(getattr(bp, attr), dtype=float) for bp in (bp_a, bp_b, bp_m))
+        d = np.abs(np.diag(Pm))
+        scale = np.sqrt(np.outer(d, d))
+        mask = scale > 1e-12 * max(scale.max(), 1e-300)
+        dP = np.abs(Pm - ((1 - w) * Pa + w * Pb))
+        if mask.any():
+            err = max(err, float((dP[mask] / scale[mask]).max()))
+    return err
+
+
 def array_pln_intersect(array, ax2):
     """
     intersects an array of connecting points with the yz plane of the 
-    ax2 coordinate system.
+    ax2 coordinate system. The line segments between the corresponding 
+    points of neighboring airfoils are intersected all at once. For every 
+    point the first intersection that lies within its segment is taken, 
+    otherwise the intersection is extrapolated from the last (or first) 
+    segment.
     
     Parameters:
         ax2 : gp_Ax2
             right handed coordinate system
-        array : 
+        array : array
+            (m,n,3) n points of m airfoils in the same frame as ax2
+    
+    Returns:
+        result : array
+            (n,3) intersection points, nan if no intersection was found
     
     """
-    factors = []
-    coords = []
-    for i in range(len(array) - 1):
-        coord = []
-        factor = []
-        for p1, p2 in zip(array[i], array[i + 1]):
-            # print(p1,p2)
-            pnt, lmb = lin_pln_intersect(ax2.XDirection().Coord(), ax2.Location().Coord(), p1, p2)
-            coord.append(pnt)
-            factor.append(lmb)
-        coords.append(np.asarray(coord))
-        factors.append(np.asarray(factor))
+    array = np.asarray(array, dtype=float)
+    n0 = np.asarray(ax2.XDirection().Coord())
+    p = np.asarray(ax2.Location().Coord())
+
+    p1 = array[:-1]
+    v = array[1:] - p1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factors = (np.dot(n0, p) - p1 @ n0) / (v @ n0)  # (m-1,n) line coordinates lambda
+    coords = p1 + factors[..., None] * v
 
     # ==== extrapolate ===
-    coords = np.asarray(coords)
-    factors = np.asarray(factors)
-
-    result = []
-    # iterate first over points j and than over airfoils i
-    for j, lmbs in enumerate(factors.swapaxes(0, 1)):
-        found = False
-        for i, l in enumerate(lmbs):
-            if 0 <= l <= 1:
-                # print(i,j,l,res2[i,j])
-                result.append(coords[i, j])
-                found = True
-                break
-
-        if found == False:
-            # print(j, lmbs, lmbs[-1]>0,lmbs[0]<0)
-            # try last
-            if lmbs[-1] > 0:
-                i = len(lmbs) - 1
-                result.append(coords[i, j])
-            # try first
-            elif lmbs[0] < 0:
-                i = 0
-                result.append(coords[i, j])
-            else:
-                result.append(np.array([np.nan, np.nan, np.nan]))
-
-    return np.asarray(result)
+    inside = (factors >= 0) & (factors <= 1)
+    found = inside.any(axis=0)
+    last = factors[-1] > 0
+    first = factors[0] < 0
+    idx = np.where(found, np.argmax(inside, axis=0), np.where(last, len(factors) - 1, 0))
+
+    result = coords[idx, np.arange(array.shape[1])]
+    result[~found & ~last & ~first] = np.nan
+    return result
@@ -18,32 +18,98 @@ from SONATA.utl.blade_utl import check_uniformity
 
 class interpBSplineLst(object):
     """
+    interpolation of a 3D BSplineLst (e.g. the blade reference axis) at 
+    nondimensional x stations. 
     
+    At construction a dense lookup table x -> (spline index i, parameter u) 
+    is build for every BSpline. Queries use np.interp on this table as start 
+    value followed by a few Newton steps on the exact spline. If the 
+    BSplineLst is not monotone in x, or a station lies outside of it, the 
+    intersection with a Geom_Plane is used instead.
     
     """
 
-    def __init__(self, BSplineLst, xgrid, xvalues):
+    def __init__(self, BSplineLst, xgrid, xvalues, nTable=200, tol=1e-10):
         """
         Parameters
         --------
         BSplineLst : 
         xgrid : array
         xvalues : array
+        nTable : int, optional
+            number of lookup table points per BSpline
+        tol : float, optional
+            tolerance of the Newton iteration in x
         """
 
         self.BSplineLst = BSplineLst
         if check_uniformity(xgrid, xvalues) == False:
             print("WARNING:\t The reference axis is not uniformly defined along x!")
         self._f_xint = interp1d(xgrid, xvalues, bounds_error=False, fill_value="extrapolate")
+        self._tol = tol
+        self._table = self._build_table(nTable)
+        if self._table is not None:
+            self._starts = np.asarray([t[0][0] for t in self._table])
+
+    def _build_table(self, nTable):
+        """
+        builds the lookup table [(x, u) for every BSpline]. Returns None if 
+        the BSplineLst is not strictly monotone increasing in x.
+        """
+        table = []
+        for s in self.BSplineLst:
+            u = np.linspace(s.FirstParameter(), s.LastParameter(), nTable)
+            x = np.asarray([s.Value(ui).X() for ui in u])
+            if np.any(np.diff(x) <= 0):
+                return None
+            table.append((x, u))
+
+        starts = np.asarray([t[0][0] for t in table])
+        ends = np.asarray([t[0][-1] for t in table])
+        if np.any(starts[1:] < ends[:-1] - 1e-8):
+            return None
+        return table
+
+    def _locate(self, xt):
+        """
+        returns the BSpline index and parameter u at the x coordinate xt from 
+        the lookup table and Newton iterations, or None if xt is not 
+        covered by the table or the iterations do not reach the tolerance
+        (e.g. if xt lies in a gap between two BSplines)
+        """
+        if self._table is None:
+            return None
+        if xt < self._starts[0] - self._tol or xt > self._table[-1][0][-1] + self._tol:
+            return None
+
+        i = int(np.clip(np.searchsorted(self._starts, xt, side="left") - 1, 0, len(self._table) - 1))
+        (xs, us) = self._table[i]
+        u = float(np.interp(xt, xs, us))
+
+        s = self.BSplineLst[i]
+        p = gp_Pnt()
+        v = gp_Vec()
+        for it in range(8):
+            s.D1(u, p, v)
+            f = p.X() - xt
+            if abs(f) < self._tol or v.X() == 0:
+                break
+            u = min(max(u - f / v.X(), s.FirstParameter()), s.LastParameter())
+        else:
+            f = s.Value(u).X() - xt
+        if abs(f) >= self._tol:
+            return None
+        return (i, u)
 
     def interpolate(self, grid):
         """
-        interpolates the BSplineLst at a certain radial station by intersecting
-        with a plane.
+        interpolates the BSplineLst at a certain radial station. The lookup
+        table with Newton iterations is used and the intersection with a plane 
+        only as fallback.
         
         Parameters
         --------
-        grid : float
+        grid : float or array
             nondimensional x coordinate in the blade ref. frame
         
         Retruns
@@ -54,12 +120,18 @@ class interpBSplineLst(object):
             
         """
 
-        if not isinstance(grid, np.ndarray):
-            grid = np.atleast_1d(grid)
+        grid = np.atleast_1d(np.asarray(grid, dtype=float))
         res = []
         resCoords = []
-        for gp in grid:
-            plane = Geom_Plane(gp_Pnt(float(self._f_xint(gp)), 0, 0), gp_Dir(1, 0, 0))
+        for (gp, xt) in zip(grid, self._f_xint(grid)):
+            coords = self._locate(float(xt))
+            if coords is not None:
+                (i, u) = coords
+                res.append(self.BSplineLst[i].Value(u).Coord())
+                resCoords.append([i, u])
+                continue
+
+            plane = Geom_Plane(gp_Pnt(float(xt), 0, 0), gp_Dir(1, 0, 0))
             IntCoords, IntPnts = intersect_BSplineLst_with_plane(self.BSplineLst, plane)
             if len(IntPnts) > 1:
                 print("WARNING:\t More than one intersection point was found!")
@@ -82,7 +154,7 @@ class interpBSplineLst(object):
         
         Parameters
         --------
-        grid : float
+        grid : float or array
             nondimensional x coordinate in the blade ref. frame
         ax2 : gp_Ax2, optional
             right handed coordinate system. 
@@ -91,31 +163,37 @@ class interpBSplineLst(object):
         --------
         (k2,k3) : tuple
             tuple of moment strain measures (curvature) about the given 
-            coorindate systems (x2 and x3) axis.
+            coorindate systems (x2 and x3) axis. Floats for a scalar grid, 
+            arrays otherwise.
                     
         """
         p = gp_Pnt()
         v1 = gp_Vec()
         v2 = gp_Vec()
 
-        para = self.interpolate(grid)[1]
-        i = int(para[0][0])
-        u = para[0][1]
-        s = self.BSplineLst[i]
-        s.D2(u, p, v1, v2)
-
-        # transform curvature vector to local Ax2
         if ax2:
             trsf = gp_Trsf()
             trsf.SetTransformation(gp_Ax3(ax2))
-            k_vec = v2.Transformed(trsf)
-        else:
-            k_vec = v2
 
-        # swap the axis of the curvature vector, return moment strain measures.
-        k2 = k_vec.Coord()[2]
-        k3 = k_vec.Coord()[1]
-        return (k2, k3)
+        k2 = []
+        k3 = []
+        for (i, u) in self.interpolate(grid)[1]:
+            s = self.BSplineLst[int(i)]
+            s.D2(u, p, v1, v2)
+
+            # transform curvature vector to local Ax2
+            if ax2:
+                k_vec = v2.Transformed(trsf)
+            else:
+                k_vec = v2
+
+            # swap the axis of the curvature vector, return moment strain measures.
+            k2.append(k_vec.Coord()[2])
+            k3.append(k_vec.Coord()[1])
+
+        if np.ndim(grid) == 0:
+            return (k2[0], k3[0])
+        return (np.asarray(k2), np.asarray(k3))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Lazy container of the cross-sections of a Blade.
+
+@author: TPflumm
+"""
+# Third party modules
+import numpy as np
+
+
+class LazySections(object):
+    """
+    container of the cross-sections of a Blade that only generates the CBM
+    instance of a section (including the costly interpolation of its
+    boundary) when it is accessed for the first time.
+
+    It mimics the former nparray([[grid, CBM instance]], dtype=object) of
+    Blade.sections: it supports len(), iteration over (x, cs) rows,
+    sections[i], sections[i, 0], sections[i, 1], sections[:, 0],
+    sections[:, 1] and the assignment sections[i, 1] = cs. Accessing only
+    the grid column does not generate any section.
+
+    Attributes
+    ----------
+    x : ndarray
+        non-dimensional radial stations of the sections
+    configs : list
+        the CBMConfig instances of the sections
+    factory : callable
+        factory(x, config) that returns the CBM instance of a section
+
+    Examples
+    --------
+    Blade uses LazySections(x, configs, self._blade_build_section). With a
+    factory that only labels the sections:
+
+    >>> sections = LazySections([0.0, 0.5, 1.0], [None] * 3, lambda x, cfg: 'CBM at %.1f' % x)
+    >>> sections[1, 1]   # only the second section is generated
+    'CBM at 0.5'
+    >>> sections.is_generated(0)
+    False
+    >>> [cs for (x, cs) in sections]   # generates all remaining sections
+    ['CBM at 0.0', 'CBM at 0.5', 'CBM at 1.0']
+
+    """
+
+    __slots__ = ("x", "configs", "factory", "_items")
+
+    def __init__(self, x, configs, factory):
+        self.x = np.asarray(x, dtype=float)
+        self.configs = list(configs)
+        self.factory = factory
+        self._items = [None] * len(self.x)
+
+    def __repr__(self):
+        n = sum(1 for cs in self._items if cs is not None)
+        return "<LazySections: %i sections, %i generated>" % (len(self), n)
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def shape(self):
+        return (len(self), 2)
+
+    def is_generated(self, i):
+        """ returns True if the CBM instance of section i exists already """
+        return self._items[i] is not None
+
+    def _get(self, i):
+        if self._items[i] is None:
+            self._items[i] = self.factory(self.x[i], self.configs[i])
+        return self._items[i]
+
+    def _column(self, i, j):
+        if j == 0:
+            return self.x[i]
+        elif j == 1:
+            if isinstance(i, slice):
+                arr = np.empty(len(range(*i.indices(len(self)))), dtype=object)
+                arr[:] = [self._get(k) for k in range(*i.indices(len(self)))]
+                return arr
+            return self._get(i)
+        raise IndexError("LazySections has only two columns (x, cs)")
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple) and len(key) == 2 and isinstance(key[1], (int, np.integer)):
+            return self._column(key[0], key[1])
+        elif isinstance(key, (int, np.integer)):
+            return np.asarray([self.x[key], self._get(key)], dtype=object)
+        return self.to_array()[key]
+
+    def __setitem__(self, key, value):
+        if not (isinstance(key, tuple) and len(key) == 2):
+            raise IndexError("LazySections only supports the assignment sections[i, j] = value")
+        (i, j) = key
+        if j == 0:
+            self.x[i] = value
+        elif j == 1:
+            self._items[i] = value
+        else:
+            raise IndexError("LazySections has only two columns (x, cs)")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield np.asarray([self.x[i], self._get(i)], dtype=object)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.to_array()
+
+    def to_array(self):
+        """ generates all sections and returns the nparray([[grid, CBM instance]]) """
+        arr = np.empty((len(self), 2), dtype=object)
+        arr[:, 0] = self.x
+        arr[:, 1] = [self._get(i) for i in range(len(self))]
+        return arr
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Lightweight instrumentation of the SONATA pipeline.
+
+Nested spans (e.g. section -> segment -> layer -> build_layer -> offset)
+record the wall time and optional object counts of each step. Tracing is
+disabled by default, in which case span() returns a shared null object and
+costs only a function call. The recorded spans can be summarized or
+exported as JSON and in the Chrome trace event format (chrome://tracing,
+https://ui.perfetto.dev).
+
+The module also controls the "STATUS:" progress messages. status() only
+formats and prints its message if verbose output is enabled, so that hot
+loops do not pay for string formatting when the output is switched off.
+
+Examples
+--------
+Tracing the section generation of a Blade job::
+
+    from SONATA.utl import trace
+    trace.set_verbose(False)
+    trace.enable_tracing()
+    job.blade_gen_section()
+    trace.summarize()
+    trace.export_chrome_trace('sonata_trace.json')
+
+Notes
+--------
+The spans are collected per process. Sections that are processed by the
+worker processes of a ProcessPoolExecutor are not recorded in the parent
+process.
+
+@author: TPflumm
+"""
+# Core Library modules
+import functools
+import json
+import os
+import threading
+from time import perf_counter
+
+
+class Tracer(object):
+    """
+    collects the finished spans of the process. Every thread keeps its own
+    stack of open spans.
+
+    Attributes
+    ----------
+    enabled : bool
+        if False, no spans are recorded
+    verbose : bool
+        if False, status() does not print anything
+    records : list
+        list of dictionaries with the keys name, path, ts, dur, pid, tid,
+        depth and args of the finished spans. ts and dur are in seconds.
+    """
+
+    __slots__ = ("enabled", "verbose", "records", "t0", "_local")
+
+    def __init__(self):
+        self.enabled = False
+        self.verbose = True
+        self.records = []
+        self.t0 = perf_counter()
+        self._local = threading.local()
+
+    def stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+
+_tracer = Tracer()
+
+
+class Span(object):
+    """
+    a single timed span, used as context manager. Object counts and other
+    attributes can be assigned by item, e.g. span['cells'] = 120.
+    """
+
+    __slots__ = ("name", "args", "path", "depth", "t0")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __setitem__(self, key, value):
+        self.args[key] = value
+
+    def count(self, key, n=1):
+        """ increments the counter key of the span by n """
+        self.args[key] = self.args.get(key, 0) + n
+
+    def __enter__(self):
+        stack = _tracer.stack()
+        if stack:
+            self.path = stack[-1].path + "/" + self.name
+        else:
+            self.path = self.name
+        self.depth = len(stack)
+        stack.append(self)
+        self.t0 = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        t1 = perf_counter()
+        _tracer.stack().pop()
+        if exc_type is not None:
+            self.args["exception"] = exc_type.__name__
+        _tracer.records.append({
+            "name": self.name,
+            "path": self.path,
+            "ts": self.t0 - _tracer.t0,
+            "dur": t1 - self.t0,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "depth": self.depth,
+            "args": self.args,
+        })
+        return False
+
+
+class _NullSpan(object):
+    """ span that does nothing, returned while tracing is disabled """
+
+    __slots__ = ()
+
+    def __setitem__(self, key, value):
+        pass
+
+    def count(self, key, n=1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **args):
+    """
+    returns a context manager that records the wall time of the enclosed
+    block as span name. The keyword arguments are stored as attributes of
+    the span.
+
+    Examples
+    --------
+    >>> with span('mesh_layer', ID=1) as sp:
+    ...     sp['cells'] = 120
+    """
+    if _tracer.enabled:
+        return Span(name, args)
+    return _NULL_SPAN
+
+
+def current_span():
+    """ returns the innermost open span of the thread (or a null span) """
+    if _tracer.enabled:
+        stack = _tracer.stack()
+        if stack:
+            return stack[-1]
+    return _NULL_SPAN
+
+
+def traced(name=None, attrs=None):
+    """
+    decorator that records every call of the function as span.
+
+    Parameters
+    ----------
+    name : str, optional
+        name of the span. The default is the name of the function.
+    attrs : callable, optional
+        attrs(*args, **kwargs) returns a dictionary of span attributes,
+        e.g. lambda self, *a, **k: {'ID': self.ID}
+    """
+
+    def decorator(func):
+        sname = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(sname, attrs(*args, **kwargs) if attrs else {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def status(msg, *args):
+    """
+    prints the progress message 'STATUS:\\t msg % args' if verbose output
+    is enabled. The message is only formatted if it is printed.
+    """
+    if _tracer.verbose:
+        print("STATUS:\t " + (msg % args if args else msg))
+
+
+def set_verbose(flag=True):
+    """ switches the STATUS messages on or off """
+    _tracer.verbose = bool(flag)
+
+
+def is_verbose():
+    return _tracer.verbose
+
+
+def enable_tracing(flag=True):
+    """ switches the recording of spans on or off """
+    _tracer.enabled = bool(flag)
+
+
+def reset_tracing():
+    """ removes all recorded spans """
+    del _tracer.records[:]
+    _tracer.t0 = perf_counter()
+
+
+def get_spans():
+    """ returns the list of recorded spans """
+    return list(_tracer.records)
+
+
+def summarize(printout=True):
+    """
+    aggregates the recorded spans by their path.
+
+    Returns
+    -------
+    dict
+        {path: {'calls': int, 'wall': float, 'self': float, 'counts': dict}}
+        with the total wall time and the self time (without child spans)
+        in seconds and the summed up numeric attributes of the spans.
+    """
+    summary = {}
+    for rec in _tracer.records:
+        s = summary.setdefault(rec["path"], {"calls": 0, "wall": 0.0, "self": 0.0, "counts": {}})
+        s["calls"] += 1
+        s["wall"] += rec["dur"]
+        s["self"] += rec["dur"]
+        for (k, v) in rec["args"].items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool) and k != "ID":
+                s["counts"][k] = s["counts"].get(k, 0) + v
+    for rec in _tracer.records:
+        parent = rec["path"].rpartition("/")[0]
+        if parent in summary:
+            summary[parent]["self"] -= rec["dur"]
+
+    if printout:
+        print("%-70s %8s %12s %12s  %s" % ("span", "calls", "wall [s]", "self [s]", "counts"))
+        for path in sorted(summary):
+            s = summary[path]
+            counts = ", ".join("%s=%s" % kv for kv in sorted(s["counts"].items()))
+            print("%-70s %8i %12.4f %12.4f  %s" % (path, s["calls"], s["wall"], s["self"], counts))
+    return summary
+
+
+def export_json(filename):
+    """ writes the recorded spans and their summary to a json file """
+    with open(filename, "w") as f:
+        json.dump({"spans": _tracer.records, "summary": summarize(printout=False)}, f, indent=1, default=str)
+    return None
+
+
+def export_chrome_trace(filename):
+    """
+    writes the recorded spans in the Chrome trace event format, which can
+    be opened with chrome://tracing or https://ui.perfetto.dev
+    """
+    events = []
+    for rec in _tracer.records:
+        events.append({
+            "name": rec["name"],
+            "cat": "sonata",
+            "ph": "X",
+            "ts": rec["ts"] * 1e6,
+            "dur": rec["dur"] * 1e6,
+            "pid": rec["pid"],
+            "tid": rec["tid"],
+            "args": {k: (v if isinstance(v, (int, float, str, bool)) else str(v)) for (k, v) in rec["args"].items()},
+        })
+    with open(filename, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return None
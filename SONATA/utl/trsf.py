@@ -149,6 +149,91 @@ def trsf_af_to_blfr(loc, pa_loc, chord, twist, deformation=None):
     return Trsf
 
 
+def trsf_af_to_blfr_array(coordinates, loc, pa_loc, chord, twist):
+    """
+    NumPy version of trsf_af_to_blfr that directly transforms the 
+    nondimensional airfoil coordinates to the blade reference frame. loc, 
+    pa_loc, chord and twist can be given for several stations at once.
+    
+    The transformation of trsf_af_to_blfr (rotation about the pitch axis, 
+    translation, scaling and the two rotations about z and y by -pi/2 
+    followed by the translation to loc) reduces to:
+        u = chord*( cos(twist)*(x-pa_loc) + sin(twist)*y)
+        v = chord*(-sin(twist)*(x-pa_loc) + cos(twist)*y)
+        P = loc + [0, -u, v]
+    
+    Parameters
+    ----------
+    coordinates : array
+        (m,2) nondim. airfoil coordinates
+    loc : array
+        [x,y,z] or (k,3) positions in blade reference coordinates
+    pa_loc : float or array
+        nondim. pitch axis location(s)
+    chord : float or array
+        chordlength(s)
+    twist : float or array
+        twist angle(s) about x in radians
+    
+    Returns
+    ---------
+    array 
+        (m,3) or (k,m,3) coordinates in the blade reference frame
+
+    """
+    coordinates = np.asarray(coordinates, dtype=float)
+    loc = np.asarray(loc, dtype=float)
+    pa_loc = np.asarray(pa_loc, dtype=float)[..., None]
+    chord = np.asarray(chord, dtype=float)[..., None]
+    twist = np.asarray(twist, dtype=float)[..., None]
+
+    x = coordinates[:, 0] - pa_loc
+    y = coordinates[:, 1]
+    u = chord * (np.cos(twist) * x + np.sin(twist) * y)
+    v = chord * (-np.sin(twist) * x + np.cos(twist) * y)
+
+    res = np.stack((np.zeros_like(u), -u, v), axis=-1)
+    return res + loc[..., None, :]
+
+
+def trsf_to_array(Trsf):
+    """
+    returns the (3,4) matrix of a gp_Trsf, so that it can be applied to 
+    arrays of points with apply_trsf_array
+
+    Parameters
+    ----------
+    Trsf : gp_Trsf
+        Opencascade: non-persistent transformation in 3D space
+
+    Returns
+    -------
+    array
+        (3,4) matrix [R|t] of the transformation
+    """
+    return np.array([[Trsf.Value(i, j) for j in range(1, 5)] for i in range(1, 4)])
+
+
+def apply_trsf_array(Trsf, array):
+    """
+    applies a gp_Trsf or its (3,4) matrix to an (...,3) array of points
+
+    Parameters
+    ----------
+    Trsf : gp_Trsf or array
+    array : array
+        (...,3) coordinates
+
+    Returns
+    -------
+    array
+        (...,3) transformed coordinates
+    """
+    if isinstance(Trsf, gp_Trsf):
+        Trsf = trsf_to_array(Trsf)
+    return np.asarray(array, dtype=float) @ Trsf[:, :3].T + Trsf[:, 3]
+
+
 if __name__ == "__main__":
     Ax2_1 = gp_Ax2()
     Ax2_2 = gp_Ax2()
@@ -71,14 +71,16 @@ class ExplComp_Blade(ExplicitComponent):
         #            print('')
         #        print(('%2i' % self.counter), end=' ')
         #        print('%02d:%02d:%02d [' % (h,m,s), end=' ')
-        with HiddenPrints():
-            self.job = Blade(name="UH-60A", filename="jobs/MonteCarlo/UH-60A_adv.yml")
+        if not hasattr(self, "job"):
+            with HiddenPrints():
+                self.job = Blade(name="UH-60A", filename="jobs/MonteCarlo/UH-60A_adv.yml")
         self.connect_input_to_config(inputs)
 
         # SETUP SONATA-CBM JOB:
         try:
             with HiddenPrints():
-                self.job.blade_gen_section(mesh_flag=True, split_quads=False)
+                # topology and mesh are only regenerated if geometric inputs have changed
+                self.job.blade_update_section(split_quads=False)
             self.job.blade_run_vabs(ramdisk=True)
             beam = self.job.blade_exp_beam_props(solver="vabs", cosy="local", eta_offset=0.1)
             beamProps = coef.join_beam_props(beam, coef.refBeamProp())
@@ -14,6 +14,7 @@ import pint
 
 # First party modules
 from SONATA.cbm.fileIO.readinput import read_rowstring
+from SONATA.cbm.mesh.mesh_arrays import MeshArrays
 
 
 def grab_str_segment(STR, idx, splitpoints):
@@ -33,6 +34,53 @@ def read_PIA(STR, STR2Find):
     return float(temp)
 
 
+def _write_cells_for_VABS(f, cells, nodes, materials):
+    # Number of Nodes,Cells and Materials
+    f.write("%i\t%i\t%i\n" % (len(nodes), len(cells), len(materials)))
+    f.write("\n")
+    # Node number, coordinates x_2, coordinatex x_3
+    for n in nodes:
+        f.write("%i\t\t%.6f\t%.5f\n" % (n.id, n.coordinates[0], n.coordinates[1]))
+    f.write("\n")
+    # Element number, connectivity
+    for c in cells:
+        f.write("%i\t\t" % (c.id))
+        for i in range(0, 9):
+            if i < len(c.nodes):
+                f.write("%i\t" % (c.nodes[i].id))
+            else:
+                f.write("%i\t" % (0))
+        f.write("\n")
+    f.write("\n")
+    # Element number, Layup orientation
+    for c in cells:
+        f.write('%i\t\t%i\t%.6f\t' % (c.id,c.MatID,c.theta_3))
+        # c.theta_1[0] = 0.0  # debugging -> change plane orientation to 0 deg
+        for t in c.theta_1:
+            f.write("%.2f\t" % (t))
+        f.write("\n")
+    f.write("\n")
+
+
+def _write_mesh_arrays_for_VABS(f, arrays, materials):
+    # same blocks as _write_cells_for_VABS, written row-wise by np.savetxt
+    f.write("%i\t%i\t%i\n" % (arrays.n_nodes, arrays.n_cells, len(materials)))
+    f.write("\n")
+    node_ids = np.arange(1, arrays.n_nodes + 1)
+    np.savetxt(f, np.column_stack((node_ids, arrays.nodes)), fmt="%i\t\t%.6f\t%.5f", newline="\n")
+    f.write("\n")
+
+    cell_ids = np.arange(1, arrays.n_cells + 1)
+    conn = np.zeros((arrays.n_cells, 9), dtype=int)
+    conn[:, : arrays.cells.shape[1]] = arrays.cells + 1  # padding -1 -> 0
+    np.savetxt(f, np.column_stack((cell_ids, conn)), fmt="%i\t\t" + "%i\t" * 9, newline="\n")
+    f.write("\n")
+
+    orientation = np.column_stack((cell_ids, arrays.MatID, arrays.theta_3, arrays.theta_1))
+    np.savetxt(f, orientation, fmt="%i\t\t%i\t%.6f\t" + "%.2f\t" * 9, newline="\n")
+    f.write("\n")
+
+
 def export_cells_for_VABS(cells, nodes, filename, VABSsetup, materials, rotation=0):
     """
     the export_cells for VABS function gathers the information of the 
@@ -41,10 +89,12 @@ def export_cells_for_VABS(cells, nodes, filename, VABSsetup, materials, rotation
              
     Parameters
     ----------
-    cells : list
-        list of cells
+    cells : list or MeshArrays
+        list of cells, or the MeshArrays of the mesh. The node, connectivity
+        and orientation blocks of a MeshArrays are written with np.savetxt.
     nodes : list
-        the corresponding list of nodes of the cells
+        the corresponding list of nodes of the cells (ignored for a
+        MeshArrays)
     filename : str
         filename of the file to write
     VABSsetup : VABSconfig 
@@ -66,31 +116,10 @@ def export_cells_for_VABS(cells, nodes, filename, VABSsetup, materials, rotation
                 f.write("%.2f %.2f\n" % (VABSsetup.oblique_cosine1, VABSsetup.oblique_cosine2))
             f.write("\n")
 
-            # Number of Nodes,Cells and Materials
-            f.write("%i\t%i\t%i\n" % (len(nodes), len(cells), len(materials)))
-            f.write("\n")
-            # Node number, coordinates x_2, coordinatex x_3
-            for n in nodes:
-                f.write("%i\t\t%.6f\t%.5f\n" % (n.id, n.coordinates[0], n.coordinates[1]))
-            f.write("\n")
-            # Element number, connectivity
-            for c in cells:
-                f.write("%i\t\t" % (c.id))
-                for i in range(0, 9):
-                    if i < len(c.nodes):
-                        f.write("%i\t" % (c.nodes[i].id))
-                    else:
-                        f.write("%i\t" % (0))
-                f.write("\n")
-            f.write("\n")
-            # Element number, Layup orientation
-            for c in cells:
-                f.write('%i\t\t%i\t%.6f\t' % (c.id,c.MatID,c.theta_3))
-                # c.theta_1[0] = 0.0  # debugging -> change plane orientation to 0 deg
-                for t in c.theta_1:
-                    f.write("%.2f\t" % (t))
-                f.write("\n")
-            f.write("\n")
+            if isinstance(cells, MeshArrays):
+                _write_mesh_arrays_for_VABS(f, cells, materials)
+            else:
+                _write_cells_for_VABS(f, cells, nodes, materials)
             # Materials
             for m in materials.values():
                 f.write("%i, %i\n" % (m.id, m.orth))
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of the SONATA pipeline.
+
+The box beam of examples/0_beams and a subset of the IEA-15 stations of
+examples/1_IEA15MW are run through the stages
+
+    yaml_load, read_yaml, gen_boundary, gen_topo, gen_mesh, export_vabs,
+    build_dolfin_mesh, parse_results
+
+and the wall time, the peak resident set size (RSS) and the number of
+generated objects (layers, cells, ...) are recorded for every stage. The
+solvers are not run: export_vabs writes the VABS input file into a temporary
+directory and parse_results reads the canned VABS output files (.K, .ELE,
+.U) of the fixtures directory, so the suite runs on a plain Linux box
+without VABS. Cases without fixtures (IEA-15) skip parse_results.
+build_dolfin_mesh is skipped if dolfin is not installed.
+
+The results are compared with the stored baseline (baseline.json). A stage
+regresses if its wall time or peak RSS exceeds the baseline by more than
+the threshold of the stage, or if its object count differs by more than
+the threshold. The thresholds are stored in the baseline file as well:
+
+    {"thresholds": {"default": {"wall": 0.25, "rss": 0.2, "count": 0.0},
+                    "gen_mesh": {"wall": 0.35}},
+     "cases": {"box_beam": {"gen_mesh": {"wall": 1.2, "rss": 310.5,
+                                         "count": 2880}, ...}, ...}}
+
+Usage
+-----
+::
+
+    python tests/benchmark/bench_sonata.py                      # compare
+    python tests/benchmark/bench_sonata.py --update-baseline    # record
+    python tests/benchmark/bench_sonata.py --cases box_beam --repeat 3 --output results.json
+
+The exit code is 1 if any stage has regressed and 2 if there is no
+baseline to compare with. Record one with --update-baseline first.
+
+@author: TPflumm
+"""
+# Core Library modules
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+# Third party modules
+import yaml
+
+# First party modules
+from SONATA.cbm.classBeamSectionalProps import BeamSectionalProps
+from SONATA.cbm.mesh.mesh_utils import sort_and_reassignID
+from SONATA.classAirfoil import Airfoil
+from SONATA.classBlade import Blade
+from SONATA.classMaterial import read_materials
+from SONATA.vabs.classVABSConfig import VABSConfig
+from SONATA.vabs.vabs_utl import export_cells_for_VABS
+
+try:
+    from SONATA.anbax.anbax_utl import build_dolfin_mesh
+    import dolfin  # noqa: F401
+except Exception:
+    build_dolfin_mesh = None
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+BASELINE = os.path.join(HERE, "baseline.json")
+
+STAGES = ("yaml_load", "read_yaml", "gen_boundary", "gen_topo", "gen_mesh",
+          "export_vabs", "build_dolfin_mesh", "parse_results")
+
+DEFAULT_THRESHOLDS = {"default": {"wall": 0.25, "rss": 0.20, "count": 0.0}}
+
+CASES = {
+    "box_beam": {
+        "yaml": os.path.join(ROOT, "examples", "0_beams", "0_box_beam_HT_antisym_layup_15_6_SI_SmithChopra91.yaml"),
+        "flags": {"flag_wt_ontology": False, "flag_ref_axes_wt": False},
+        "stations": [0.0, 1.0],
+        "fixture": os.path.join(FIXTURES, "box_beam.vab"),
+    },
+    "iea15": {
+        "yaml": os.path.join(ROOT, "examples", "1_IEA15MW", "IEA-15-240-RWT.yaml"),
+        "flags": {"flag_wt_ontology": True, "flag_ref_axes_wt": True, "mesh_resolution": 400, "c2_axis": False},
+        "stations": [0.0, 0.15, 0.3, 0.5, 0.75, 0.95],
+        "fixture": None,
+    },
+}
+
+
+def _reset_peak_rss():
+    """ resets the peak RSS (VmHWM) of the process on Linux """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss():
+    """ returns the peak RSS of the process in MB """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class StageRecorder(object):
+    """
+    accumulates the wall time, peak RSS and object counts of the stages of
+    one benchmark case. Stages that are entered several times (e.g. once
+    per section) are summed up, the peak RSS is the maximum.
+    """
+
+    __slots__ = ("stages",)
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        rec = self.stages.setdefault(name, {"wall": 0.0, "rss": 0.0, "count": 0})
+        info = {"count": 0}
+        _reset_peak_rss()
+        t0 = time.perf_counter()
+        yield info
+        rec["wall"] += time.perf_counter() - t0
+        rec["rss"] = max(rec["rss"], _peak_rss())
+        rec["count"] += int(info["count"])
+
+
+def run_case(name, case):
+    """ runs a benchmark case through all stages and returns the records """
+    rec = StageRecorder()
+    flags = dict(case["flags"])
+
+    with rec.stage("yaml_load") as info:
+        with open(case["yaml"], "r") as myfile:
+            yml = yaml.load(myfile.read(), Loader=yaml.FullLoader)
+        info["count"] = len(yml.get("airfoils"))
+
+    with rec.stage("read_yaml") as info:
+        job = Blade(name=name)
+        job.yml = yml
+        airfoils = [Airfoil(af) for af in yml.get("airfoils")]
+        job.materials = read_materials(yml.get("materials"))
+        job.read_yaml(yml.get("components").get("blade"), airfoils, flags=flags, stations=case["stations"])
+        info["count"] = len(job.sections)
+
+    with rec.stage("gen_boundary") as info:
+        sections = job.sections.to_array()
+        info["count"] = sum(len(cs.BoundaryBSplineLst) for cs in sections[:, 1])
+
+    for (x, cs) in sections:
+        with rec.stage("gen_topo") as info:
+            cs.cbm_gen_topo()
+            info["count"] = sum(len(seg.LayerLst) for seg in cs.SegmentLst)
+
+        with rec.stage("gen_mesh") as info:
+            cs.cbm_gen_mesh(split_quads=True)
+            info["count"] = len(cs.mesh)
+
+        with rec.stage("export_vabs") as info, tempfile.TemporaryDirectory() as tmp:
+            (cs.mesh, nodes) = sort_and_reassignID(cs.mesh)
+            export_cells_for_VABS(cs.mesh, nodes, os.path.join(tmp, "bench.vab"), VABSConfig(), cs.materials)
+            info["count"] = len(cs.mesh)
+
+        if build_dolfin_mesh is not None:
+            with rec.stage("build_dolfin_mesh") as info:
+                (cs.mesh, nodes) = sort_and_reassignID(cs.mesh)
+                build_dolfin_mesh(cs.mesh, nodes, cs.materials)
+                info["count"] = len(cs.mesh)
+
+        if case["fixture"] is not None:
+            with rec.stage("parse_results") as info:
+                bp = BeamSectionalProps(case["fixture"] + ".K")
+                bp.read_all_VABS_Results(filename=case["fixture"])
+                info["count"] = len(bp.ELE)
+
+    return rec.stages
+
+
+def compare(results, baseline):
+    """
+    compares the results with the baseline and returns a list of
+    (case, stage, metric, value, reference) of the regressed stages
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    thresholds.update(baseline.get("thresholds", {}))
+    regressions = []
+    for (case, stages) in results.items():
+        for (stage, rec) in stages.items():
+            ref = baseline.get("cases", {}).get(case, {}).get(stage)
+            if ref is None:
+                continue
+            thr = dict(thresholds["default"])
+            thr.update(thresholds.get(stage, {}))
+            for metric in ("wall", "rss"):
+                if rec[metric] > ref[metric] * (1 + thr[metric]):
+                    regressions.append((case, stage, metric, rec[metric], ref[metric]))
+            if abs(rec["count"] - ref["count"]) > thr["count"] * max(ref["count"], 1):
+                regressions.append((case, stage, "count", rec["count"], ref["count"]))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    ref = (baseline or {}).get("cases", {})
+    for (case, stages) in results.items():
+        print("\n%s" % case)
+        print("  %-18s %10s %10s %10s %12s" % ("stage", "wall [s]", "ref [s]", "RSS [MB]", "count"))
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            rec = stages[stage]
+            r = ref.get(case, {}).get(stage, {}).get("wall")
+            print("  %-18s %10.3f %10s %10.1f %12i" % (stage, rec["wall"], "-" if r is None else "%.3f" % r, rec["rss"], rec["count"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark suite of the SONATA pipeline")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=1, help="number of runs, the minimum wall time is taken")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", default=None, help="write the results to this json file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.cases:
+        for i in range(args.repeat):
+            stages = run_case(name, CASES[name])
+            if name not in results:
+                results[name] = stages
+                continue
+            for (stage, rec) in stages.items():
+                results[name][stage]["wall"] = min(results[name][stage]["wall"], rec["wall"])
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        new = baseline or {"thresholds": DEFAULT_THRESHOLDS}
+        new.setdefault("cases", {}).update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(new, f, indent=2, sort_keys=True)
+        print("\nSTATUS:\t Baseline written to %s" % args.baseline)
+        return 0
+
+    if baseline is None:
+        print("\nERROR:\t No baseline found at %s, record one first with --update-baseline" % args.baseline)
+        return 2
+
+    regressions = compare(results, baseline)
+    for (case, stage, metric, value, ref) in regressions:
+        print("REGRESSION:\t %s / %s: %s = %.4g (baseline %.4g)" % (case, stage, metric, value, ref))
+    if not regressions:
+        print("\nSTATUS:\t No regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+level-wise Ramer-Douglas-Peucker reduction of decimate_polyline compared with
+the recursive algorithm
+
+@author: TPflumm
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("OCC")
+
+from SONATA.cbm.topo.utils import decimate_polyline
+
+
+def _segment_distance(p, a, b):
+    """ distance of p to the segment [a, b] with the arithmetic of decimate_polyline """
+    (ab, ap) = (b - a, p - a)
+    L2 = np.sum(ab * ab)
+    t = np.clip(np.sum(ap * ab) / (L2 if L2 > 0 else 1.0), 0.0, 1.0)
+    v = ap - t * ab
+    return np.sqrt(np.sum(v * v))
+
+
+def _rdp(pts, tol):
+    """ recursive Ramer-Douglas-Peucker, the first maximum splits """
+    if len(pts) < 3:
+        return pts
+    d = [_segment_distance(p, pts[0], pts[-1]) for p in pts[1:-1]]
+    i = int(np.argmax(d)) + 1
+    if d[i - 1] <= tol:
+        return pts[[0, -1]]
+    return np.vstack((_rdp(pts[: i + 1], tol)[:-1], _rdp(pts[i:], tol)))
+
+
+def test_straight_line():
+    pts = np.column_stack((np.linspace(0, 1, 50), np.linspace(0, 2, 50)))
+    np.testing.assert_array_equal(decimate_polyline(pts, 1e-9), pts[[0, -1]])
+
+
+@pytest.mark.parametrize("tol", [1e-4, 1e-3, 1e-2])
+def test_airfoil_like(tol):
+    t = np.linspace(0, 2 * np.pi, 400)
+    pts = np.column_stack((0.5 + 0.5 * np.cos(t), 0.06 * np.sin(t) * (1 + np.cos(t))))
+    pts[100:120, 1] = pts[100, 1]  # a straight part
+    res = decimate_polyline(pts, tol)
+
+    np.testing.assert_array_equal(res, _rdp(pts, tol))
+    np.testing.assert_array_equal(res[[0, -1]], pts[[0, -1]])
+    # every removed point lies within tol of the remaining polyline
+    for p in pts:
+        assert min(_segment_distance(p, a, b) for (a, b) in zip(res[:-1], res[1:])) <= tol
+
+
+def test_3d_points():
+    t = np.linspace(0, 1, 100)
+    pts = np.column_stack((t, np.sin(3 * t), t * t * np.cos(5 * t)))
+    np.testing.assert_array_equal(decimate_polyline(pts, 1e-3), _rdp(pts, 1e-3))
+
+
+def test_unchanged():
+    pts = np.array([[0.0, 0.0], [0.5, 0.0], [1.0, 0.0]])
+    np.testing.assert_array_equal(decimate_polyline(pts[:2], 0.1), pts[:2])
+    np.testing.assert_array_equal(decimate_polyline(pts, 0.0), pts)
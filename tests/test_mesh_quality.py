@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+quality metrics of mesh_quality for a list of cells and for MeshArrays
+
+@author: TPflumm
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("OCC")
+
+from SONATA.cbm.mesh.mesh_arrays import MeshArrays
+from SONATA.cbm.mesh.mesh_quality import QUALITY_METRICS, mesh_quality
+
+NODES = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [2.0, 0.0], [1.5, np.sqrt(3) / 2], [3.0, 0.0], [3.0, 0.1], [10.0, 0.0]])
+CELLS = [
+    [0, 1, 2, 3],  # unit square
+    [1, 4, 5],  # equilateral triangle
+    [4, 6, 7],  # sliver
+    [1, 0, 3, 2],  # clockwise unit square
+    [0, 1, 8],  # degenerated triangle
+]
+
+
+class FakeNode(object):
+    def __init__(self, xy):
+        self.coordinates = list(xy)
+
+
+class FakeCell(object):
+    def __init__(self, id, nodes):
+        self.id = id
+        self.nodes = nodes
+
+
+def _cells():
+    nodes = [FakeNode(xy) for xy in NODES]
+    return [FakeCell(j + 1, [nodes[i] for i in c]) for (j, c) in enumerate(CELLS)]
+
+
+def test_metrics():
+    q = mesh_quality(_cells(), max_aspect_ratio=5.0)
+    np.testing.assert_array_equal(q["id"], [1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(q["nodes"], [4, 3, 3, 4, 3])
+    np.testing.assert_allclose(q["area"], [1.0, np.sqrt(3) / 4, 0.05, -1.0, 0.0], atol=1e-12)
+    np.testing.assert_array_equal(q["orientation"], [True, True, True, False, False])
+
+    np.testing.assert_allclose(q["min_angle"][:2], [90.0, 60.0])
+    np.testing.assert_allclose(q["max_angle"][:2], [90.0, 60.0])
+    np.testing.assert_allclose(q["aspect_ratio"][:3], [1.0, 1.0, np.hypot(1.0, 0.1) / 0.1])
+    np.testing.assert_allclose(q["jacobian_ratio"][:2], [1.0, 1.0])
+    np.testing.assert_allclose(q["skew"][:2], [0.0, 0.0], atol=1e-12)
+    np.testing.assert_allclose(q["skew"][4], 1.0)
+
+    # the sliver, the clockwise and the degenerated cell
+    assert q.offending == [3, 4, 5]
+    for name in QUALITY_METRICS:
+        (counts, edges) = q.histograms[name]
+        assert len(edges) == 11
+
+
+def test_mesh_arrays():
+    cells = np.full((len(CELLS), 4), -1)
+    for (j, c) in enumerate(CELLS):
+        cells[j, : len(c)] = c
+    q = mesh_quality(MeshArrays(NODES, cells))
+    ref = mesh_quality(_cells())
+    for name in ("id", "nodes", "orientation") + QUALITY_METRICS:
+        np.testing.assert_allclose(q[name], ref[name], err_msg=name)
+    assert q.offending == ref.offending
+
+
+def test_limits():
+    q = mesh_quality(_cells()[:2], min_angle=70.0)
+    assert q.offending == [2]
+    q = mesh_quality(_cells()[:2], max_skew=-1.0)
+    assert q.offending == [1, 2]
+    # the skew of the ideal cells only differs by round-off
+    (counts, edges) = q.histograms["skew"]
+    assert counts.sum() == 2 and edges[0] < 0.0 < edges[-1]
+
+
+def test_empty_mesh():
+    q = mesh_quality([])
+    assert len(q.table) == 0 and q.offending == []
+    assert sorted(q.histograms) == sorted(QUALITY_METRICS)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+KD-tree searches for coincident and close nodes compared with the former
+pairwise comparisons of remove_dublicate_nodes, merge_nodes_if_too_close and
+consolidate_mesh_on_web
+
+@author: TPflumm
+"""
+import numpy as np
+import pytest
+
+from SONATA.cbm.mesh.node_search import (match_node_pairs,
+                                         merge_close_consecutive,
+                                         remaining_node_indices,)
+
+
+class FakeNode(object):
+    """ compares by id and hashes by identity like Node """
+
+    def __init__(self, id, xy):
+        self.id = id
+        self.xy = np.asarray(xy, dtype=float)
+
+    def __eq__(self, other):
+        return self.id == other.id
+
+    def __hash__(self):
+        return id(self)
+
+    def Distance(self, other):
+        d = self.xy - other.xy
+        return np.sqrt(d[0] * d[0] + d[1] * d[1])
+
+
+def _nodes(rng, n, tol):
+    """ random nodes with coincident and near-coincident groups and some
+    distinct nodes that share their id """
+    xy = rng.random((n, 2))
+    xy[rng.integers(0, n, n // 4)] = xy[rng.integers(0, n, n // 4)]
+    k = rng.integers(0, n, n // 4)
+    xy[k] = xy[rng.integers(0, n, n // 4)] + (rng.random((n // 4, 2)) - 0.5) * 2.5 * tol
+    ids = np.arange(1, n + 1)
+    ids[rng.integers(0, n, n // 10)] = ids[rng.integers(0, n, n // 10)]
+    return [FakeNode(i, p) for (i, p) in zip(ids, xy)]
+
+
+def _remove_dublicate_nodes(nodes, tol):
+    """ former remove_dublicate_nodes after remove_duplicates_from_list_preserving_order """
+    doublicated_nodes = []
+    for i, a in enumerate(nodes):
+        for b in nodes[i:]:
+            if a.id != b.id and a.Distance(b) <= tol:
+                doublicated_nodes.append(a)
+    doublicated_nodes = list(set(doublicated_nodes))
+    for dn in doublicated_nodes:
+        nodes.remove(dn)
+    return nodes
+
+
+def _project(p):
+    """ projection onto the unit circle """
+    return p / np.sqrt(p[0] * p[0] + p[1] * p[1])
+
+
+def _merge_nodes_if_too_close(nodes, max_dist, project=_project):
+    """ former merge_nodes_if_too_close with project as projection """
+    rm_idx = []
+    for i, n1 in enumerate(nodes[0:], start=0):
+        n2 = nodes[i - 1]
+        if n1.Distance(n2) <= max_dist:
+            n1.xy = project(n1.xy + 0.5 * (n2.xy - n1.xy))
+            rm_idx.append(i - 1)
+
+    for index in sorted(rm_idx, reverse=True):
+        del nodes[index]
+    return nodes
+
+
+def _node_matching(w1_nodes, w2_nodes, w_tol):
+    """ node matching matrix of the former consolidate_mesh_on_web """
+    tmp = np.asarray([[w1.Distance(w2), w1.id, w2.id] for w1 in w1_nodes for w2 in w2_nodes])
+    NM = tmp[tmp[:, 0] < w_tol]
+    NM = NM[NM[:, 0].argsort()]
+    tmp, tmp_idx = np.unique(NM[:, 1], True, axis=0)
+    tmp_idx.sort(axis=0)
+    NM = NM[tmp_idx]
+    tmp, tmp_idx = np.unique(NM[:, 2], True, axis=0)
+    tmp_idx.sort(axis=0)
+    NM = NM[tmp_idx]
+    return NM
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_remaining_node_indices(seed):
+    tol = 1e-3
+    nodes = _nodes(np.random.default_rng(seed), 200, tol)
+    keep = remaining_node_indices(np.array([n.xy for n in nodes]), [n.id for n in nodes], tol)
+
+    ref = _remove_dublicate_nodes(list(nodes), tol)
+    assert len(ref) < len(nodes)
+    assert [id(nodes[k]) for k in keep] == [id(n) for n in ref]
+
+
+def test_remaining_node_indices_few_nodes():
+    assert remaining_node_indices(np.empty((0, 2)), [], 1e-6).tolist() == []
+    assert remaining_node_indices([[0.0, 0.0]], [1], 1e-6).tolist() == [0]
+    # coincident nodes of the same id are kept
+    assert remaining_node_indices([[0.0, 0.0], [0.0, 0.0]], [1, 1], 1e-6).tolist() == [0, 1]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merge_close_consecutive(seed):
+    rng = np.random.default_rng(seed)
+    t = np.sort(rng.random(300)) * 2 * np.pi
+    t[rng.integers(0, 300, 30)] += 1e-4  # close to their neighbor
+    t[-1] = t[0] + 2 * np.pi - 5e-4  # the last node is close to the first one
+    nodes = [FakeNode(i, (np.cos(ti), np.sin(ti))) for (i, ti) in enumerate(t)]
+    max_dist = 2e-3
+
+    def _move(i, cP):
+        nodes[i].xy = _project(cP)
+        return nodes[i].xy
+
+    ref = _merge_nodes_if_too_close([FakeNode(n.id, n.xy) for n in nodes], max_dist)
+    rm_idx = merge_close_consecutive(np.array([n.xy for n in nodes]), max_dist, _move)
+    assert -1 in rm_idx
+    for index in sorted(rm_idx, reverse=True):
+        del nodes[index]
+
+    assert [n.id for n in nodes] == [n.id for n in ref]
+    np.testing.assert_array_equal([n.xy for n in nodes], [n.xy for n in ref])
+
+
+def test_merge_close_consecutive_chain():
+    # a chain of close nodes is merged from node to node like before
+    xy = [[0.0, 0.0], [1.0, 0.0], [1.05, 0.0], [1.1, 0.0], [1.15, 0.0], [3.0, 0.0]]
+    nodes = [FakeNode(i, p) for (i, p) in enumerate(xy)]
+    ref = _merge_nodes_if_too_close([FakeNode(n.id, n.xy) for n in nodes], 0.08, lambda p: p)
+    rm_idx = merge_close_consecutive(xy, 0.08, lambda i, cP: cP)
+    assert [n.id for (i, n) in enumerate(nodes) if i not in rm_idx] == [n.id for n in ref]
+    assert merge_close_consecutive(np.empty((0, 2)), 0.08, None) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_match_node_pairs(seed):
+    rng = np.random.default_rng(seed)
+    w_tol = 1e-2
+    y1 = np.sort(rng.random(80))
+    y2 = np.concatenate((y1[::2], y1[1::4] + (rng.random(len(y1[1::4])) - 0.5) * 3 * w_tol, rng.random(10)))
+    y2[:3] = y2[3]  # coincident nodes on the same side
+    w1_nodes = [FakeNode(i, (0.0, y)) for (i, y) in enumerate(y1)]
+    w2_nodes = [FakeNode(1000 + i, (0.0, y)) for (i, y) in enumerate(y2)]
+
+    NM = match_node_pairs([n.xy for n in w1_nodes], [n.id for n in w1_nodes], [n.xy for n in w2_nodes], [n.id for n in w2_nodes], w_tol)
+    ref = _node_matching(w1_nodes, w2_nodes, w_tol)
+    np.testing.assert_array_equal(NM[:, 1:], ref[:, 1:])
+    np.testing.assert_allclose(NM[:, 0], ref[:, 0], rtol=0, atol=1e-15)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+offset of discretized curves with the exact normals of np_parallel_offset
+
+@author: TPflumm
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from SONATA.cbm.topo.offset import np_parallel_offset, shp_parallel_offset
+
+
+def _area(data):
+    return 0.5 * np.sum(data[:-1, 0] * data[1:, 1] - data[1:, 0] * data[:-1, 1])
+
+
+def _circle(n=60, r=1.0):
+    phi = np.linspace(0, 2 * np.pi, n + 1)
+    pts = r * np.column_stack((np.cos(phi), np.sin(phi)))
+    pts[-1] = pts[0]
+    return [(pts, np.column_stack((-np.sin(phi), np.cos(phi))))]
+
+
+def _square(n=5):
+    corners = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [0.0, 0.0]])
+    chains = []
+    for (a, b) in zip(corners[:-1], corners[1:]):
+        pts = a + np.linspace(0, 1, n)[:, None] * (b - a)
+        chains.append((pts, np.tile(b - a, (n, 1))))
+    return chains
+
+
+def test_circle_inwards():
+    chains = _circle()
+    # Resolution=1 does not subdivide the offset polyline
+    data = np_parallel_offset(chains, 0.1, Resolution=1)
+    assert len(data) == len(chains[0][0])
+    np.testing.assert_allclose(np.linalg.norm(data, axis=1), 0.9, atol=1e-12)
+    np.testing.assert_array_equal(data[0], data[-1])
+    # same orientation as the polygon offset
+    ref = shp_parallel_offset(chains[0][0], 0.1)
+    assert np.sign(_area(data)) == np.sign(_area(ref))
+
+
+def test_square_inwards():
+    data = np_parallel_offset(_square(), 0.1)
+    # the offset chains are trimmed at the corners to the inner square
+    np.testing.assert_allclose(np.max(np.abs(data - 0.5), axis=1), 0.4, atol=1e-12)
+    np.testing.assert_allclose(abs(_area(data)), 0.8 ** 2)
+    for corner in ([0.1, 0.1], [0.9, 0.1], [0.9, 0.9], [0.1, 0.9]):
+        assert np.min(np.linalg.norm(data - corner, axis=1)) < 1e-12
+
+
+@pytest.mark.parametrize("side", ["right", "left"])
+def test_open_line(side):
+    pts = np.column_stack((np.linspace(0, 1, 11), np.zeros(11)))
+    chains = [(pts, np.tile([1.0, 0.0], (11, 1)))]
+    data = np_parallel_offset(chains, 0.1, side=side)
+    ref = shp_parallel_offset(pts, 0.1, side=side)
+    np.testing.assert_allclose(data[:, 1], -0.1 if side == "right" else 0.1)
+    np.testing.assert_allclose(data[[0, -1]], ref[[0, -1]], atol=1e-12)
+
+
+def test_round_join_at_convex_corner():
+    # the right hand side offset of a left turn is convex and joined by an arc
+    chains = [(np.array([[0.0, 0.0], [1.0, 0.0]]), np.array([[1.0, 0.0], [1.0, 0.0]])),
+              (np.array([[1.0, 0.0], [1.0, 1.0]]), np.array([[0.0, 1.0], [0.0, 1.0]]))]
+    data = np_parallel_offset(chains, 0.1, side="right", join_style=1)
+    arc = data[(data[:, 0] > 1.0) & (data[:, 1] < 0.0)]
+    assert len(arc)
+    np.testing.assert_allclose(np.linalg.norm(arc - [1.0, 0.0], axis=1), 0.1, atol=1e-12)
+
+
+def test_cusps_return_none():
+    # the radius of the circle is smaller than the offset distance
+    assert np_parallel_offset(_circle(), 1.5) is None
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+batched projection of points onto a BSplineLst compared with the projection
+of every point onto every BSpline by Geom2dAPI_ProjectPointOnCurve
+
+@author: TPflumm
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("OCC")
+
+from OCC.Core.Geom2dAPI import Geom2dAPI_ProjectPointOnCurve
+from OCC.Core.gp import gp_Pnt2d
+
+from SONATA.cbm.topo.BSplineLst_utils import (BSplineLst_from_dct,
+                                              project_Pnts_on_BSplineLst,)
+
+
+def _reference(BSplineLst, xy, distance, u_tol, unique_tol):
+    """ the former per-node projection of mesh_by_projecting_nodes_on_BSplineLst """
+    p = []
+    for (idx, item) in enumerate(BSplineLst):
+        (first, last) = (item.FirstParameter(), item.LastParameter())
+        projection = Geom2dAPI_ProjectPointOnCurve(gp_Pnt2d(*xy), item, first - (last - first) * u_tol, last + (last - first) * u_tol)
+        for j in range(1, projection.NbPoints() + 1):
+            if projection.Distance(j) <= distance:
+                p.append([projection.Point(j), idx, projection.Parameter(j)])
+    rm = [a for a in range(len(p)) if any(p[a][0].IsEqual(b[0], unique_tol) for b in p[a + 1 :])]
+    return sorted((idx, u) for (k, (P, idx, u)) in enumerate(p) if k not in rm)
+
+
+def test_project_Pnts_on_BSplineLst():
+    # rounded rectangle with corners: the radii of curvature are larger than distance
+    t = np.linspace(0, 2 * np.pi, 161)[:-1]
+    r = 1.0 / (np.abs(np.cos(t)) ** 6 + np.abs(np.sin(t)) ** 6) ** (1 / 6)
+    data = np.column_stack((2 * r * np.cos(t), r * np.sin(t)))
+    data = np.vstack((data, [[2.2, -0.3], [2.0, -0.5]]))  # a sharp corner
+    BSplineLst = BSplineLst_from_dct(data, angular_deflection=30, closed=True, tol_interp=1e-6, twoD=True)
+
+    rng = np.random.default_rng(0)
+    (distance, u_tol, unique_tol) = (0.05, 2e-6, 5e-5)
+    pts = data[rng.integers(0, len(data), 200)] * (1 - distance * rng.random((200, 1)))
+    pts = np.vstack((pts, [[0.0, 0.0], [5.0, 5.0]]))  # no projection point within distance
+
+    prj = project_Pnts_on_BSplineLst(BSplineLst, pts, distance, u_tol, unique_tol)
+    for (xy, p) in zip(pts, prj):
+        ref = _reference(BSplineLst, xy, distance, u_tol, unique_tol)
+        res = sorted((idx, u) for (P, idx, u, d) in p)
+        assert [idx for (idx, u) in res] == [idx for (idx, u) in ref]
+        np.testing.assert_allclose([u for (idx, u) in res], [u for (idx, u) in ref], atol=1e-7)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+IntervalLayup and layup_boundaries compared with a pointwise evaluation of the
+layup
+
+@author: TPflumm
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from SONATA.cbm.topo.projection import IntervalLayup, layup_boundaries
+
+S = (np.arange(400) + 0.5) / 400  # samples between the breakpoints
+
+
+def _covers(begin, end, s):
+    """ True where s lies in [begin, end] or [0,end][begin,1] if begin > end """
+    if begin > end:
+        return (s <= end) | (s >= begin)
+    return (s >= begin) & (s <= end)
+
+
+def _values(arr, s):
+    """ pointwise values of the [start, end, value] rows, NaN if not covered """
+    v = np.full(len(s), np.nan)
+    for (a, b, value) in arr:
+        assert a < b
+        v[(s >= a) & (s <= b)] = value
+    return v
+
+
+def test_insert_wrap_around():
+    t = IntervalLayup.from_array(np.array([[0, 1, 0]]))
+    t.insert(0.7, 0.3, 1)
+    # without a gap the intervals are sorted by their start
+    np.testing.assert_array_equal(t.to_array(), [[0.0, 0.3, 1.0], [0.3, 0.7, 0.0], [0.7, 1.0, 1.0]])
+    assert t.query(0.1) == 1 and t.query(0.5) == 0 and t.query(0.3) == 0
+
+    # a chain across the origin starts behind its gap
+    t.chop(0.7, 0.5)
+    np.testing.assert_array_equal(t.to_array(), [[0.7, 1.0, 1.0], [0.0, 0.3, 1.0], [0.3, 0.5, 0.0]])
+    np.testing.assert_array_equal(t.to_array(sort=False), [[0.0, 0.3, 1.0], [0.3, 0.5, 0.0], [0.7, 1.0, 1.0]])
+
+
+def test_chop():
+    t = IntervalLayup.from_array(np.array([[0, 0.4, 1], [0.4, 1, 2]]))
+    np.testing.assert_array_equal(t.chopped(0.2, 0.6).to_array(), [[0.2, 0.4, 1.0], [0.4, 0.6, 2.0]])
+    np.testing.assert_array_equal(t.chopped(0.8, 0.1).to_array(), [[0.8, 1.0, 2.0], [0.0, 0.1, 1.0]])
+    # chopped returns a copy
+    assert len(t.to_array()) == 2
+    assert np.isnan(t.chopped(0.2, 0.6).query(0.7))
+
+
+def test_empty():
+    t = IntervalLayup()
+    assert t.to_array().shape == (0, 3)
+    assert np.isnan(t.query(0.5))
+    assert IntervalLayup.from_array(np.empty((0, 3))).to_array().shape == (0, 3)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_layup_boundaries(seed):
+    rng = np.random.default_rng(seed)
+    Layup = rng.integers(0, 41, (12, 2)) / 40.0
+    Layup = Layup[Layup[:, 0] != Layup[:, 1]]
+    (relevant, cummulated) = layup_boundaries(Layup)
+    assert len(relevant) == len(Layup) and len(cummulated) == len(Layup) + 1
+
+    v = np.zeros(len(S))
+    np.testing.assert_array_equal(_values(cummulated[0], S), v)
+    for (i, (begin, end)) in enumerate(Layup):
+        inside = _covers(begin, end, S)
+        np.testing.assert_array_equal(_values(relevant[i], S), np.where(inside, v, np.nan))
+        v = np.where(inside, i + 1, v)
+        np.testing.assert_array_equal(_values(cummulated[i + 1], S), v)
+
+
+def test_layup_boundaries_start_and_values():
+    start = np.array([[0.0, 0.5, -1.0], [0.5, 1.0, 0.0]])
+    (relevant, cummulated) = layup_boundaries(np.array([[0.9, 0.6]]), start=start, values=[7])
+    np.testing.assert_array_equal(relevant[0], [[0.9, 1.0, 0.0], [0.0, 0.5, -1.0], [0.5, 0.6, 0.0]])
+    np.testing.assert_array_equal(cummulated[1], [[0.0, 0.6, 7.0], [0.6, 0.9, 0.0], [0.9, 1.0, 7.0]])
+
+
+def test_layup_boundaries_without_layers():
+    (relevant, cummulated) = layup_boundaries(np.empty((0, 2)))
+    assert relevant == [] and len(cummulated) == 1
+    np.testing.assert_array_equal(cummulated[0], [[0.0, 1.0, 0.0]])
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+a failing section does not stop the processing of the other sections
+
+@author: TPflumm
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+pytest.importorskip("OCC")
+
+from SONATA import classBlade
+from SONATA.classBlade import Blade
+from SONATA.utl.lazy_sections import LazySections
+
+FAIL = (0.25, 0.4)  # stations whose topology fails
+
+
+class FakeBeamProperties(object):
+    """ stiffness and mass matrices that grow quadratically with x """
+
+    def __init__(self, x):
+        self.TS = np.eye(6) * (1 + 10 * x ** 2)
+        self.MM = np.eye(6) * (1 + 10 * x ** 2)
+
+
+class FakeConfig(object):
+    """ configuration of a section that is not read from a 3D shape """
+
+    def __init__(self):
+        self.setup = {"input_type": 5}
+
+
+class FakeSection(object):
+    """ stands in for the CBM instance of a section """
+
+    def __init__(self, x, config=None):
+        self.name = "x%.3f" % x
+        self.x = x
+        self.config = config
+        self.BeamProperties = "stale"
+
+
+def fake_run_section(cs, stages=(), mesh_kw=None, solver_kw=None, cache=None):
+    if cs.x in FAIL:
+        raise RuntimeError("topology failed")
+    cs.BeamProperties = FakeBeamProperties(cs.x)
+    return cs
+
+
+@pytest.fixture
+def job(monkeypatch):
+    monkeypatch.setattr(classBlade, "run_section", fake_run_section)
+    monkeypatch.setattr(Blade, "_blade_build_section", lambda self, x, cfg: FakeSection(x, cfg))
+    monkeypatch.setattr(Blade, "_blade_set_solver_cfg", lambda self, solver, loads: None)
+    job = Blade(name="test")
+    job.f_cbmconfigs = lambda xs: np.array([[x, FakeConfig()] for x in xs], dtype=object)
+    return job
+
+
+@pytest.mark.parametrize("executor", [None, "threads"])
+def test_map_sections_keeps_failed_section(job, executor):
+    job.sections = LazySections([0.0, 0.4, 1.0], [None] * 3, job._blade_build_section)
+    if executor is None:
+        failed = job._blade_map_sections(("topo", "mesh"))
+    else:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            failed = job._blade_map_sections(("topo", "mesh"), executor=pool)
+
+    assert failed == [1]
+    assert [cs.name for cs in job.sections[:, 1]] == ["x0.000", "x0.400", "x1.000"]
+    assert [cs.BeamProperties is None for cs in job.sections[:, 1]] == [False, True, False]
+
+
+def test_refine_stations_with_failed_section(job):
+    x = job.blade_refine_stations(stations=[0.0, 0.5, 1.0], tol=0.02, max_level=2)
+
+    # the interval of the failed station 0.25 is not refined, the others are
+    np.testing.assert_allclose(x, [0.0, 0.25, 0.5, 0.625, 0.75, 0.875, 1.0])
+    bp = dict(job.beam_properties.tolist())
+    assert bp[0.25] is None
+    assert all(bp[xi] is not None for xi in x if xi != 0.25)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+save, load and re-save the topology of a cross-section in the NPZ format and
+build its segments in worker processes
+
+@author: TPflumm
+"""
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("OCC")
+
+from SONATA.cbm.fileIO.topo_npz import load_topo_npz, save_topo_npz, topo_to_arrays
+from SONATA.classBlade import Blade
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, "examples", "1_IEA15MW", "IEA-15-240-RWT.yaml")
+FLAGS = {"flag_wt_ontology": True, "flag_ref_axes_wt": True, "mesh_resolution": 400}
+
+
+def test_topo_npz_roundtrip(tmp_path):
+    job = Blade(name="IEA15", filename=EXAMPLE, flags=FLAGS, stations=[0.5])
+    job.blade_gen_section(topo_flag=True, mesh_flag=False)
+    cs = job.sections[0, 1]
+
+    save_topo_npz(str(tmp_path / "a.npz"), cs.SegmentLst, cs.WebLst, cs.BW)
+    (SegmentLst, WebLst, BW) = load_topo_npz(str(tmp_path / "a.npz"))
+
+    layers = [layer for seg in cs.SegmentLst for layer in seg.LayerLst]
+    loaded = [layer for seg in SegmentLst for layer in seg.LayerLst]
+    assert len(loaded) == len(layers)
+    for (layer, other) in zip(layers, loaded):
+        assert isinstance(other.MatID, int) and other.MatID == layer.MatID
+        np.testing.assert_array_equal(other.ivLst, layer.ivLst)
+
+    save_topo_npz(str(tmp_path / "b.npz"), SegmentLst, WebLst, BW)
+    with np.load(str(tmp_path / "a.npz")) as a, np.load(str(tmp_path / "b.npz")) as b:
+        assert sorted(a.files) == sorted(b.files)
+        for name in a.files:
+            np.testing.assert_array_equal(a[name], b[name], err_msg=name)
+
+
+def test_build_segments_in_workers():
+    job = Blade(name="IEA15", filename=EXAMPLE, flags=FLAGS, stations=[0.5])
+    job.blade_gen_section(topo_flag=True, mesh_flag=False)
+    cs = job.sections[0, 1]
+    assert len(cs.SegmentLst) > 2
+    ref = topo_to_arrays(cs.SegmentLst, cs.WebLst, cs.BW)
+
+    cs.cbm_gen_topo(n_workers=2)
+    assert all(seg.Segment0 is cs.SegmentLst[0] and seg.WebLst is cs.WebLst for seg in cs.SegmentLst[1:])
+    arrays = topo_to_arrays(cs.SegmentLst, cs.WebLst, cs.BW)
+    assert sorted(arrays) == sorted(ref)
+    for name in ref:
+        np.testing.assert_array_equal(arrays[name], ref[name], err_msg=name)